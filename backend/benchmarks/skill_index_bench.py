@@ -0,0 +1,176 @@
+# =============================================================================
+# ФАЙЛ: backend/benchmarks/skill_index_bench.py
+# КРАТКО: сравнение поиска людей по навыкам: SQL (users.skill_ids + GIN) против битового индекса в памяти.
+# ЗАПУСК (нужна ОТДЕЛЬНАЯ, не боевая БД — скрипт пишет в неё синтетических пользователей):
+#   DATABASE_URL=postgresql+asyncpg://... python -m backend.benchmarks.skill_index_bench \
+#       --users 200000 --skills-per-user 5 --queries 300
+#   200 000 × 5 = 1 000 000 строк user_skill. Синтетика — users.username LIKE 'bench_%',
+#   по окончании удаляется (ON DELETE CASCADE чистит user_skill/application), --keep оставляет её.
+# ЧТО МЕРИМ:
+#   • build  — полная сборка индекса (чтение users/application + SkillBitmapIndex.build);
+#   • sql    — UsersRepo.search_users при выключенном индексе (как сейчас в проде);
+#   • index  — тот же вызов при включённом индексе (в т.ч. дочитка страницы профилей из БД);
+#   • engine — только SkillBitmapIndex.search, без БД.
+#   Для каждого запроса сверяем, что оба пути вернули одно и то же (id, match_count, total).
+# =============================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, Sequence
+
+from sqlalchemy import text
+
+from backend.settings.config import settings
+from backend.infrastructure.db import get_sessionmaker, dispose_db
+from backend.repositories.users import UsersRepo
+from backend.repositories import skill_index
+
+_ROLES = ["DevOps", "Backend", "Frontend", "Designer", "ML", "QA"]
+
+
+async def _seed(users: int, skills_per_user: int, apply_share: float, hackathons: int) -> List[int]:
+    """Синтетика прямо в БД (generate_series): популярность навыков — по Ципфу."""
+    sm = get_sessionmaker()
+    async with sm() as s:
+        await s.execute(text(
+            "INSERT INTO users (telegram_id, username, first_name) "
+            "SELECT -g, 'bench_' || g, 'Bench' FROM generate_series(1, :n) AS g"
+        ), {"n": users})
+        # Взвешенная выборка без повторов (Efraimidis–Spirakis): ключ -ln(u)/w, w = 1/rank навыка
+        await s.execute(text(
+            "WITH ranked AS (SELECT id, row_number() OVER (ORDER BY id) AS rnk FROM skill) "
+            "INSERT INTO user_skill (user_id, skill_id) "
+            "SELECT u.id, pick.id FROM users u CROSS JOIN LATERAL ("
+            "  SELECT r.id FROM ranked r ORDER BY -ln(random() + 1e-12 + u.id * 0) * r.rnk LIMIT :k"
+            ") AS pick WHERE u.username LIKE 'bench\\_%'"
+        ), {"k": skills_per_user})
+        hack_ids = [r[0] for r in (await s.execute(
+            text("SELECT id FROM hackathon ORDER BY id LIMIT :h"), {"h": hackathons}
+        )).all()]
+        await s.execute(text(
+            "INSERT INTO application (hackathon_id, user_id, role) "
+            "SELECT h, u.id, (CAST(:roles AS text[]))[1 + floor(random() * :nroles)::int]::role_type "
+            "FROM users u CROSS JOIN unnest(CAST(:hacks AS int[])) AS h "
+            "WHERE u.username LIKE 'bench\\_%' AND random() < :p "
+            "ON CONFLICT DO NOTHING"
+        ), {"roles": _ROLES, "nroles": len(_ROLES), "hacks": hack_ids, "p": apply_share})
+        await s.commit()
+    return hack_ids
+
+
+async def _cleanup() -> None:
+    async with get_sessionmaker()() as s:
+        await s.execute(text("DELETE FROM users WHERE username LIKE 'bench\\_%'"))
+        await s.commit()
+
+
+def _workload(n: int, slugs: Sequence[str], hack_ids: Sequence[int], rnd: random.Random) -> List[Dict]:
+    """Типичные запросы: 1–4 навыка из популярных, all/any, иногда хакатон и роль, первая/вторая страница."""
+    popular = list(slugs[:30])
+    out = []
+    for _ in range(n):
+        q: Dict = {
+            "skills": rnd.sample(popular, rnd.randint(1, 4)),
+            "mode": rnd.choice(["all", "any"]),
+            "offset": rnd.choice([0, 0, 0, 20]),
+            "hackathon_id": None,
+            "role": None,
+        }
+        if hack_ids and rnd.random() < 0.5:
+            q["hackathon_id"] = rnd.choice(hack_ids)
+            if rnd.random() < 0.5:
+                q["role"] = rnd.choice(_ROLES)
+        out.append(q)
+    return out
+
+
+async def _run(repo: UsersRepo, queries: List[Dict], limit: int) -> tuple[List[float], List[tuple]]:
+    times, results = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        items, total, _ = await repo.search_users(
+            None, q["skills"], q["mode"], limit, q["offset"], total_mode="exact",
+            hackathon_id=q["hackathon_id"], role=q["role"],
+        )
+        times.append((time.perf_counter() - t0) * 1000)
+        results.append((total, [(u.id, mc) for u, mc in items]))
+    return times, results
+
+
+def _report(name: str, ms: List[float]) -> None:
+    ms = sorted(ms)
+    p = lambda x: ms[min(len(ms) - 1, int(len(ms) * x))]  # noqa: E731
+    print(f"{name:<7} mean {statistics.fmean(ms):8.2f} ms   p50 {p(0.5):8.2f}   p95 {p(0.95):8.2f}   max {ms[-1]:8.2f}")
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description="SQL vs битовый индекс навыков на синтетических данных")
+    ap.add_argument("--users", type=int, default=200_000)
+    ap.add_argument("--skills-per-user", type=int, default=5)
+    ap.add_argument("--apply-share", type=float, default=0.05, help="доля пользователей с заявкой на каждый хакатон")
+    ap.add_argument("--hackathons", type=int, default=5)
+    ap.add_argument("--queries", type=int, default=300)
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--keep", action="store_true", help="не удалять синтетику после прогона")
+    ap.add_argument("--no-seed", action="store_true", help="синтетика уже в БД (после --keep)")
+    args = ap.parse_args()
+
+    try:
+        t0 = time.perf_counter()
+        if args.no_seed:
+            async with get_sessionmaker()() as s:
+                hack_ids = [r[0] for r in (await s.execute(
+                    text("SELECT id FROM hackathon ORDER BY id LIMIT :h"), {"h": args.hackathons}
+                )).all()]
+        else:
+            hack_ids = await _seed(args.users, args.skills_per_user, args.apply_share, args.hackathons)
+            print(f"seed    {time.perf_counter() - t0:8.1f} s   ({args.users * args.skills_per_user} user_skill rows)")
+        async with get_sessionmaker()() as s:
+            await s.execute(text("ANALYZE users"))
+            slugs = [r[0] for r in (await s.execute(text(
+                "SELECT s.slug FROM skill s JOIN user_skill us ON us.skill_id = s.id "
+                "GROUP BY s.slug ORDER BY count(*) DESC"
+            ))).all()]
+
+        repo = UsersRepo()
+        queries = _workload(args.queries, slugs, hack_ids, random.Random(args.seed))
+
+        settings.SKILL_INDEX_ENABLED = False
+        await _run(repo, queries[:10], args.limit)  # Прогрев пула соединений и кэша страниц БД
+        sql_ms, sql_res = await _run(repo, queries, args.limit)
+
+        settings.SKILL_INDEX_ENABLED = True
+        t0 = time.perf_counter()
+        skill_index.SkillIndexRepo().start_rebuild()
+        await skill_index._state.rebuild_task
+        print(f"build   {time.perf_counter() - t0:8.2f} s   {skill_index._state.stats()}")
+        idx_ms, idx_res = await _run(repo, queries, args.limit)
+
+        index = skill_index._state.index
+        engine_ms = []
+        for q in queries:
+            ids = [sk.id for sk in (await repo.skills.resolve_slugs(q["skills"]))[0]]
+            t0 = time.perf_counter()
+            index.search(ids, q["mode"], limit=args.limit, offset=q["offset"],
+                         hackathon_id=q["hackathon_id"], role=q["role"])
+            engine_ms.append((time.perf_counter() - t0) * 1000)
+
+        _report("sql", sql_ms)
+        _report("index", idx_ms)
+        _report("engine", engine_ms)
+        mismatches = sum(a != b for a, b in zip(sql_res, idx_res))
+        print(f"results differ in {mismatches} of {len(queries)} queries")
+    finally:
+        if not args.keep:
+            await _cleanup()
+        await dispose_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
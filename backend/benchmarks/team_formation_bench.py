@@ -0,0 +1,102 @@
+# =============================================================================
+# ФАЙЛ: backend/benchmarks/team_formation_bench.py
+# КРАТКО: автоподбор команд на синтетических участниках: время и качество против случайного разбиения.
+# ЗАПУСК (БД не нужна — участники генерируются в памяти):
+#   python -m backend.benchmarks.team_formation_bench --applicants 5000 --min-size 3 --max-size 5
+# ЧТО МЕРИМ:
+#   • random  — случайное разбиение тех же размеров: ценность, различные навыки/роли, повторы ролей;
+#   • greedy  — solve без локального поиска (только жадный старт в пуле процессов);
+#   • solve   — greedy + целевой локальный поиск с бюджетом TEAM_SOLVER_ITERATIONS_PER_APPLICANT
+#     (или --iterations-per-applicant); в конце — что дал локальный поиск по ценности и сколько стоил.
+#   Проверяем: размеры команд в [min, max], каждый участник не более чем в одной команде.
+# =============================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from backend.settings.config import settings
+from backend.infrastructure import team_solver
+from backend.infrastructure.workers import run_cpu, shutdown_cpu_pool
+from backend.services.team_formation import ROLES, encode, solve
+
+
+def _synthetic(n: int, catalog: int, skills_per_user: int, no_role_share: float, rng: np.random.Generator):
+    """Навыки — по Ципфу (как в skill_index_bench), роли — неравномерно, часть анкет без роли."""
+    weights = 1.0 / np.arange(1, catalog + 1)
+    weights /= weights.sum()
+    role_weights = 1.0 / np.arange(1, len(ROLES) + 1)
+    role_weights /= role_weights.sum()
+    skill_lists, roles = [], []
+    for _ in range(n):
+        k = int(rng.integers(1, 2 * skills_per_user))
+        skill_lists.append(sorted(rng.choice(catalog, size=min(k, catalog), replace=False, p=weights).tolist()))
+        roles.append(None if rng.random() < no_role_share else ROLES[int(rng.choice(len(ROLES), p=role_weights))])
+    return skill_lists, roles
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description="Автоподбор команд на синтетических участниках")
+    ap.add_argument("--applicants", type=int, default=5000)
+    ap.add_argument("--catalog", type=int, default=300, help="размер справочника навыков")
+    ap.add_argument("--skills-per-user", type=int, default=5)
+    ap.add_argument("--no-role-share", type=float, default=0.2)
+    ap.add_argument("--min-size", type=int, default=3)
+    ap.add_argument("--max-size", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--iterations-per-applicant", type=float, default=None,
+                    help="бюджет локального поиска (по умолчанию из настроек)")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    skills, roles = encode(*_synthetic(args.applicants, args.catalog, args.skills_per_user, args.no_role_share, rng))
+    n_roles = len(ROLES)
+    sizes = team_solver.plan_sizes(len(roles), args.min_size, args.max_size)
+    print(f"applicants {len(roles)}, teams {len(sizes)}, pool workers {settings.CPU_POOL_WORKERS}")
+
+    try:
+        # Случайное разбиение тех же размеров — точка отсчёта
+        perm = rng.permutation(len(roles))
+        bounds = np.cumsum([0] + sizes)
+        baseline = [perm[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        print(f"random  {team_solver.objective(skills, roles, baseline, n_roles)}")
+
+        def progress(phase: str, done: float, info: dict) -> None:
+            print(f"  [{phase:<7}] {done:6.1%} {time.perf_counter() - t0:6.2f} s  {info}", flush=True)
+
+        # Прогрев пула: запуск процессов не должен попасть во время первой фазы
+        await asyncio.gather(*(run_cpu(team_solver.plan_sizes, 1, 1, 1) for _ in range(max(settings.CPU_POOL_WORKERS, 1))))
+
+        t0 = time.perf_counter()
+        _, greedy_stats = await solve(skills, roles, args.min_size, args.max_size, seed=args.seed, iterations_per_applicant=0)
+        greedy_time = time.perf_counter() - t0
+        print(f"greedy  {greedy_time:6.2f} s   {greedy_stats}")
+
+        t0 = time.perf_counter()
+        teams, stats = await solve(
+            skills, roles, args.min_size, args.max_size,
+            seed=args.seed, iterations_per_applicant=args.iterations_per_applicant, on_progress=progress,
+        )
+        solve_time = time.perf_counter() - t0
+        print(f"solve   {solve_time:6.2f} s   {stats}")
+        gain = stats["value"] - greedy_stats["value"]
+        print(
+            f"local search: value {greedy_stats['value']} -> {stats['value']} "
+            f"({gain:+.1f}, {gain / max(greedy_stats['value'], 1):+.3%}), "
+            f"{stats['improvements']} moves, +{solve_time - greedy_time:.2f} s"
+        )
+
+        placed = np.concatenate(teams) if teams else np.empty(0, dtype=np.int64)
+        sizes_ok = all(args.min_size <= len(t) <= args.max_size for t in teams)
+        unique_ok = len(np.unique(placed)) == len(placed)
+        print(f"checks  sizes in bounds: {sizes_ok}, no one twice: {unique_ok}, unassigned: {len(roles) - len(placed)}")
+    finally:
+        shutdown_cpu_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,303 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/bitmap_index.py
+# КРАТКО: битовый индекс «навык → пользователи» и «(хакатон, роль) → заявители» в памяти процесса.
+# ЗАЧЕМ:
+#   • Самый частый поиск людей — по набору навыков (× хакатон × роль). Здесь он считается
+#     без БД: all — AND битмапов навыков, any — OR с подсчётом числа совпадений, total — popcount.
+#   • БД нужна только чтобы дочитать ровно одну страницу найденных профилей.
+# КАК УСТРОЕНО:
+#   • Битмап — целое число Python (int): AND/OR/XOR и int.bit_count() выполняются в C
+#     над машинными словами, то есть «векторно» по 64 пользователя за операцию.
+#   • Позиция бита — «слот». Слоты раздаются в порядке (updated_at, id) — ровно в порядке выдачи
+#     GET /users, поэтому «первые N по свежести» — это N старших единиц маски:
+#     ни сортировки, ни обхода всех найденных пользователей.
+#   • Пользователь обновился — его биты переносятся в новый слот на вершине (старый остаётся дыркой).
+#     Дырки и нарушенный порядок (out_of_order) убирает полная перестройка индекса.
+#   • match_count в режиме any — «битовые срезы» (bit-sliced counter): k битмапов навыков
+#     складываются в ⌈log2(k+1)⌉ чисел-разрядов, и маска «совпало ровно m навыков» собирается
+#     из разрядов за несколько AND. Уровни m идут от большего к меньшему — это и есть top-k.
+# ОСОБЕННОСТИ:
+#   • Чистая структура данных: ни БД, ни asyncio. Наполнение и свежесть —
+#     в backend/repositories/skill_index.py.
+#   • Битмапы плотные (без сжатия): ~слоты/8 байт на навык — 125 КБ на миллион слотов.
+# =============================================================================
+
+from __future__ import annotations
+
+from array import array                    # Компактные массивы слотов: user_id и updated_at (мкс)
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Ключ группы заявителей: (hackathon_id, роль) или (hackathon_id, None) — любая роль
+AppKey = Tuple[int, Optional[str]]
+
+
+def to_micros(ts: datetime) -> int:
+    """updated_at → целые микросекунды от эпохи (без потерь, в отличие от float)."""
+    delta = ts - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def _bits_from_slots(slots: Iterable[int], nbytes: int) -> int:
+    """Битмап из списка позиций — через bytearray, а не через сдвиги большого int на каждый бит."""
+    buf = bytearray(nbytes)
+    for p in slots:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _top_bits(mask: int, k: int) -> List[int]:
+    """Позиции k старших единиц маски (по убыванию)."""
+    out: List[int] = []
+    while mask and len(out) < k:
+        p = mask.bit_length() - 1
+        out.append(p)
+        mask ^= 1 << p
+    return out
+
+
+def _drop_top(mask: int, n: int) -> int:
+    """Убрать n старших единиц маски (OFFSET) бинарным поиском по popcount(mask >> p)."""
+    if n <= 0:
+        return mask
+    if mask.bit_count() <= n:
+        return 0
+    # Ищем наименьшее p, при котором выше p (включительно) меньше n единиц: тогда p-1 — n-я сверху
+    lo, hi = 0, mask.bit_length()
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (mask >> mid).bit_count() < n:
+            hi = mid
+        else:
+            lo = mid + 1
+    return mask & ((1 << (lo - 1)) - 1)
+
+
+class SkillBitmapIndex:
+    """Битмапы навыков и заявок по слотам пользователей. Методы синхронные и быстрые."""
+
+    def __init__(self) -> None:
+        self._slot_user = array("q")      # слот -> user_id
+        self._slot_ts = array("q")        # слот -> updated_at (мкс)
+        self._slot_of: Dict[int, int] = {}                 # user_id -> текущий слот
+        self._user_skills: Dict[int, Tuple[int, ...]] = {}  # user_id -> его навыки (для переноса/сравнения)
+        self._user_apps: Dict[int, Dict[int, Optional[str]]] = {}  # user_id -> {hackathon_id: role}
+        self._skills: Dict[int, int] = {}     # skill_id -> битмап слотов
+        self._apps: Dict[AppKey, int] = {}    # (hackathon_id, role|None) -> битмап слотов
+        self.out_of_order = 0                 # Сколько слотов выдано с нарушением порядка (updated_at, id)
+
+    # ---------- наполнение ----------
+
+    @classmethod
+    def build(
+        cls,
+        users: Iterable[Tuple[int, Sequence[int], datetime]],
+        applications: Iterable[Tuple[int, int, Optional[str]]],
+    ) -> "SkillBitmapIndex":
+        """
+        Собрать индекс с нуля.
+          users        — (user_id, skill_ids, updated_at);
+          applications — (hackathon_id, user_id, role).
+        """
+        idx = cls()
+        rows = sorted(((to_micros(ts), uid, tuple(sk)) for uid, sk, ts in users))
+        nbytes = (len(rows) + 7) // 8
+        by_skill: Dict[int, List[int]] = {}
+        for slot, (ts, uid, skills) in enumerate(rows):
+            idx._slot_user.append(uid)
+            idx._slot_ts.append(ts)
+            idx._slot_of[uid] = slot
+            idx._user_skills[uid] = skills
+            for sid in skills:
+                by_skill.setdefault(sid, []).append(slot)
+        idx._skills = {sid: _bits_from_slots(slots, nbytes) for sid, slots in by_skill.items()}
+
+        by_app: Dict[AppKey, List[int]] = {}
+        for hackathon_id, uid, role in applications:
+            slot = idx._slot_of.get(uid)
+            if slot is None:
+                continue
+            idx._user_apps.setdefault(uid, {})[hackathon_id] = role
+            by_app.setdefault((hackathon_id, None), []).append(slot)
+            if role is not None:
+                by_app.setdefault((hackathon_id, role), []).append(slot)
+        idx._apps = {key: _bits_from_slots(slots, nbytes) for key, slots in by_app.items()}
+        return idx
+
+    def _set_bits(self, slot: int, on: bool, skills: Iterable[int], apps: Dict[int, Optional[str]]) -> None:
+        bit = 1 << slot
+        for sid in skills:
+            cur = self._skills.get(sid, 0)
+            self._skills[sid] = (cur | bit) if on else (cur & ~bit)
+        for hackathon_id, role in apps.items():
+            for key in ((hackathon_id, None), (hackathon_id, role)) if role is not None else ((hackathon_id, None),):
+                cur = self._apps.get(key, 0)
+                self._apps[key] = (cur | bit) if on else (cur & ~bit)
+
+    def upsert_user(self, user_id: int, skill_ids: Sequence[int], updated_at: datetime) -> None:
+        """Новый пользователь или изменившийся профиль: переносим его биты в слот на вершине."""
+        ts = to_micros(updated_at)
+        skills = tuple(skill_ids)
+        apps = self._user_apps.get(user_id, {})
+        old = self._slot_of.get(user_id)
+        if old is not None:
+            if self._slot_ts[old] == ts and self._user_skills.get(user_id) == skills:
+                return  # Уже применено (поток изменений читается внахлёст)
+            self._set_bits(old, False, self._user_skills.get(user_id, ()), apps)
+
+        slot = len(self._slot_user)
+        if slot and (self._slot_ts[slot - 1], self._slot_user[slot - 1]) > (ts, user_id):
+            self.out_of_order += 1  # Транзакции закоммитились не по порядку now() — поправит перестройка
+        self._slot_user.append(user_id)
+        self._slot_ts.append(ts)
+        self._slot_of[user_id] = slot
+        self._user_skills[user_id] = skills
+        self._set_bits(slot, True, skills, apps)
+
+    def set_application(self, hackathon_id: int, user_id: int, role: Optional[str]) -> None:
+        """Заявка создана/изменена (роль)."""
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            return
+        apps = self._user_apps.setdefault(user_id, {})
+        if hackathon_id in apps:
+            if apps[hackathon_id] == role:
+                return
+            self._set_bits(slot, False, (), {hackathon_id: apps[hackathon_id]})
+        apps[hackathon_id] = role
+        self._set_bits(slot, True, (), {hackathon_id: role})
+
+    def remove_application(self, hackathon_id: int, user_id: int) -> None:
+        """Заявка удалена."""
+        apps = self._user_apps.get(user_id)
+        slot = self._slot_of.get(user_id)
+        if not apps or hackathon_id not in apps or slot is None:
+            return
+        self._set_bits(slot, False, (), {hackathon_id: apps.pop(hackathon_id)})
+
+    def remove_hackathon(self, hackathon_id: int) -> None:
+        """Хакатон удалён (его заявки ушли каскадом): убираем все его битмапы заявок."""
+        for key in [k for k in self._apps if k[0] == hackathon_id]:
+            del self._apps[key]
+        for apps in self._user_apps.values():
+            apps.pop(hackathon_id, None)
+
+    # ---------- поиск ----------
+
+    def _position(self, ts: int, user_id: int) -> int:
+        """Первый слот, чей ключ (updated_at, id) не меньше курсора: биты ниже него — «после курсора»."""
+        lo, hi = 0, len(self._slot_user)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (self._slot_ts[mid], self._slot_user[mid]) < (ts, user_id):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _levels(self, skill_ids: Sequence[int], mode: str, scope: Optional[int]) -> List[Tuple[Optional[int], int]]:
+        """Маски результата по уровням: [(match_count | None, маска)], от лучшего уровня к худшему."""
+        bitmaps = [self._skills.get(sid, 0) for sid in dict.fromkeys(skill_ids)]
+        if mode == "all":
+            mask = scope if scope is not None else -1
+            for b in bitmaps:
+                mask &= b
+            return [(None, mask if mask > 0 else 0)]
+
+        # any: складываем битмапы в битовые срезы — slices[i] хранит i-й разряд числа совпадений
+        slices: List[int] = []
+        for b in bitmaps:
+            carry = b
+            for i in range(len(slices)):
+                s_i = slices[i]
+                slices[i] = s_i ^ carry
+                carry = s_i & carry
+                if not carry:
+                    break
+            if carry:
+                slices.append(carry)
+
+        levels: List[Tuple[Optional[int], int]] = []
+        for m in range(len(bitmaps), 0, -1):
+            if m >> len(slices):
+                continue  # Столько совпадений быть не может
+            mask = scope if scope is not None else -1
+            for i, s_i in enumerate(slices):
+                mask &= s_i if (m >> i) & 1 else ~s_i
+            if mask > 0:
+                levels.append((m, mask))
+        return levels
+
+    def search(
+        self,
+        skill_ids: Sequence[int],
+        mode: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        after: Optional[Tuple] = None,
+        hackathon_id: Optional[int] = None,
+        role: Optional[str] = None,
+    ) -> Tuple[List[Tuple[int, Optional[int], datetime]], int]:
+        """
+        Страница поиска по навыкам в порядке GET /users: [match_count DESC], updated_at DESC, id DESC.
+          • after — ключи курсора ((mc,) updated_at, id) — как у SQL-пути, курсоры взаимозаменяемы;
+          • hackathon_id/role — только подавшие заявку на хакатон (с этой ролью).
+        Возвращает ([(user_id, match_count | None, updated_at)], total).
+        """
+        scope: Optional[int] = None
+        if hackathon_id is not None:
+            scope = self._apps.get((hackathon_id, role), 0)
+
+        levels = self._levels(skill_ids, mode, scope)
+        total = sum(mask.bit_count() for _, mask in levels)
+
+        if after is not None:
+            *lead, c_ts, c_id = after
+            below = (1 << self._position(to_micros(c_ts), c_id)) - 1
+            c_mc = lead[0] if lead else None
+            trimmed = []
+            for m, mask in levels:
+                if c_mc is not None and m > c_mc:
+                    continue            # Эти уровни уже показаны целиком
+                if c_mc is None or m == c_mc:
+                    mask &= below       # Уровень курсора — только то, что ниже его слота
+                trimmed.append((m, mask))
+            levels = trimmed
+
+        out: List[Tuple[int, Optional[int], datetime]] = []
+        skip = offset if after is None else 0
+        for m, mask in levels:
+            if len(out) >= limit:
+                break
+            n = mask.bit_count()
+            if skip >= n:
+                skip -= n
+                continue
+            mask = _drop_top(mask, skip)
+            skip = 0
+            for p in _top_bits(mask, limit - len(out)):
+                out.append((self._slot_user[p], m, from_micros(self._slot_ts[p])))
+        return out, total
+
+    # ---------- состояние ----------
+
+    def needs_rebuild(self) -> bool:
+        """Порядок слотов нарушен или дырок больше, чем живых слотов."""
+        return self.out_of_order > 0 or len(self._slot_user) > 2 * max(len(self._slot_of), 1024)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._slot_of),
+            "slots": len(self._slot_user),
+            "skills": len(self._skills),
+            "application_groups": len(self._apps),
+            "out_of_order": self.out_of_order,
+            "bitmap_bytes": sum((b.bit_length() + 7) // 8 for b in (*self._skills.values(), *self._apps.values())),
+        }
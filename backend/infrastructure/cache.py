@@ -0,0 +1,145 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/cache.py
+# КРАТКО: простой in-process кэш «ключ → значение» с ограничением размера (LRU) и TTL.
+# ЗАЧЕМ:
+#   • Некоторые сущности читаются постоянно, а меняются редко (например, хакатоны).
+#     Держим последние прочитанные значения в памяти процесса, чтобы не ходить в БД каждый раз.
+#   • Счётчики hits/misses/evictions — чтобы в проде можно было проверить, что кэш работает
+#     (см. GET /system/cache).
+#   • get_or_load() — чтение со «склейкой» промахов (single-flight): одновременные промахи
+#     по одному ключу ждут ОДНУ загрузку, а не идут в БД каждый сам по себе.
+# ОСОБЕННОСТИ:
+#   • Кэш живёт в одном процессе (воркере uvicorn). Между воркерами он НЕ синхронизируется:
+#     явная инвалидация действует только в «своём» воркере, остальные догонят по TTL.
+#   • Потокобезопасность не нужна: всё выполняется в одном event loop, операции синхронные.
+#   • Значения отдаются «как есть» — вызывающий код не должен их изменять.
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio                        # Задачи загрузки для single-flight
+import time                           # monotonic() — отсчёт TTL, не зависит от перевода системных часов
+from collections import OrderedDict   # Порядок ключей = порядок использования (для LRU)
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    LRU-кэш с TTL.
+      • maxsize — сколько ключей держим максимум; при переполнении вытесняем самый давно использованный;
+      • ttl — сколько секунд запись считается свежей.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()  # key -> (expires_at, value)
+        self._inflight: Dict[K, asyncio.Future] = {}  # key -> задача загрузки, которую сейчас ждут
+        self._generation = 0  # Растёт при инвалидации: загрузка, начатая «до», не попадёт в кэш
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0  # Сколько промахов не пошли в источник, а дождались чужой загрузки
+        _registry[name] = self
+
+    def get(self, key: K) -> Optional[V]:
+        """Значение по ключу или None (нет записи или она протухла)."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)  # Ключ только что использовали — он «самый свежий» для LRU
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Положить значение; при переполнении вытесняем самые давно использованные ключи."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        """
+        Значение из кэша, а при промахе — результат load(), который кладём в кэш.
+        Одновременные промахи по одному ключу ждут одну и ту же загрузку (single-flight).
+          • Загрузка идёт отдельной задачей: отмена одного из ждущих (клиент ушёл) не роняет её для остальных.
+          • Ошибку загрузки получают все ждущие, в кэш она не попадает.
+          • Если во время загрузки кэш инвалидировали, результат отдаём уже ждущим, но не сохраняем;
+            новые промахи после инвалидации начинают свежую загрузку.
+          • None («не найдено») не кэшируется: get() всё равно считает его промахом.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            generation = self._generation
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Future) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                if (
+                    not t.cancelled() and t.exception() is None
+                    and generation == self._generation and t.result() is not None
+                ):
+                    self.set(key, t.result())
+
+            task.add_done_callback(_done)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: K) -> None:
+        """Забыть один ключ (после записи в БД)."""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+        self._generation += 1
+
+    def clear(self) -> None:
+        """Забыть всё."""
+        self._data.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики для мониторинга."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Все кэши процесса по имени — для /system/cache (любой объект с методом stats())
+_registry: Dict[str, Any] = {}
+
+
+def register_stats(name: str, cache: Any) -> None:
+    """Показать в /system/cache статистику кэша, устроенного не на TTLCache (у него должен быть stats())."""
+    _registry[name] = cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Статистика всех кэшей процесса: {имя -> stats()}."""
+    return {name: cache.stats() for name, cache in _registry.items()}
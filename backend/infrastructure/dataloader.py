@@ -0,0 +1,140 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/dataloader.py
+# КРАТКО: request-scoped DataLoader — склеивает точечные выборки по ключам в один запрос.
+# ЗАЧЕМ:
+#   • Внутри одного HTTP-запроса обработчики часто зовут get_by_id/get_user_skills
+#     с одинаковыми или пересекающимися id (классический N+1).
+#   • DataLoader собирает все ключи, запрошенные в одном «тике» event loop'а, и делает
+#     ОДИН запрос вида WHERE id = ANY(:ids); повторные ключи берутся из кэша запроса.
+# КАК ПОДКЛЮЧЕНО:
+#   • request_loaders() — FastAPI-зависимость уровня приложения (см. presentations/app.py):
+#     на время запроса кладёт в contextvar пустой реестр загрузчиков.
+#   • Репозитории зовут get_loader(name, batch_fn): если реестр есть — работаем через загрузчик,
+#     если нет (скрипты, фоновые задачи) — получаем None и идём в БД напрямую, как раньше.
+#   • После записи репозиторий вызывает forget(name, key), чтобы не отдать устаревшее значение.
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, List, Mapping, Optional, Set, TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[List[K]], Awaitable[Mapping[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Батчинг + мемоизация ключей в пределах одного запроса.
+
+    batch_fn:
+      • принимает список уникальных ключей;
+      • возвращает словарь {key -> value}; отсутствующие ключи превращаются в None.
+    """
+
+    def __init__(self, batch_fn: BatchFn) -> None:
+        self._batch_fn = batch_fn
+        self._cache: Dict[K, asyncio.Future] = {}   # key -> future с результатом (дедупликация)
+        self._queue: List[K] = []                   # ключи, ждущие ближайшей отправки батча
+        self._scheduled = False                     # запланирована ли отправка в этом тике
+        self._tasks: Set[asyncio.Task] = set()      # батчи в полёте: держим ссылку, иначе задачу может собрать GC
+
+    async def load(self, key: K) -> Optional[V]:
+        """Вернуть значение по ключу; несколько load() в одном тике превратятся в один запрос."""
+        fut = self._cache.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._cache[key] = fut
+            self._queue.append(key)
+            if not self._scheduled:
+                # call_soon: отправим батч после того, как отработают все уже готовые корутины этого тика
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return await fut
+
+    async def load_many(self, keys: List[K]) -> List[Optional[V]]:
+        """Пакетный вариант load() — результаты в порядке ключей."""
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """Положить известное значение в кэш запроса (например, только что созданный объект)."""
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result(value)
+        self._cache[key] = fut
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """Забыть один ключ (или весь кэш) — нужно после записи в БД."""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    # ---- внутреннее ----
+
+    def _dispatch(self) -> None:
+        keys, self._queue, self._scheduled = self._queue, [], False
+        if keys:
+            task = asyncio.ensure_future(self._run_batch(keys))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[K]) -> None:
+        futures = [self._cache.get(k) for k in keys]
+        try:
+            found = await self._batch_fn(keys)
+        except Exception as e:
+            for k, fut in zip(keys, futures):
+                # Ошибку не мемоизируем: следующий load() по этому ключу сходит в БД заново
+                if self._cache.get(k) is fut:
+                    self._cache.pop(k, None)
+                if fut is not None and not fut.done():
+                    fut.set_exception(e)
+            return
+        for k, fut in zip(keys, futures):
+            if fut is not None and not fut.done():
+                fut.set_result(found.get(k))
+
+
+# ---- Область видимости запроса ----
+
+# Реестр загрузчиков текущего запроса: {имя -> DataLoader}. None — вне запроса.
+_loaders: ContextVar[Optional[Dict[str, DataLoader]]] = ContextVar("request_loaders", default=None)
+
+
+def get_loader(name: str, batch_fn: BatchFn) -> Optional[DataLoader]:
+    """
+    Вернуть загрузчик с именем name для текущего запроса (создав его при первом обращении).
+    Вне запроса (нет реестра) возвращает None — вызывающий код идёт в БД напрямую.
+    """
+    registry = _loaders.get()
+    if registry is None:
+        return None
+    loader = registry.get(name)
+    if loader is None:
+        loader = registry[name] = DataLoader(batch_fn)
+    return loader
+
+
+def forget(name: str, key: Any = None) -> None:
+    """Сбросить значение (или весь кэш) загрузчика name в текущем запросе, если он есть."""
+    registry = _loaders.get()
+    if registry and name in registry:
+        registry[name].clear(key)
+
+
+async def request_loaders() -> AsyncIterator[None]:
+    """
+    FastAPI-зависимость: открывает «область» загрузчиков на время запроса.
+    Подключается на уровне приложения: FastAPI(dependencies=[Depends(request_loaders)]).
+    """
+    _loaders.set({})
+    try:
+        yield
+    finally:
+        _loaders.set(None)
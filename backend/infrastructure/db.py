@@ -8,6 +8,11 @@
 #   • Оставляет get_session() как временную зависимость для роутов FastAPI
 #     (на случай обратной совместимости), но основной сценарий — открывать
 #     сессию прямо в репозитории (репо само делает commit/rollback).
+#   • unit_of_work() — опциональный режим «одна сессия/транзакция на запрос»: пока он открыт,
+#     все репозитории берут общую сессию из contextvar (session_scope), а commit выполняется один раз в конце.
+#   • Учёт изменённых таблиц: события сессии запоминают, в какие таблицы шла запись, и после
+#     commit вызывают зарегистрированные хуки (on_tables_committed) — так, например, кэш запросов
+#     узнаёт, какие его записи устарели (см. infrastructure/query_cache.py).
 #   • init_db() — «пинг» БД на старте (проверка, что подключение живо).
 #   • dispose_db() — корректное закрытие пула при остановке приложения.
 #
@@ -20,8 +25,14 @@
 
 from __future__ import annotations  # Позволяет использовать аннотации типов из будущих версий Python (отложенная оценка типов)
 
-from typing import AsyncGenerator        # Тип для обозначения асинхронного генератора (используем в get_session)
-from sqlalchemy import text             # Функция text() — чтобы выполнять сырые SQL-выражения вроде "SELECT 1"
+import asyncio                           # Lock: общая сессия unit-of-work не терпит параллельных запросов
+from contextlib import asynccontextmanager  # Декоратор для async with-контекстов (unit_of_work, session_scope)
+from contextvars import ContextVar       # Контекстная переменная: общая сессия текущего запроса
+from typing import (                     # Аннотации типов
+    Any, AsyncContextManager, AsyncGenerator, AsyncIterator, Awaitable, Callable, List, Optional, Set,
+)
+from sqlalchemy import event, inspect as sa_inspect, text  # События сессии, интроспекция ORM-объектов, сырой SQL ("SELECT 1")
+from sqlalchemy.orm import Session      # Синхронный класс сессии — на нём висят события (AsyncSession работает поверх него)
 from sqlalchemy.ext.asyncio import (    # Асинхронные инструменты SQLAlchemy
     AsyncSession,                       # Класс асинхронной сессии (через него выполняем запросы)
     async_sessionmaker,                 # Фабрика, которая создаёт AsyncSession по требованию
@@ -61,6 +72,63 @@ def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
     """Вернуть общую фабрику сессий — используйте её внутри репозиториев."""
     return _sessionmaker
 
+# --- Учёт таблиц, изменённых транзакцией ---
+# session.info["touched_tables"]   — таблицы, в которые писали в текущей (ещё не закоммиченной) транзакции;
+# session.info["committed_tables"] — таблицы, изменения в которых уже закоммичены, но хуки ещё не вызваны.
+
+TablesHook = Callable[[Set[str]], Awaitable[None]]
+_commit_hooks: List[TablesHook] = []
+
+
+def on_tables_committed(hook: TablesHook) -> None:
+    """Зарегистрировать async-хук, который получает имена таблиц, изменённых закоммиченной транзакцией."""
+    _commit_hooks.append(hook)
+
+
+def touch_tables(session: Any, *tables: str) -> None:
+    """
+    Явно отметить запись в таблицы. Нужна там, где событиям её не видно:
+    DML внутри CTE (INSERT ... RETURNING в WITH), вызовы процедур и т.п.
+    """
+    session.info.setdefault("touched_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(state) -> None:
+    # session.execute(insert/update/delete(...)) — и ORM-, и Core-выражения
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            touch_tables(state.session, table.name)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _flush_context) -> None:
+    # Изменения через unit of work ORM (add/setattr/delete): до конца after_flush коллекции ещё заполнены
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        touch_tables(session, *(t.name for t in sa_inspect(obj).mapper.tables))
+
+
+@event.listens_for(Session, "after_commit")
+def _move_touched(session: Session) -> None:
+    touched = session.info.pop("touched_tables", None)
+    if touched:
+        session.info.setdefault("committed_tables", set()).update(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_touched(session: Session) -> None:
+    session.info.pop("touched_tables", None)
+
+
+async def _run_commit_hooks(session: AsyncSession) -> None:
+    """Отдать хукам таблицы, изменённые закоммиченными транзакциями этой сессии."""
+    tables = session.info.pop("committed_tables", None)
+    if tables:
+        for hook in _commit_hooks:
+            await hook(tables)
+
+
 # ВРЕМЕННО: зависимость FastAPI для обратной совместимости.
 # Репозитории теперь сами открывают сессию через get_sessionmaker() и делают commit/rollback внутри своих методов.
 # Этот генератор просто даёт «готовую сессию» на время одного запроса.
@@ -68,6 +136,106 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with _sessionmaker() as session:  # Открываем новую сессию (и гарантированно закроем при выходе из блока)
         yield session                       # Отдаём её наружу (например, в роут), без автоматических commit/rollback
 
+# --- Unit of work: одна сессия (и одно соединение из пула) на весь запрос ---
+# По умолчанию репозитории открывают короткую сессию «на операцию». Внутри unit_of_work()
+# они получают ОБЩУЮ сессию через contextvar: все чтения видят один снимок, все записи
+# уходят в одну транзакцию, а commit выполняется один раз — при выходе из контекста.
+
+class _UnitOfWorkSession:
+    """
+    Обёртка над общей сессией, которую получают репозитории внутри unit_of_work().
+    Репозитории привыкли сами звать commit() — здесь он превращается в flush()
+    (изменения уходят в БД, но транзакция остаётся открытой до конца unit of work).
+    Остальные методы (execute/get/add/refresh/rollback/...) прозрачно проксируются.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def commit(self) -> None:
+        await self._session.flush()
+
+    async def close(self) -> None:
+        # Закрывает сессию только владелец — unit_of_work()
+        return None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+# Общая сессия текущего unit of work (None — режим «сессия на операцию») и замок к ней
+_uow: ContextVar[Optional[tuple[AsyncSession, asyncio.Lock]]] = ContextVar("unit_of_work", default=None)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[AsyncSession]:
+    """
+    Открыть unit of work: одна сессия/транзакция для всех репозиториев внутри блока.
+
+    Использование (в обработчике):
+        async with unit_of_work():
+            await users_repo.update_profile(...)
+            await users_repo.replace_user_skills_by_slugs(...)
+            return await _pack_user(...)
+
+    • Нормальный выход из блока — один commit.
+    • Исключение (в т.ч. HTTPException) — rollback всего, что сделано внутри.
+    • Вложенный unit_of_work() просто переиспользует внешний.
+    """
+    current = _uow.get()
+    if current is not None:
+        yield current[0]
+        return
+
+    async with _sessionmaker() as session:
+        _uow.set((session, asyncio.Lock()))
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            _uow.set(None)
+        await _run_commit_hooks(session)
+
+
+def in_unit_of_work() -> bool:
+    """Открыт ли сейчас unit of work (чтения должны видеть ещё не закоммиченные записи запроса)."""
+    return _uow.get() is not None
+
+
+@asynccontextmanager
+async def _borrow(session: AsyncSession, lock: asyncio.Lock) -> AsyncIterator[AsyncSession]:
+    # Одна AsyncSession не допускает параллельных операций (например, два DataLoader-батча
+    # в одном тике), поэтому доступ к общей сессии сериализуем замком.
+    async with lock:
+        yield _UnitOfWorkSession(session)  # type: ignore[misc]
+
+
+def session_scope(factory: async_sessionmaker[AsyncSession]) -> AsyncContextManager[AsyncSession]:
+    """
+    Сессия для одной операции репозитория:
+      • внутри unit_of_work() — общая сессия запроса (commit → flush, закрытие — за владельцем);
+      • иначе — новая краткоживущая сессия из фабрики (поведение по умолчанию).
+    """
+    current = _uow.get()
+    if current is not None:
+        return _borrow(*current)
+    return _own_session(factory)
+
+
+@asynccontextmanager
+async def _own_session(factory: async_sessionmaker[AsyncSession]) -> AsyncIterator[AsyncSession]:
+    # Обычная краткоживущая сессия; после её закрытия сообщаем хукам о закоммиченных записях
+    # (даже если после commit внутри блока что-то упало)
+    session = factory()
+    try:
+        async with session:
+            yield session
+    finally:
+        await _run_commit_hooks(session)
+
 # Зовём на старте приложения (health-ping).
 # Небольшой запрос "SELECT 1" убеждается, что соединение к БД доступно и параметры верные.
 async def init_db() -> None:
@@ -0,0 +1,255 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/query_cache.py
+# КРАТКО: кэш результатов SELECT-запросов с инвалидацией по тегам (таблицам).
+# ЗАЧЕМ:
+#   • Вместо разовых кэшей в каждом репозитории — один общий механизм в BaseRepository
+#     (см. BaseRepository._cached_rows).
+#   • Ключ записи — скомпилированный SQL + параметры; теги — таблицы, которые запрос читает.
+#   • Запись в таблицу (через любой репозиторий) после commit «поднимает версию» её тега —
+#     все закэшированные запросы по этой таблице становятся недостижимыми.
+# КАК УСТРОЕНО:
+#   • У каждого тега есть счётчик версии. Полный ключ записи = хэш(SQL, параметры, версии тегов).
+#     Инвалидация — это INCR версии: старые записи никто больше не спросит, они доживут до TTL/LRU.
+#   • Таблицы, изменённые транзакцией, собирают события сессии в infrastructure/db.py;
+#     кэш подписан на них через on_tables_committed().
+#   • Бэкенды:
+#       - memory — LRU в памяти процесса (лимит по числу записей, TTL на запись). Версии тегов тоже
+#         локальные, поэтому этот режим годится только для одного воркера;
+#       - redis  — версии тегов и значения в Redis (redis.asyncio или любой совместимый клиент).
+#         Версии читаются из Redis на каждом обращении, поэтому запись в одном воркере
+#         сразу видна всем остальным — устаревших чтений между воркерами нет.
+#       - off    — кэш выключен, запросы идут в БД как обычно.
+#   • Внутри unit_of_work() кэш не используется: чтения должны видеть незакоммиченные записи запроса.
+#   • Записи в БД в обход приложения (psql, миграции) кэш не видит — они проявятся по истечении TTL.
+#   • Значения хранятся как pickle списка строк (dict'ов) — кладите в кэш только Core/колоночные SELECT'ы.
+#     Redis должен быть доверенным: из него читается pickle.
+# =============================================================================
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.sql import util as sql_util
+
+from backend.settings.config import settings
+from backend.infrastructure.db import get_engine, in_unit_of_work, on_tables_committed
+from backend.infrastructure.cache import register_stats
+
+try:  # Redis — опциональная зависимость (нужна только при QUERY_CACHE_BACKEND=redis)
+    import redis.asyncio as aioredis  # type: ignore
+except Exception:  # pragma: no cover - зависит от окружения
+    aioredis = None  # type: ignore
+
+log = logging.getLogger(__name__)
+
+Rows = List[Dict[str, Any]]
+
+
+class CacheBackend(Protocol):
+    """Что нужно от хранилища: значения с TTL и счётчики версий тегов."""
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+    async def tag_versions(self, tags: Sequence[str]) -> List[int]: ...
+    async def bump(self, tags: Iterable[str]) -> None: ...
+
+
+class MemoryBackend:
+    """LRU в памяти процесса: не больше max_entries записей, у каждой свой срок жизни."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def tag_versions(self, tags: Sequence[str]) -> List[int]:
+        return [self._versions.get(t, 0) for t in tags]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        for t in tags:
+            self._versions[t] = self._versions.get(t, 0) + 1
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """
+    Хранилище в Redis (или любом сервере с тем же протоколом):
+      • qc:tag:<таблица> — счётчик версии тега (INCR);
+      • qc:val:<хэш>     — значение, SET ... EX ttl.
+    Общий лимит памяти задаётся на стороне Redis (maxmemory + allkeys-lru).
+    От клиента нужны только get / set(ex=) / mget / incr — в тестах это backend/tests/fake_redis.py.
+    """
+
+    def __init__(self, client: Any, prefix: str = "qc") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.prefix}:val:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(f"{self.prefix}:val:{key}", value, ex=max(1, int(ttl)))
+
+    async def tag_versions(self, tags: Sequence[str]) -> List[int]:
+        if not tags:
+            return []
+        raw = await self.client.mget([f"{self.prefix}:tag:{t}" for t in tags])
+        return [int(v) if v is not None else 0 for v in raw]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        for t in tags:
+            await self.client.incr(f"{self.prefix}:tag:{t}")
+
+
+class QueryCache:
+    """Кэш результатов запросов поверх одного из бэкендов."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        *,
+        ttl: float,
+        max_entry_bytes: int,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0      # Запросы мимо кэша (выключен, unit of work, ошибка бэкенда)
+        self.invalidations = 0
+        self.errors = 0
+
+    async def fetch(
+        self,
+        stmt: Any,
+        load: Callable[[], Awaitable[Rows]],
+        *,
+        tags: Optional[Iterable[str]] = None,
+        ttl: Optional[float] = None,
+    ) -> Rows:
+        """
+        Результат stmt из кэша или из load() (который и выполняет запрос).
+        tags — таблицы, от которых зависит результат; по умолчанию берутся из самого запроса.
+        """
+        if self.backend is None or in_unit_of_work():
+            self.bypassed += 1
+            return await load()
+
+        tag_list = sorted(set(tags) if tags is not None else tables_of(stmt))
+        try:
+            versions = await self.backend.tag_versions(tag_list)
+            key = _cache_key(stmt, tag_list, versions)
+            raw = await self.backend.get(key)
+        except Exception:
+            log.exception("query cache: backend read failed")
+            self.errors += 1
+            self.bypassed += 1
+            return await load()
+
+        if raw is not None:
+            self.hits += 1
+            return pickle.loads(raw)
+
+        self.misses += 1
+        rows = await load()
+        data = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) <= self.max_entry_bytes:
+            try:
+                await self.backend.set(key, data, ttl if ttl is not None else self.ttl)
+            except Exception:
+                log.exception("query cache: backend write failed")
+                self.errors += 1
+        return rows
+
+    async def invalidate(self, tables: Set[str]) -> None:
+        """Поднять версии тегов: все закэшированные запросы по этим таблицам устаревают."""
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.bump(sorted(tables))
+        except Exception:
+            log.exception("query cache: invalidation failed for %s", sorted(tables))
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        out: Dict[str, Any] = {
+            "backend": type(self.backend).__name__ if self.backend else "off",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+        if isinstance(self.backend, MemoryBackend):
+            out.update(size=self.backend.size(), maxsize=self.backend.max_entries, evictions=self.backend.evictions)
+        return out
+
+
+def tables_of(stmt: Any) -> Set[str]:
+    """Имена таблиц, которые читает запрос (включая JOIN'ы и подзапросы)."""
+    names: Set[str] = set()
+    for t in sql_util.find_tables(stmt, check_columns=True, include_aliases=True, include_joins=True):
+        base = getattr(t, "element", t)  # алиас → исходная таблица
+        if isinstance(base, Table):
+            names.add(base.name)
+    return names
+
+
+def _cache_key(stmt: Any, tags: Sequence[str], versions: Sequence[int]) -> str:
+    compiled = stmt.compile(dialect=get_engine().dialect)
+    params = sorted((k, repr(v)) for k, v in compiled.params.items())
+    raw = repr((str(compiled), params, list(zip(tags, versions)))).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _make_backend() -> Optional[CacheBackend]:
+    kind = settings.QUERY_CACHE_BACKEND.lower()
+    if kind == "memory":
+        return MemoryBackend(settings.QUERY_CACHE_MAX_ENTRIES)
+    if kind == "redis":
+        if aioredis is None:
+            raise RuntimeError("QUERY_CACHE_BACKEND=redis requires the 'redis' package")
+        return RedisBackend(aioredis.from_url(settings.REDIS_URL))
+    return None
+
+
+# Один кэш на процесс; подписан на коммиты всех сессий приложения
+query_cache = QueryCache(
+    _make_backend(),
+    ttl=settings.QUERY_CACHE_TTL_SECONDS,
+    max_entry_bytes=settings.QUERY_CACHE_MAX_ENTRY_BYTES,
+)
+on_tables_committed(query_cache.invalidate)
+register_stats("query_cache", query_cache)
@@ -0,0 +1,258 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/team_solver.py
+# КРАТКО: эвристика разбиения участников хакатона на команды (жадный старт + локальный поиск, NumPy).
+# ЗАЧЕМ:
+#   • Организаторам больших хакатонов нужно предложить команды всем, кто ещё без команды:
+#     размеры в [team_members_minimum, team_members_limit], роли не дублируются, навыки
+#     команды покрывают побольше разного.
+# КАК УСТРОЕНО:
+#   • Участник — строка 0/1-матрицы навыков (uint8) и код роли (-1 — роль не указана).
+#     Команда описывается счётчиками: сколько её участников владеет каждым навыком / ролью.
+#   • Ценность команды = COVERAGE_WEIGHT · (различных навыков)
+#                      + ROLE_WEIGHT · (различных ролей) − DUPLICATE_ROLE_PENALTY · (повторов ролей).
+#   • plan_sizes — сколько команд и какого размера (все размеры в [min, max], почти равные).
+#   • greedy — участники по убыванию «редкости» роли и числа навыков; каждый идёт в команду
+#     с наибольшим приростом ценности (прирост считается сразу для всех команд — векторно).
+#   • improve — локальный поиск целевыми ходами: участник с повтором роли или без уникальных
+#     навыков меняется (или переходит) в команду, где его роли нет / его навыков не хватает;
+#     принимаются только улучшения. Работает над любой группой команд, поэтому
+#     сервис раздаёт непересекающиеся группы разным процессам пула и собирает результат.
+# ОСОБЕННОСТИ:
+#   • Чистые функции над массивами (аргументы и результаты пиклуются — для пула процессов).
+# =============================================================================
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+COVERAGE_WEIGHT = 1.0         # За каждый различный навык в команде
+ROLE_WEIGHT = 3.0             # За каждую различную роль в команде
+DUPLICATE_ROLE_PENALTY = 2.0  # За каждого «лишнего» участника с уже занятой ролью
+
+
+def plan_sizes(n: int, min_size: int, max_size: int) -> List[int]:
+    """
+    Размеры команд для n участников: все в [min_size, max_size] и отличаются не более чем на 1.
+    Если ровно так не делится — часть участников остаётся без команды (их меньше max_size).
+    """
+    if min_size < 1 or max_size < min_size:
+        raise ValueError("bad_team_size_bounds")
+    if n < min_size:
+        return []
+    k = -(-n // max_size)  # Меньше команд нельзя: иначе кто-то не влезет
+    if n // k >= min_size:
+        return [n // k + 1] * (n % k) + [n // k] * (k - n % k)
+    # Поровну с учётом минимума не выходит: команды по max_size + одна из остатка, если он ≥ min_size
+    sizes = [max_size] * (n // max_size)
+    if n % max_size >= min_size:
+        sizes.append(n % max_size)
+    return sizes
+
+
+def _team_value(skill_counts: np.ndarray, role_counts: np.ndarray) -> float:
+    dup = role_counts.sum() - np.count_nonzero(role_counts)
+    return (
+        COVERAGE_WEIGHT * np.count_nonzero(skill_counts)
+        + ROLE_WEIGHT * np.count_nonzero(role_counts)
+        - DUPLICATE_ROLE_PENALTY * dup
+    )
+
+
+def _counts(skills: np.ndarray, roles: np.ndarray, members: np.ndarray, n_roles: int) -> Tuple[np.ndarray, np.ndarray]:
+    sk = skills[members].sum(axis=0, dtype=np.int32)
+    r = roles[members]
+    rc = np.bincount(r[r >= 0], minlength=n_roles).astype(np.int32)
+    return sk, rc
+
+
+def greedy(skills: np.ndarray, roles: np.ndarray, sizes: Sequence[int], n_roles: int) -> List[np.ndarray]:
+    """
+    Начальное разбиение: команды размеров sizes (кому не хватило места — ни в одной команде).
+    Возвращает список массивов индексов участников по командам.
+    """
+    n, width = skills.shape
+    k = len(sizes)
+    if k == 0:
+        return []
+    caps = np.asarray(sizes, dtype=np.int32)
+    fill = np.zeros(k, dtype=np.int32)
+    team_skills = np.zeros((k, width), dtype=np.int32)
+    team_roles = np.zeros((k, n_roles), dtype=np.int32)
+    members: List[List[int]] = [[] for _ in range(k)]
+
+    # Порядок: сначала редкие роли (их важнее развести по командам), затем «богатые» навыками
+    role_freq = np.bincount(roles[roles >= 0], minlength=n_roles)
+    rarity = np.where(roles >= 0, role_freq[np.maximum(roles, 0)], n + 1)
+    order = np.lexsort((-skills.sum(axis=1), rarity))
+
+    placed = 0
+    total = int(caps.sum())
+    for a in order:
+        if placed == total:
+            break
+        own = np.flatnonzero(skills[a])
+        gain = COVERAGE_WEIGHT * (team_skills[:, own] == 0).sum(axis=1)
+        if roles[a] >= 0:
+            gain = gain + np.where(team_roles[:, roles[a]] == 0, ROLE_WEIGHT, -DUPLICATE_ROLE_PENALTY)
+        # При равном приросте — в команду, где больше свободных мест (ровнее заполнение)
+        gain = gain + 1e-3 * (caps - fill)
+        gain[fill >= caps] = -np.inf
+        t = int(np.argmax(gain))
+        members[t].append(int(a))
+        fill[t] += 1
+        team_skills[t, own] += 1
+        if roles[a] >= 0:
+            team_roles[t, roles[a]] += 1
+        placed += 1
+    return [np.asarray(m, dtype=np.int64) for m in members]
+
+
+def _values(skill_counts: np.ndarray, role_counts: np.ndarray) -> np.ndarray:
+    """_team_value построчно: для матриц счётчиков (вариант × навыки, вариант × роли)."""
+    dup = role_counts.sum(axis=1) - np.count_nonzero(role_counts, axis=1)
+    return (
+        COVERAGE_WEIGHT * np.count_nonzero(skill_counts, axis=1)
+        + ROLE_WEIGHT * np.count_nonzero(role_counts, axis=1)
+        - DUPLICATE_ROLE_PENALTY * dup
+    )
+
+
+def _weak_members(skills: np.ndarray, roles: np.ndarray, members: List[int], sk: np.ndarray, rc: np.ndarray) -> List[int]:
+    """Кого из команды имеет смысл менять: роль в команде повторяется или уникальных навыков ≤ 1."""
+    out = []
+    for a in members:
+        dup_role = roles[a] >= 0 and rc[roles[a]] > 1
+        unique = int(np.count_nonzero(sk[skills[a] > 0] == 1))
+        if dup_role or unique <= 1:
+            out.append(a)
+    return out
+
+
+def improve(
+    skills: np.ndarray,
+    roles: np.ndarray,
+    teams: List[np.ndarray],
+    min_size: int,
+    max_size: int,
+    n_roles: int,
+    iterations: int,
+    seed: int,
+    targets: int = 8,
+) -> Tuple[List[np.ndarray], int]:
+    """
+    Локальный поиск над группой команд — целевые ходы вместо случайных пар:
+      • кандидаты — «слабые» участники (_weak_members): с повтором роли в своей команде
+        или почти без уникальных навыков;
+      • для кандидата берём targets команд, которым он прибавил бы больше всего
+        (его роли там нет, его навыков там не хватает), и точно оцениваем все обмены
+        с их участниками и переход (если размеры позволяют) — векторно;
+      • принимаем лучший улучшающий ход. iterations — бюджет кандидатов; проходы по
+        кандидатам повторяются, пока находятся улучшения.
+    Возвращает (новые составы, число принятых улучшений).
+    """
+    k = len(teams)
+    if k < 2 or iterations <= 0:
+        return teams, 0
+    rng = np.random.default_rng(seed)
+    members = [list(m) for m in teams]
+    width = skills.shape[1]
+    sk = np.zeros((k, width), dtype=np.int32)
+    rc = np.zeros((k, n_roles), dtype=np.int32)
+    for t in range(k):
+        sk[t], rc[t] = _counts(skills, roles, np.asarray(members[t], dtype=np.int64), n_roles)
+    val = _values(sk, rc)
+    team_of = {a: t for t in range(k) for a in members[t]}
+    role_eye = np.vstack([np.eye(n_roles, dtype=np.int32), np.zeros((1, n_roles), dtype=np.int32)])  # строка -1 — нули
+
+    accepted = 0
+    budget = iterations
+    while budget > 0:
+        candidates = [a for t in range(k) for a in _weak_members(skills, roles, members[t], sk[t], rc[t])]
+        if not candidates:
+            break
+        improved = 0
+        for a in rng.permutation(candidates)[:budget]:
+            budget -= 1
+            t1 = team_of[a]
+            own = np.flatnonzero(skills[a])
+            ra = role_eye[roles[a]]
+            # Какие команды выиграли бы от a больше всего (оценка сверху, без учёта, кого отдадут)
+            gain = COVERAGE_WEIGHT * (sk[:, own] == 0).sum(axis=1)
+            if roles[a] >= 0:
+                gain = gain + np.where(rc[:, roles[a]] == 0, ROLE_WEIGHT, -DUPLICATE_ROLE_PENALTY)
+            gain[t1] = -np.inf
+            best_gain, best = 1e-9, None
+            for t2 in np.argpartition(-gain, min(targets, k - 1) - 1)[:targets]:
+                if t2 == t1:
+                    continue
+                rows = np.asarray(members[t2], dtype=np.int64)
+                base = val[t1] + val[t2]
+                if rows.size:
+                    # Обмен a ↔ b для каждого b из t2 сразу
+                    b_sk, b_rc = skills[rows].astype(np.int32), role_eye[roles[rows]]
+                    v = (
+                        _values(sk[t1] - skills[a] + b_sk, rc[t1] - ra + b_rc)
+                        + _values(sk[t2] + skills[a] - b_sk, rc[t2] + ra - b_rc)
+                        - base
+                    )
+                    j = int(np.argmax(v))
+                    if v[j] > best_gain:
+                        best_gain, best = float(v[j]), (int(t2), int(rows[j]))
+                if len(members[t1]) > min_size and len(members[t2]) < max_size:
+                    # Переход a в t2 без обмена
+                    v = (
+                        _values((sk[t1] - skills[a])[None], (rc[t1] - ra)[None])[0]
+                        + _values((sk[t2] + skills[a])[None], (rc[t2] + ra)[None])[0]
+                        - base
+                    )
+                    if v > best_gain:
+                        best_gain, best = float(v), (int(t2), None)
+            if best is None:
+                continue
+
+            t2, b = best
+            sk[t1] -= skills[a]
+            rc[t1] -= ra
+            sk[t2] += skills[a]
+            rc[t2] += ra
+            members[t1].remove(a)
+            members[t2].append(a)
+            team_of[a] = t2
+            if b is not None:
+                rb = role_eye[roles[b]]
+                sk[t2] -= skills[b]
+                rc[t2] -= rb
+                sk[t1] += skills[b]
+                rc[t1] += rb
+                members[t2].remove(b)
+                members[t1].append(b)
+                team_of[b] = t1
+            val[t1], val[t2] = _values(sk[[t1, t2]], rc[[t1, t2]])
+            improved += 1
+        accepted += improved
+        if not improved:
+            break
+    return [np.asarray(m, dtype=np.int64) for m in members], accepted
+
+
+def objective(skills: np.ndarray, roles: np.ndarray, teams: List[np.ndarray], n_roles: int) -> Dict[str, float]:
+    """Сводка качества разбиения: суммарная ценность и средние по командам."""
+    if not teams:
+        return {"teams": 0, "value": 0.0, "avg_distinct_skills": 0.0, "avg_distinct_roles": 0.0, "duplicate_roles": 0}
+    value = 0.0
+    distinct_sk = distinct_r = dups = 0
+    for m in teams:
+        s_, r_ = _counts(skills, roles, m, n_roles)
+        value += _team_value(s_, r_)
+        distinct_sk += int(np.count_nonzero(s_))
+        distinct_r += int(np.count_nonzero(r_))
+        dups += int(r_.sum() - np.count_nonzero(r_))
+    return {
+        "teams": len(teams),
+        "value": round(float(value), 2),
+        "avg_distinct_skills": round(distinct_sk / len(teams), 2),
+        "avg_distinct_roles": round(distinct_r / len(teams), 2),
+        "duplicate_roles": dups,
+    }
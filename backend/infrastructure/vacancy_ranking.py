@@ -0,0 +1,210 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/vacancy_ranking.py
+# КРАТКО: матрица «анкета × навык» одного хакатона: ранжирование анкет под вакансию и подбор напарников (NumPy).
+# ЗАЧЕМ:
+#   • Капитану нужны лучшие кандидаты на вакансию сразу, а не листание всех анкет хакатона.
+#     Оценка всех анкет — несколько векторных операций над матрицей, без запросов к БД.
+# КАК УСТРОЕНО:
+#   • Строка матрицы — анкета, столбец — skill_id, значение 0/1 (uint8). Справочник навыков
+#     небольшой (сотни), поэтому строка плотная; из неё для вакансии берутся только её столбцы:
+#     matched = M[:, cols].sum(1) — умножение разреженного вектора вакансии на матрицу.
+#   • score = SKILL_WEIGHT · matched/|навыки вакансии| + ROLE_WEIGHT · role_fit,
+#     role_fit: 1 — роль анкеты совпала, 0.5 — роль не указана, 0 — другая роль.
+#   • Напарники (suggest): у кандидата ценятся навыки, которых нет у пользователя
+#     (M > строка пользователя — одно сравнение на всю матрицу), и роль, отличная от его роли.
+#   • Top-k: argpartition по score (O(n)), затем точная сортировка только k лучших
+#     (score DESC, updated_at DESC, id DESC — как и остальные списки анкет).
+#   • Изменения применяются точечно: анкета/навыки владельца — перезапись строки,
+#     удаление — перенос последней строки на место удалённой.
+# ОСОБЕННОСТИ:
+#   • Чистая структура данных: ни БД, ни asyncio. Наполнение и свежесть —
+#     в backend/repositories/vacancy_ranking.py.
+# =============================================================================
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.infrastructure.bitmap_index import to_micros  # updated_at → целые мкс (ключ порядка)
+
+SKILL_WEIGHT = 0.7   # Доля навыков вакансии, которые есть у кандидата
+ROLE_WEIGHT = 0.3    # Совпадение роли анкеты с ролью вакансии
+SUGGEST_SKILL_WEIGHT = 0.6  # Напарники: сколько новых навыков кандидат добавит (к лучшему из кандидатов)
+SUGGEST_ROLE_WEIGHT = 0.4   # Напарники: роль кандидата дополняет роль пользователя
+
+# Строка наполнения: (application_id, user_id, role | None, видима ли анкета, updated_at, skill_ids владельца)
+ApplicantRow = Tuple[int, int, Optional[str], bool, datetime, Sequence[int]]
+
+
+class ApplicantMatrix:
+    """Анкеты одного хакатона: навыки владельцев матрицей + роль/видимость/свежесть столбцами."""
+
+    def __init__(self, capacity: int = 64, width: int = 64) -> None:
+        self.n = 0
+        self._skills = np.zeros((capacity, width), dtype=np.uint8)  # анкета × skill_id
+        self._app_id = np.zeros(capacity, dtype=np.int64)
+        self._user_id = np.zeros(capacity, dtype=np.int64)
+        self._role = np.full(capacity, -1, dtype=np.int16)          # код роли, -1 — не указана
+        self._visible = np.zeros(capacity, dtype=bool)               # published и ещё не в команде
+        self._updated = np.zeros(capacity, dtype=np.int64)           # updated_at анкеты, мкс
+        self._row_of_user: Dict[int, int] = {}                       # user_id -> строка (одна анкета на хакатон)
+        self._role_codes: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, rows: Iterable[ApplicantRow]) -> "ApplicantMatrix":
+        rows = list(rows)
+        width = max((max(sk) for *_, sk in rows if sk), default=0) + 1
+        m = cls(capacity=max(len(rows), 64), width=max(width, 64))
+        for row in rows:
+            m.upsert(*row)
+        return m
+
+    # ---------- изменения ----------
+
+    def _code(self, role: Optional[str]) -> int:
+        if role is None:
+            return -1
+        return self._role_codes.setdefault(role, len(self._role_codes))
+
+    def _ensure(self, rows: int, width: int) -> None:
+        """Ёмкость растёт удвоением — вставка амортизированно O(ширины строки)."""
+        cap, cur_w = self._skills.shape
+        if rows <= cap and width <= cur_w:
+            return
+        new_cap = max(cap, 64)
+        while new_cap < rows:
+            new_cap *= 2
+        new_w = max(cur_w, width)
+        grown = np.zeros((new_cap, new_w), dtype=np.uint8)
+        grown[: self.n, :cur_w] = self._skills[: self.n]
+        self._skills = grown
+        for name, fill in (("_app_id", 0), ("_user_id", 0), ("_role", -1), ("_visible", False), ("_updated", 0)):
+            old = getattr(self, name)
+            if len(old) < new_cap:
+                arr = np.full(new_cap, fill, dtype=old.dtype)
+                arr[: self.n] = old[: self.n]
+                setattr(self, name, arr)
+
+    def upsert(
+        self,
+        app_id: int,
+        user_id: int,
+        role: Optional[str],
+        visible: bool,
+        updated_at: datetime,
+        skill_ids: Sequence[int],
+    ) -> None:
+        """Новая или изменившаяся анкета (или навыки её владельца) — строка целиком."""
+        row = self._row_of_user.get(user_id)
+        if row is None:
+            row = self.n
+            self._ensure(row + 1, 0)
+            self.n += 1
+            self._row_of_user[user_id] = row
+        self._ensure(0, (max(skill_ids) + 1) if skill_ids else 0)
+        self._app_id[row] = app_id
+        self._user_id[row] = user_id
+        self._role[row] = self._code(role)
+        self._visible[row] = visible
+        self._updated[row] = to_micros(updated_at)
+        self._skills[row] = 0
+        if skill_ids:
+            self._skills[row, list(skill_ids)] = 1
+
+    def remove_user(self, user_id: int) -> None:
+        """Анкета удалена: на её место переезжает последняя строка."""
+        row = self._row_of_user.pop(user_id, None)
+        if row is None:
+            return
+        last = self.n - 1
+        if row != last:
+            self._skills[row] = self._skills[last]
+            for arr in (self._app_id, self._user_id, self._role, self._visible, self._updated):
+                arr[row] = arr[last]
+            self._row_of_user[int(self._user_id[row])] = row
+        self.n = last
+
+    # ---------- ранжирование ----------
+
+    def rank(
+        self, skill_ids: Sequence[int], role: Optional[str], *, limit: int, offset: int = 0
+    ) -> Tuple[List[Tuple[int, float, int, bool]], int]:
+        """
+        Лучшие анкеты под вакансию: ([(application_id, score, matched_skills, role_match)], total).
+        В выдачу попадают только видимые анкеты с ненулевым score.
+        """
+        n = self.n
+        cols = sorted({sid for sid in skill_ids if 0 <= sid < self._skills.shape[1]})
+        if cols:
+            matched = self._skills[:n, cols].sum(axis=1, dtype=np.int32)
+            skill_part = matched * (SKILL_WEIGHT / len(set(skill_ids)))
+        else:
+            matched = np.zeros(n, dtype=np.int32)
+            skill_part = np.zeros(n)
+
+        roles = self._role[:n]
+        code = self._role_codes.get(role, -2) if role is not None else -2  # -2 — ни с чем не совпадёт
+        role_match = roles == code
+        role_fit = np.where(role_match, 1.0, np.where(roles == -1, 0.5, 0.0))
+        score = skill_part + ROLE_WEIGHT * role_fit
+        score[~self._visible[:n]] = 0.0
+
+        top, total = self._top(score, limit=limit, offset=offset)
+        return [
+            (int(self._app_id[i]), float(score[i]), int(matched[i]), bool(role_match[i]))
+            for i in top
+        ], total
+
+    def suggest(
+        self, user_id: int, *, limit: int, offset: int = 0
+    ) -> Tuple[List[Tuple[int, float, int, bool]], int]:
+        """
+        Напарники для владельца анкеты user_id:
+        ([(application_id, score, new_skills, complementary_role)], total).
+          • new_skills — сколько навыков кандидата нет у пользователя (что кандидат «добавит» команде);
+          • роль: другая — 1, у кого-то не указана — 0.5, та же — 0.
+        score = SUGGEST_SKILL_WEIGHT · new_skills / max(new_skills) + SUGGEST_ROLE_WEIGHT · роль,
+        max(new_skills) — по видимым кандидатам (без самого пользователя).
+        """
+        row = self._row_of_user.get(user_id)
+        if row is None:
+            return [], 0
+        n = self.n
+        # У кандидата 1, у пользователя 0 — одно сравнение всей матрицы со строкой пользователя
+        gain = (self._skills[:n] > self._skills[row]).sum(axis=1, dtype=np.int32)
+        # Нормируем только по тем, кого покажем: скрытые/вступившие и сам пользователь шкалу не растягивают
+        eligible = self._visible[:n].copy()
+        eligible[row] = False
+        best = int(gain[eligible].max()) if eligible.any() else 0
+
+        roles, mine = self._role[:n], self._role[row]
+        complementary = (roles != mine) & (roles != -1) & (mine != -1)
+        role_fit = np.where(complementary, 1.0, np.where((roles == -1) | (mine == -1), 0.5, 0.0))
+        score = SUGGEST_SKILL_WEIGHT * gain / max(best, 1) + SUGGEST_ROLE_WEIGHT * role_fit
+        score[~eligible] = 0.0
+
+        top, total = self._top(score, limit=limit, offset=offset)
+        return [
+            (int(self._app_id[i]), float(score[i]), int(gain[i]), bool(complementary[i]))
+            for i in top
+        ], total
+
+    def _top(self, score: np.ndarray, *, limit: int, offset: int) -> Tuple[np.ndarray, int]:
+        """Строки с score > 0: страница [offset, offset+limit) по (score, updated_at, id) DESC и их число."""
+        candidates = np.flatnonzero(score > 0)
+        total = int(candidates.size)
+        k = offset + limit
+        if k <= 0 or total == 0:
+            return candidates[:0], total
+        if total > k:
+            # k-й по величине score — граница; всё, что не хуже неё, досортируем точно (ничьи не теряем)
+            border = np.partition(score[candidates], total - k)[total - k]
+            candidates = candidates[score[candidates] >= border]
+        order = np.lexsort((-self._app_id[candidates], -self._updated[candidates], -score[candidates]))
+        return candidates[order][offset:k], total
+
+    def stats(self) -> Dict[str, int]:
+        return {"applications": self.n, "matrix_bytes": int(self._skills[: self.n].nbytes)}
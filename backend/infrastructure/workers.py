@@ -0,0 +1,56 @@
+# =============================================================================
+# ФАЙЛ: backend/infrastructure/workers.py
+# КРАТКО: общий пул процессов для CPU-тяжёлой работы (сборка индексов/матриц в памяти).
+# ЗАЧЕМ:
+#   • Сборка битового индекса навыков или матрицы анкет — чистый Python/NumPy на сотни
+#     миллисекунд. В event loop это замораживает все запросы воркера; в потоке — всё равно
+#     делит GIL с обработкой запросов. Отдельные процессы считают параллельно по-настоящему.
+# ОСОБЕННОСТИ:
+#   • run_cpu(fn, *args) — await результата; fn и аргументы должны пикловаться
+#     (функция уровня модуля, списки/кортежи, а не генераторы).
+#   • Пул создаётся лениво, процессы стартуют через spawn (fork из процесса с работающим
+#     event loop и открытыми соединениями небезопасен).
+#   • CPU_POOL_WORKERS=0 — без процессов: fn выполняется в потоке (asyncio.to_thread).
+#   • shutdown_cpu_pool() — в хуке остановки приложения.
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from backend.settings.config import settings
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.CPU_POOL_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.CPU_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any) -> T:
+    """Выполнить fn(*args) вне event loop: в пуле процессов (или в потоке, если пул выключен)."""
+    pool = _get_pool()
+    if pool is None:
+        return await asyncio.to_thread(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+def shutdown_cpu_pool() -> None:
+    """Остановить пул (незавершённые задачи отменяются)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
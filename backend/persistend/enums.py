@@ -65,3 +65,17 @@ class AchievementPlace(str, Enum):
     secondPlace = "secondPlace"
     thirdPlace  = "thirdPlace"
     finalyst    = "finalyst"
+
+class TeamStatus(str, Enum):
+    forming = "forming"
+    ready   = "ready"
+
+class VacancyStatus(str, Enum):
+    open   = "open"
+    closed = "closed"
+
+class InviteStatus(str, Enum):
+    pending  = "pending"
+    accepted = "accepted"
+    rejected = "rejected"
+    expired  = "expired"
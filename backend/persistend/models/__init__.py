@@ -1,7 +1,8 @@
 from backend.persistend.base import Base
-from .users import User
+from .users import User, UserProfileDoc
 from .hackathon import Hackathon
-from .application import Application
+from .application import Application, ApplicationCard
+from .team import Team, TeamMember, Vacancy
 
-__all__ = ["Base", "User", "Hackathon", "Application"]
+__all__ = ["Base", "User", "UserProfileDoc", "Hackathon", "Application", "ApplicationCard", "Team", "TeamMember", "Vacancy"]
 
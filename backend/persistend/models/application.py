@@ -5,6 +5,8 @@
 #   • Хранит анкеты пользователей на хакатоны (одна анкета на (hackathon_id, user_id)).
 #   • Фиксирует роль и статус видимости анкеты; факты вступления в команду.
 #   • created_at/updated_at берём из TimestampMixin.
+#   • ApplicationCard — материализованная карточка анкеты (таблица application_card,
+#     поддерживается триггерами БД, см. initdb_db/05b_application_cards.sql); только чтение.
 # =============================================================================
 
 from __future__ import annotations # Разрешает отложенную оценку аннотаций типов (удобно для ORM и старых Python)
@@ -15,6 +17,10 @@ from sqlalchemy import ( # Импортируем типы колонок и о
     # UniqueConstraint — ограничение уникальности на уровне таблицы
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship # Инструменты SQLAlchemy для декларативного описания полей модели
+from sqlalchemy import Integer, Text, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from backend.persistend.base import Base, TimestampMixin # Наш общий Base и миксин с таймстемпами (created_at/updated_at)
 from backend.persistend.enums import RoleType, ApplicationStatus # Импорт enumов, которые маппятся на типы role_type и application_status в БД
@@ -88,3 +94,31 @@ class Application(Base, TimestampMixin): # Наследуемся от Base (р
         UniqueConstraint("hackathon_id", "user_id", name="app_unique_per_hack"),
     )
     # На уровне БД: нельзя создать две анкеты одного и того же user’а на один и тот же hackathon.
+
+
+# -----------------------------------------------------------------------------
+# МАТЕРИАЛИЗОВАННАЯ КАРТОЧКА АНКЕТЫ (только чтение)
+# -----------------------------------------------------------------------------
+class ApplicationCard(Base):
+    """
+    Строка application_card: анкета + username/имя владельца + его навыки + дата окончания
+    регистрации хакатона — ровно то, что отдаёт API. Пишут её только триггеры БД
+    (в той же транзакции, что и изменение источника), приложение только читает.
+    """
+    __tablename__ = "application_card"
+
+    id: Mapped[int] = mapped_column("application_id", Integer, primary_key=True)  # = application.id
+    hackathon_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    role: Mapped[RoleType | None] = mapped_column(Enum(RoleType, name="role_type"), nullable=True)
+    status: Mapped[ApplicationStatus] = mapped_column(Enum(ApplicationStatus, name="application_status"), nullable=False)
+    joined: Mapped[bool] = mapped_column(Boolean, nullable=False)
+
+    username: Mapped[Optional[str]] = mapped_column(Text)
+    first_name: Mapped[Optional[str]] = mapped_column(Text)
+    last_name: Mapped[Optional[str]] = mapped_column(Text)
+    skills: Mapped[List[Dict[str, Any]]] = mapped_column(JSONB, nullable=False)  # [{id, slug, name}] по имени
+
+    registration_end_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)  # = application.updated_at
@@ -0,0 +1,57 @@
+# =============================================================================
+# ФАЙЛ: backend/persistend/models/team.py
+# КРАТКО: ORM-модели "team", "team_member" и "vacancy" (SQLAlchemy 2.x, Mapped / mapped_column).
+# ЗАЧЕМ:
+#   • Команда хакатона (капитан, статус), её участники и вакансии (роль + желаемые навыки).
+#   • Таблицы создаются initdb-скриптами (02_tables_core.sql), модели их только описывают.
+# ОСОБЕННОСТИ:
+#   • vacancy.skills — JSONB-массив slug'ов навыков (["python", "fastapi"]);
+#     для совместимости допускаются и id навыков, и объекты {"slug": ...} / {"id": ...}.
+# =============================================================================
+
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Text, Boolean, Enum, ForeignKey, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from backend.persistend.base import Base, TimestampMixin
+from backend.persistend.enums import RoleType, TeamStatus, VacancyStatus
+
+
+class Team(Base, TimestampMixin):
+    __tablename__ = "team"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    hackathon_id: Mapped[int] = mapped_column(Integer, ForeignKey("hackathon.id", ondelete="CASCADE"), nullable=False)
+    captain_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+
+    name: Mapped[str] = mapped_column(Text, nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    is_private: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True, default=False)
+    status: Mapped[TeamStatus] = mapped_column(Enum(TeamStatus, name="team_status"), nullable=False, default=TeamStatus.forming)
+
+
+class TeamMember(Base):
+    __tablename__ = "team_member"
+
+    # Составной PK (team_id, user_id); «одна команда на хакатон» проверяет триггер trg_one_team_per_hack
+    team_id: Mapped[int] = mapped_column(Integer, ForeignKey("team.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    role: Mapped[RoleType] = mapped_column(Enum(RoleType, name="role_type"), nullable=False)
+    is_captain: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    joined_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class Vacancy(Base, TimestampMixin):
+    __tablename__ = "vacancy"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    team_id: Mapped[int] = mapped_column(Integer, ForeignKey("team.id", ondelete="CASCADE"), nullable=False)
+
+    role: Mapped[RoleType] = mapped_column(Enum(RoleType, name="role_type"), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    skills: Mapped[Optional[List[Any]]] = mapped_column(JSONB, nullable=True, default=list)
+    status: Mapped[VacancyStatus] = mapped_column(Enum(VacancyStatus, name="vacancy_status"), nullable=False, default=VacancyStatus.open)
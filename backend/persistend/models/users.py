@@ -5,6 +5,8 @@
 #   • Хранит учётные записи пользователей (включая telelgram_id и профиль).
 #   • Даёт типобезопасный доступ к данным через ORM (вместо «сырого» SQL).
 #   • Автоматически ведёт created_at/updated_at через TimestampMixin.
+#   • UserProfileDoc — готовый JSON профиля (таблица user_profile_doc, поддерживается
+#     триггерами БД, см. initdb_db/05c_user_profile_doc.sql); только чтение.
 #
 # КОНЦЕПТЫ (если вы впервые в бэкенде/БД):
 #   • Модель — это Python-класс, описывающий таблицу и её столбцы.
@@ -15,6 +17,10 @@
 from __future__ import annotations  # Разрешает отложенную оценку аннотаций типов (удобно для ORM и старых Python)
 
 from sqlalchemy import BigInteger, Text, Integer            # Типы столбцов: BigInteger (для BIGINT/BIGSERIAL), Text — произвольной длины
+from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from typing import Any, Dict
 from sqlalchemy.orm import Mapped, mapped_column, relationship   # Инструменты SQLAlchemy для декларативного описания полей модели
 
 from backend.persistend.base import Base, TimestampMixin  # Наш общий Base и миксин с таймстемпами (created_at/updated_at)
@@ -58,3 +64,19 @@ class User(Base, TimestampMixin):                 # Наследуемся от
         passive_deletes=True,         # Не трогать связанные анкеты в ORM при удалении пользователя —
                                       # доверяем БД и ON DELETE CASCADE в внешнем ключе (user_id)
     )
+
+
+# -----------------------------------------------------------------------------
+# ДЕНОРМАЛИЗОВАННЫЙ ПРОФИЛЬ (только чтение)
+# -----------------------------------------------------------------------------
+class UserProfileDoc(Base):
+    """
+    Строка user_profile_doc: doc — ответ профиля целиком (поля users + skills + achievements),
+    version — растёт при каждом изменении doc (ETag). Пишут её только триггеры БД.
+    """
+    __tablename__ = "user_profile_doc"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    doc: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
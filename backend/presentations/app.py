@@ -5,7 +5,8 @@
 #   • Включает CORS (какие фронтенды могут стучаться к API).
 #   • Добавляет middleware для измерения времени обработки запроса.
 #   • Подключает роутеры (system, auth, users).
-#   • На старте пингует БД (init_db), на выключении корректно закрывает пул (dispose_db).
+#   • На старте пингует БД (init_db), загружает справочник навыков и (если включён) запускает
+#     сборку индекса навыков для поиска людей, на выключении корректно закрывает пул (dispose_db).
 # КОМУ ПОЛЕЗНО:
 #   • Точка входа в приложение — сюда заглядывают, чтобы понять, какие части API доступны
 #     и какая инициализация выполняется при запуске.
@@ -13,10 +14,14 @@
 
 from __future__ import annotations  # Современные аннотации типов (отложенная оценка — удобнее для импорта)
 import time                         # Замер времени обработки запросов
-from fastapi import FastAPI, Request               # FastAPI-приложение и объект запроса
+from fastapi import FastAPI, Request, Depends      # FastAPI-приложение, объект запроса и зависимости
 from fastapi.middleware.cors import CORSMiddleware # CORS-мидлварь (контроль доступа со сторонних доменов)
 from backend.settings.config import settings       # Настройки приложения (имя, версия, CORS-источники и т.п.)
 from backend.infrastructure.db import init_db, dispose_db  # Инициализация/закрытие подключения к БД
+from backend.infrastructure.workers import shutdown_cpu_pool  # Пул процессов для сборки индексов в памяти
+from backend.infrastructure.dataloader import request_loaders  # Request-scoped DataLoader'ы (батчинг get_by_id и т.п.)
+from backend.repositories.skills import SkillsRepo  # Справочник навыков в памяти (прогреваем на старте)
+from backend.repositories.skill_index import SkillIndexRepo  # Битовый индекс навыков (собираем фоном на старте)
 from backend.presentations.routers.system import router as system_router  # Системные ручки (/system)
 from backend.presentations.routers.auth import router as auth_router      # Авторизация (/auth)
 from backend.presentations.routers.users import router as users_router    # Пользователи (/users)
@@ -34,6 +39,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=getattr(settings, "APP_NAME", "MiniApp API"),
         version=getattr(settings, "APP_VERSION", "0.1.0"),
+        # На каждый запрос — свой реестр DataLoader'ов: репозитории склеивают точечные выборки в батчи
+        dependencies=[Depends(request_loaders)],
     )
     
     allowed_origins = settings.CORS_ORIGINS_LIST()
@@ -66,14 +73,18 @@ def create_app() -> FastAPI:
     app.include_router(hack_router)     # /hackathons: чтение списка/деталей (минимум)
     app.include_router(applications_router)     # /hackathons/{id}/applications, /me/applications
 
-    # Хук старта приложения: проверяем доступность БД (health-ping)
+    # Хук старта приложения: проверяем доступность БД (health-ping) и загружаем справочник навыков
     @app.on_event("startup")
     async def _startup():
         await init_db()
+        await SkillsRepo().catalog()
+        if settings.SKILL_INDEX_ENABLED:
+            SkillIndexRepo().start_rebuild()  # Фоном: пока индекс собирается, поиск идёт через SQL
 
-    # Хук остановки приложения: корректно закрываем пул соединений к БД
+    # Хук остановки приложения: корректно закрываем пул соединений к БД и пул процессов
     @app.on_event("shutdown")
     async def _shutdown():
         await dispose_db()
+        shutdown_cpu_pool()
 
     return app
@@ -0,0 +1,67 @@
+# =============================================================================
+# ФАЙЛ: backend/presentations/dependencies.py
+# КРАТКО: общие FastAPI-зависимости роутеров — сейчас это аутентификация по JWT.
+# ЗАЧЕМ:
+#   • get_current_user_id раньше был скопирован в users.py и achievements.py; теперь он один.
+#   • Секрет JWT читаем один раз при импорте (settings.JWT_SECRET), а не os.getenv на каждый запрос.
+#   • Уже проверенные токены держим в LRU-кэше: token -> (user_id, exp). Повторный запрос с тем же
+#     токеном не пересчитывает HMAC и не разбирает JSON; срок действия (exp) проверяется всегда.
+#     Статистика кэша (hit rate) — в GET /system/cache под именем "auth.tokens".
+# =============================================================================
+
+from __future__ import annotations
+
+import time                                       # Проверка exp закэшированного токена
+from typing import Tuple
+
+from fastapi import Header, HTTPException, status
+
+from backend.settings.config import settings      # JWT_SECRET и размеры кэша
+from backend.infrastructure.cache import TTLCache  # LRU + TTL со счётчиками hits/misses
+from backend.utils import jwt_simple              # Проверка подписи и разбор JWT
+
+# Секрет читаем один раз — тем же источником, что и при выдаче токена (AuthTelegramService)
+_JWT_SECRET: str = settings.JWT_SECRET or "dev-secret-change-me"
+
+# Проверенные токены: token -> (user_id, exp). TTL кэша лишь ограничивает «срок хранения»,
+# истечение самого токена проверяется отдельно по exp.
+_verified: TTLCache[str, Tuple[int, int]] = TTLCache(
+    "auth.tokens",
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+def _verify(token: str) -> int:
+    """user_id из токена: из кэша, а при промахе — полная проверка подписи и payload."""
+    hit = _verified.get(token)
+    if hit is not None:
+        user_id, exp = hit
+        if int(time.time()) <= exp:
+            return user_id
+        _verified.invalidate(token)  # Токен истёк — забываем и отвечаем как на невалидный
+        raise ValueError("token expired")
+
+    payload = jwt_simple.decode(token, _JWT_SECRET)  # ValueError при неверной подписи/просрочке
+    user_id = int(payload["sub"])
+    _verified.set(token, (user_id, int(payload.get("exp", 0))))
+    return user_id
+
+
+async def get_current_user_id(authorization: str | None = Header(default=None)) -> int:
+    """
+    Достаём user_id из заголовка Authorization: Bearer <JWT>.
+    Если заголовка нет или токен невалиден — бросаем 401.
+    """
+    # Проверяем, что заголовок есть и начинается с 'Bearer '
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing token")
+
+    # Забираем сам токен после пробела
+    token = authorization.split(" ", 1)[1]
+
+    try:
+        return _verify(token)
+    except Exception:
+        # Любая ошибка проверки токена — это 401
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token")
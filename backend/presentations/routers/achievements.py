@@ -6,44 +6,29 @@
 #   • Списки достижений: мои, любого пользователя, по хакатону.
 #   • Агрегаты по хакатону (пример: распределение по place).
 # ОСОБЕННОСТИ:
-#   • Авторизация по JWT (как в users.py): достаём user_id из Bearer-токена.
+#   • Авторизация по JWT: общая зависимость get_current_user_id (presentations/dependencies.py).
 #   • Репозиторий AchievementsRepo сам открывает асинхронные сессии per-operation.
-#   • Ответы — Pydantic-модели. Пагинация как в /users/search (items/total/limit/offset).
+#   • Ответы — Pydantic-модели. Пагинация как в /users/search (items/total/limit/offset/next_cursor).
 # =============================================================================
 
 from __future__ import annotations
 
-import os
 from typing import Optional, List
 
 from fastapi import (
-    APIRouter, Depends, HTTPException, Header, Query, Path, status
+    APIRouter, Depends, HTTPException, Query, Path, status
 )
 from pydantic import BaseModel, Field
 
 from backend.repositories.achievements import AchievementsRepo
-from backend.utils import jwt_simple
+from backend.repositories.base import TotalMode  # Режим подсчёта total: exact / estimate / none
+from backend.presentations.dependencies import get_current_user_id
+from backend.utils.cursor import CursorError  # Битый/чужой cursor → 400
 from backend.persistend.models import achievement as m_ach
 
 router = APIRouter(prefix="/achievements", tags=["achievements"])
 ach_repo = AchievementsRepo()
 
-# ---- Аутентификация (JWT -> user_id) ----
-
-async def get_current_user_id(authorization: str | None = Header(default=None)) -> int:
-    """
-    Достаём user_id из заголовка Authorization: Bearer <JWT>.
-    Совместимо по поведению с роутером users.py.
-    """
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing token")
-    token = authorization.split(" ", 1)[1]
-    try:
-        payload = jwt_simple.decode(token, os.getenv("JWT_SECRET", "dev-secret-change-me"))
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token")
-    return int(payload["sub"])
-
 # ---- Схемы (Pydantic) ----AchievPlace
 
 class AchievementOut(BaseModel):
@@ -91,16 +76,23 @@ async def list_my_achievements(
     place: Optional[m_ach.AchievementPlace] = Query(default=None),
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы (вместо offset)"),
+    total_mode: TotalMode = Query(default="exact", alias="total", description="exact | estimate | none"),
     current_user_id: int = Depends(get_current_user_id),
 ):
     """
     Список моих достижений с фильтрами по роли/месту.
-    Пагинация: items/total/limit/offset.
+    Пагинация: items/total/limit/offset/next_cursor (cursor — keyset вместо offset).
+    total: exact по умолчанию — у пользователя немного достижений, окно count(*) OVER () почти бесплатно.
     """
-    items, total = await ach_repo.list_by_user(
-        current_user_id, role=role, place=place, limit=limit, offset=offset
-    )
-    return {"items": _pack_many(items), "total": total, "limit": limit, "offset": offset}
+    try:
+        items, total, next_cursor = await ach_repo.list_by_user(
+            current_user_id, role=role, place=place, limit=limit, offset=offset, cursor=cursor,
+            total_mode=total_mode,
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": _pack_many(items), "total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
 
 # ---- Роуты: по пользователю ----
 
@@ -111,16 +103,22 @@ async def list_user_achievements(
     place: Optional[m_ach.AchievementPlace] = Query(default=None),
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы (вместо offset)"),
+    total_mode: TotalMode = Query(default="exact", alias="total", description="exact | estimate | none"),
     _current_user_id: int = Depends(get_current_user_id),
 ):
     """
     Список достижений произвольного пользователя.
     Требует валидный JWT, но не требует, чтобы user_id совпадал с субъктом токена.
     """
-    items, total = await ach_repo.list_by_user(
-        user_id, role=role, place=place, limit=limit, offset=offset
-    )
-    return {"items": _pack_many(items), "total": total, "limit": limit, "offset": offset}
+    try:
+        items, total, next_cursor = await ach_repo.list_by_user(
+            user_id, role=role, place=place, limit=limit, offset=offset, cursor=cursor,
+            total_mode=total_mode,
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": _pack_many(items), "total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
 
 # ---- Роуты: по хакатону ----
 
@@ -136,7 +134,7 @@ async def list_user_achievements(
 #     """
 #     Список достижений по хакатону.
 #     """
-#     items, total = await ach_repo.list_by_hackathon(
+#     items, total, next_cursor = await ach_repo.list_by_hackathon(
 #         hack_id, role=role, place=place, limit=limit, offset=offset
 #     )
 #     return {"items": _pack_many(items), "total": total, "limit": limit, "offset": offset}
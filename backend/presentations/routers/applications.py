@@ -5,11 +5,16 @@
 # ЗАЧЕМ НУЖЕН:
 #   • Позволяет пользователю создать/посмотреть/обновить свою анкету на конкретном хакатоне.
 #   • Даёт другим пользователям/капитанам список анкет по хакатону с простыми фильтрами.
-#   • Возвращает «карточку анкеты», собранную из нескольких таблиц:
+#   • Капитану — анкеты хакатона, ранжированные под вакансию его команды
+#     (GET /vacancies/{id}/applications, см. repositories/vacancy_ranking.py),
+#     и участнику — подходящих напарников (GET /hackathons/{id}/applications/me/suggestions).
+#   • Возвращает «карточку анкеты» из нескольких таблиц:
 #       - application: id, hackathon_id, user_id, role
 #       - users: username, first_name, last_name
 #       - user_skill/skill: skills[]
 #       - hackathon: registration_end_date
+#     Карточки материализованы в application_card (поддерживают триггеры БД), поэтому
+#     роутер их не собирает, а только читает: страница списка — один индексный запрос.
 #
 # ОСОБЕННОСТИ:
 #   • Аутентификация через JWT (get_current_user_id) — без токена/с битым токеном сюда не попасть.
@@ -18,9 +23,14 @@
 #   • skills в карточке подтягиваются из профиля (user_id), отдельно от анкеты (MVP).
 #   • Ответы типизированы Pydantic-схемами — это видно во /docs (Swagger).
 #
+# УСЛОВНЫЕ GET:
+#   • GET-ручки карточек отдают ETag и отвечают 304 на If-None-Match.
+#   • ETag — хэш готовых карточек (экономим трафик и рендер на клиенте, запрос к БД тот же).
+#
 # ПАГИНАЦИЯ:
 #   • Списки возвращают объект-обёртку:
-#       { "items": [...], "limit": X, "offset": Y }
+#       { "items": [...], "limit": X, "offset": Y, "next_cursor": "..." | null }
+#   • Вместо offset можно передать cursor=<next_cursor> — keyset-пагинация (utils/cursor.py).
 #
 # ДОГОВОР С ФРОНТОМ (ApplicationCardOut):
 #   • id, hackathon_id, user_id, role
@@ -33,16 +43,24 @@ from __future__ import annotations # Отложенная оценка анно
 
 
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query, status # FastAPI-примитивы
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status # FastAPI-примитивы
 from pydantic import BaseModel, Field # Pydantic-схемы для валидации/документации
 
 # Зависимость, которая по JWT-токену достаёт user_id (используется во всех ручках)
-from backend.presentations.routers.users import get_current_user_id
+from backend.presentations.dependencies import get_current_user_id
 
 # Репозитории — слой доступа к БД
 from backend.repositories.users import UsersRepo
 from backend.repositories.hackathons import HackathonsRepo
 from backend.repositories.applications import ApplicationsRepo
+from backend.repositories.vacancy_ranking import VacancyRankingRepo  # Подбор анкет под вакансию (матрица в памяти)
+
+# ETag / 304 для GET-ручек
+from backend.utils.http_cache import make_etag, is_not_modified, not_modified, set_cache_headers
+from backend.utils.cursor import CursorError  # Битый/чужой cursor → 400
+
+# Unit of work: одна сессия/транзакция на составные мутации (POST/PATCH анкеты)
+from backend.infrastructure.db import unit_of_work
 
 # Enum-типы ролей и статуса анкеты (должны совпадать с ENUM в БД)
 from backend.persistend.enums import RoleType, ApplicationStatus
@@ -56,6 +74,7 @@ router = APIRouter(tags=["applications"])
 users_repo = UsersRepo()
 hacks_repo = HackathonsRepo()
 apps_repo  = ApplicationsRepo()
+ranking_repo = VacancyRankingRepo()
 
 # ---- СХЕМЫ ----
 
@@ -86,6 +105,18 @@ class ApplicationCardOut(BaseModel):
     skills: List[SkillOut] = Field(default_factory=list)
     registration_end_date: Optional[str] = None  # ISO-строка
 
+class RankedApplicationOut(ApplicationCardOut):
+    """Карточка анкеты в подборе под вакансию: + оценка соответствия."""
+    score: float            # 0..1: доля навыков вакансии (вес 0.7) + совпадение роли (вес 0.3)
+    matched_skills: int     # Сколько навыков вакансии есть у владельца анкеты
+    role_match: bool        # Роль анкеты совпала с ролью вакансии
+
+class SuggestionOut(ApplicationCardOut):
+    """Карточка анкеты в подборе напарников: + оценка того, насколько кандидат меня дополняет."""
+    score: float              # 0..1: новые навыки (вес 0.6) + дополняющая роль (вес 0.4)
+    new_skills: int           # Сколько навыков кандидата нет у меня
+    complementary_role: bool  # Роль кандидата указана и отличается от моей
+
 class ApplicationCreateIn(BaseModel):
     """Тело POST: создать анкету на хакатон."""
     role: Optional[RoleType] = None
@@ -97,47 +128,61 @@ class ApplicationPatchIn(BaseModel):
 
 # ---- ВСПОМОГАТЕЛЬНАЯ СБОРКА КАРТОЧКИ ----
 
+def _card_out(card) -> ApplicationCardOut:
+    """Строка application_card (ApplicationCard) → схема ответа; без запросов к БД."""
+    return ApplicationCardOut(
+        id=card.id,
+        hackathon_id=card.hackathon_id,
+        user_id=card.user_id,
+        role=card.role,
+        username=card.username,
+        first_name=card.first_name,
+        last_name=card.last_name,
+        skills=[SkillOut(**sk) for sk in card.skills],
+        registration_end_date=card.registration_end_date.isoformat() if card.registration_end_date else None,
+    )
+
+
+async def _pack_application_cards(app_objs) -> List[ApplicationCardOut]:
+    """
+    Карточки для списка ORM-объектов Application (порядок сохраняется) — один запрос к application_card.
+    """
+    return await _pack_cards_by_ids([a.id for a in app_objs])
+
+
+async def _pack_cards_by_ids(app_ids: List[int]) -> List[ApplicationCardOut]:
+    """
+    То же по списку id анкет (порядок сохраняется). Анкеты, удалённые между поиском
+    и этим запросом, просто не попадут в выдачу (карточка удаляется каскадом вместе с анкетой).
+    """
+    return [_card_out(card) for card in await apps_repo.get_cards(app_ids)]
+
+
 async def _pack_application_card(app_obj) -> ApplicationCardOut:
     """
-    Сборка карточки анкеты:
-      • из application: id, hackathon_id, user_id, role
-      • из users: username, first_name, last_name
-      • из user_skill/skill: skills[]
-      • из hackathon: registration_end_date
+    Сборка одной карточки анкеты — через тот же пакетный загрузчик, что и для списков.
+    """
+    cards = await _pack_application_cards([app_obj])
+    if not cards:
+        raise HTTPException(status_code=404, detail="application not found")
+    return cards[0]
 
-    Принимает:
-      • app_obj — ORM-объект Application (из репозитория)
 
-    Возвращает:
-      • ApplicationCardOut — типизированный объект для фронта
+def _conditional_cards(
+    request: Request,
+    response: Response,
+    cards: List[ApplicationCardOut],
+    *extra,
+) -> Optional[Response]:
     """
-    # 1) Владелец анкеты (пользователь)
-    usr = await users_repo.get_by_id(app_obj.user_id)
-    if not usr:
-        # Так быть не должно: FK в БД гарантируют целостность.
-        # Если всё-таки так случилось — это ошибка данных.
-        raise HTTPException(status_code=500, detail="dangling application: user not found")
-
-    # 2) Навыки пользователя (через таблицу user_skill → skill)
-    u_skills = await users_repo.get_user_skills(usr.id)
-    skills_out = [SkillOut(id=s.id, slug=s.slug, name=s.name) for s in u_skills]
-
-    # 3) Хакатон — ради registration_end_date
-    hack = await hacks_repo.get_by_id(app_obj.hackathon_id)
-    reg_end = hack.registration_end_date.isoformat() if (hack and hack.registration_end_date) else None
-
-    # 4) Собираем карточку
-    return ApplicationCardOut(
-        id=app_obj.id,
-        hackathon_id=app_obj.hackathon_id,
-        user_id=app_obj.user_id,
-        role=app_obj.role,
-        username=usr.username,
-        first_name=usr.first_name,
-        last_name=usr.last_name,
-        skills=skills_out,
-        registration_end_date=reg_end,
-    )
+    ETag по содержимому карточек (+ параметры страницы в extra).
+    Вернёт готовый 304-ответ, если клиент уже видел ровно эти карточки; иначе проставит ETag и вернёт None.
+    """
+    etag = make_etag(*extra, *(c.model_dump_json() for c in cards))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    return None
 
 
 # ---- РОУТЫ ----
@@ -145,6 +190,8 @@ async def _pack_application_card(app_obj) -> ApplicationCardOut:
 @router.get("/hackathons/{hackathon_id}/applications", response_model=dict)
 async def list_hackathon_applications(
     hackathon_id: int,
+    request: Request,
+    response: Response,
     role: Optional[RoleType] = Query(
         default=None,
         description="Фильтр по роли (Enum RoleType)",
@@ -155,6 +202,7 @@ async def list_hackathon_applications(
     ),
     limit: int = Query(default=20, ge=1, le=100, description="Размер страницы (пагинация)"),
     offset: int = Query(default=0, ge=0, description="Смещение от начала списка (пагинация)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы (вместо offset)"),
     _me: int = Depends(get_current_user_id),  # Требуем авторизацию, но сам user_id здесь не используем
 ):
     """
@@ -165,36 +213,48 @@ async def list_hackathon_applications(
       • role         — фильтр по Enum-ролям (DevOps/Backend/...); если не задан — не фильтруем.
       • q            — поиск по username/first_name/last_name (регистронезависимый).
       • limit/offset — стандартная пагинация.
+      • cursor       — keyset-пагинация: next_cursor из предыдущего ответа (offset игнорируется).
 
     ВОЗВРАЩАЕТ:
       {
         "items": [ApplicationCardOut, ...],
         "limit": <int>,
-        "offset": <int>
+        "offset": <int>,
+        "next_cursor": <str | null>
       }
     """
-    rows = await apps_repo.search(
-        hackathon_id=hackathon_id,
-        role=role.value if role else None,  # repo ожидает str | None, Enum преобразуем в строку
-        q=q,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        rows, next_cursor = await apps_repo.search(
+            hackathon_id=hackathon_id,
+            role=role.value if role else None,  # repo ожидает str | None, Enum преобразуем в строку
+            q=q,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    # Собираем карточки для каждого ORM-объекта Application
-    items = [await _pack_application_card(r) for r in rows]
+    # Репозиторий уже вернул готовые карточки (application_card) — дочитывать ничего не нужно
+    items = [_card_out(card) for card in rows]
+    not_mod = _conditional_cards(request, response, items, limit, offset, next_cursor)
+    if not_mod is not None:
+        return not_mod
 
     # Возвращаем в виде dict, чтобы явно положить limit/offset и сериализовать Pydantic-объекты
     return {
         "items": [i.model_dump() for i in items],
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
     }
 
 
 @router.get("/hackathons/{hackathon_id}/applications/me", response_model=ApplicationCardOut)
 async def get_my_application_on_hackathon(
     hackathon_id: int,
+    request: Request,
+    response: Response,
     user_id: int = Depends(get_current_user_id),
 ):
     """
@@ -214,13 +274,60 @@ async def get_my_application_on_hackathon(
     if not app:
         raise HTTPException(status_code=404, detail="application not found")
 
-    return await _pack_application_card(app)
+    card = await _pack_application_card(app)
+    not_mod = _conditional_cards(request, response, [card])
+    if not_mod is not None:
+        return not_mod
+    return card
+
+
+@router.get("/hackathons/{hackathon_id}/applications/me/suggestions", response_model=dict)
+async def suggest_teammates(
+    hackathon_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100, description="Сколько кандидатов вернуть"),
+    offset: int = Query(default=0, ge=0, description="Смещение в рейтинге"),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Кого позвать в команду: другие опубликованные анкеты этого хакатона, дополняющие *мою*.
+
+    РАНЖИРОВАНИЕ:
+      • score = 0.6 · new_skills / (максимум new_skills среди кандидатов) + 0.4 · роль,
+        new_skills — навыки кандидата, которых нет у меня;
+        роль: другая — 1, у кого-то не указана — 0.5, та же — 0;
+      • только те, кто ещё не в команде, и только со score > 0; при равенстве — свежие выше.
+
+    ВОЗВРАЩАЕТ:
+      { "items": [SuggestionOut, ...], "total": <int>, "limit": <int>, "offset": <int> }
+      404 — если у меня нет анкеты на этом хакатоне.
+    """
+    mine = await apps_repo.get_by_user_and_hackathon(user_id=user_id, hackathon_id=hackathon_id)
+    if not mine:
+        raise HTTPException(status_code=404, detail="application not found")
+
+    ranked, total = await ranking_repo.suggest(hackathon_id, user_id, limit=limit, offset=offset)
+    cards = {c.id: c for c in await _pack_cards_by_ids([app_id for app_id, *_ in ranked])}
+    items = [
+        SuggestionOut(
+            **cards[app_id].model_dump(), score=round(score, 4), new_skills=gain, complementary_role=complementary
+        )
+        for app_id, score, gain, complementary in ranked
+        if app_id in cards
+    ]
+    not_mod = _conditional_cards(request, response, items, limit, offset, total)
+    if not_mod is not None:
+        return not_mod
+    return {"items": [i.model_dump() for i in items], "total": total, "limit": limit, "offset": offset}
 
 
 @router.get("/hackathons/{hackathon_id}/applications/{user_id}", response_model=ApplicationCardOut)
 async def get_user_application_on_hackathon(
     hackathon_id: int,
     user_id: int,
+    request: Request,
+    response: Response,
     _me: int = Depends(get_current_user_id),
 ):
     """
@@ -242,7 +349,11 @@ async def get_user_application_on_hackathon(
     if not app:
         raise HTTPException(status_code=404, detail="application not found")
 
-    return await _pack_application_card(app)
+    card = await _pack_application_card(app)
+    not_mod = _conditional_cards(request, response, [card])
+    if not_mod is not None:
+        return not_mod
+    return card
 
 
 @router.post(
@@ -265,26 +376,28 @@ async def create_my_application(
       • Если анкета уже существует — 409 Conflict.
       • Если нет — создаём новую и возвращаем её карточку.
     """
-    # Проверяем, не существует ли уже анкеты пользователя на этом хакатоне
-    exists = await apps_repo.get_by_user_and_hackathon(
-        user_id=user_id,
-        hackathon_id=hackathon_id,
-    )
-    if exists:
-        raise HTTPException(
-            status_code=409,
-            detail="application already exists for this hackathon",
+    # Проверка, вставка и сборка карточки — в одной сессии/транзакции (unit of work)
+    async with unit_of_work():
+        # Проверяем, не существует ли уже анкеты пользователя на этом хакатоне
+        exists = await apps_repo.get_by_user_and_hackathon(
+            user_id=user_id,
+            hackathon_id=hackathon_id,
+        )
+        if exists:
+            raise HTTPException(
+                status_code=409,
+                detail="application already exists for this hackathon",
+            )
+
+        # Создаём анкету (репозиторий сам проставит дефолты status/joined)
+        app = await apps_repo.create(
+            user_id=user_id,
+            hackathon_id=hackathon_id,
+            role=payload.role.value if payload.role else None,  # Enum → str
+            skills=None,  # !? навыки не сохраняем в application (MVP), подтягиваем из профиля
         )
 
-    # Создаём анкету (репозиторий сам проставит дефолты status/joined)
-    app = await apps_repo.create(
-        user_id=user_id,
-        hackathon_id=hackathon_id,
-        role=payload.role.value if payload.role else None,  # Enum → str
-        skills=None,  # !? навыки не сохраняем в application (MVP), подтягиваем из профиля
-    )
-
-    return await _pack_application_card(app)
+        return await _pack_application_card(app)
 
 
 @router.patch("/hackathons/{hackathon_id}/applications/me", response_model=ApplicationCardOut)
@@ -304,36 +417,41 @@ async def patch_my_application(
       • Если анкеты нет — 404.
       • Если есть — обновляем только переданные поля (partial update).
     """
-    # Сначала найдём мою анкету на этом хакатоне
-    app = await apps_repo.get_by_user_and_hackathon(
-        user_id=user_id,
-        hackathon_id=hackathon_id,
-    )
-    if not app:
-        raise HTTPException(status_code=404, detail="application not found")
+    # Чтение, обновление и сборка карточки — в одной сессии/транзакции (unit of work)
+    async with unit_of_work():
+        # Сначала найдём мою анкету на этом хакатоне
+        app = await apps_repo.get_by_user_and_hackathon(
+            user_id=user_id,
+            hackathon_id=hackathon_id,
+        )
+        if not app:
+            raise HTTPException(status_code=404, detail="application not found")
 
-    # Превращаем Pydantic-модель в dict, игнорируя неустановленные поля
-    data = payload.model_dump(exclude_unset=True)
+        # Превращаем Pydantic-модель в dict, игнорируя неустановленные поля
+        data = payload.model_dump(exclude_unset=True)
 
-    # Поля role/status — Enum, репозиторий/БД ждут строки → конвертируем
-    if "role" in data and data["role"] is not None:
-        data["role"] = data["role"].value
-    if "status" in data and data["status"] is not None:
-        data["status"] = data["status"].value
+        # Поля role/status — Enum, репозиторий/БД ждут строки → конвертируем
+        if "role" in data and data["role"] is not None:
+            data["role"] = data["role"].value
+        if "status" in data and data["status"] is not None:
+            data["status"] = data["status"].value
 
-    # Отдаём обновление на уровень репозитория
-    updated = await apps_repo.update(app.id, data)
-    if not updated:
-        # Теоретически маловероятно (могли удалить запись между SELECT и UPDATE)
-        raise HTTPException(status_code=404, detail="application not found (update)")
+        # Отдаём обновление на уровень репозитория
+        updated = await apps_repo.update(app.id, data)
+        if not updated:
+            # Теоретически маловероятно (могли удалить запись между SELECT и UPDATE)
+            raise HTTPException(status_code=404, detail="application not found (update)")
 
-    return await _pack_application_card(updated)
+        return await _pack_application_card(updated)
 
 
 @router.get("/me/applications", response_model=dict)
 async def list_my_applications(
+    request: Request,
+    response: Response,
     limit: int = Query(default=50, ge=1, le=100, description="Размер страницы"),
     offset: int = Query(default=0, ge=0, description="Смещение от начала списка"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы (вместо offset)"),
     user_id: int = Depends(get_current_user_id),
 ):
     """
@@ -346,26 +464,37 @@ async def list_my_applications(
       {
         "items": [ApplicationCardOut, ...],
         "limit": <int>,
-        "offset": <int>
+        "offset": <int>,
+        "next_cursor": <str | null>
       }
     """
-    rows = await apps_repo.search_by_user(
-        user_id=user_id,
-        limit=limit,
-        offset=offset,
-    )
-    items = [await _pack_application_card(r) for r in rows]
+    try:
+        rows, next_cursor = await apps_repo.search_by_user(
+            user_id=user_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    items = [_card_out(card) for card in rows]
+    not_mod = _conditional_cards(request, response, items, limit, offset, next_cursor)
+    if not_mod is not None:
+        return not_mod
 
     return {
         "items": [i.model_dump() for i in items],
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
     }
 
 
 @router.get("/me/applications/{hackathon_id}", response_model=ApplicationCardOut)
 async def get_my_application_on_specific_hackathon(
     hackathon_id: int,
+    request: Request,
+    response: Response,
     user_id: int = Depends(get_current_user_id),
 ):
     """
@@ -383,6 +512,76 @@ async def get_my_application_on_specific_hackathon(
     if not app:
         raise HTTPException(status_code=404, detail="application not found")
 
-    return await _pack_application_card(app)
+    card = await _pack_application_card(app)
+    not_mod = _conditional_cards(request, response, [card])
+    if not_mod is not None:
+        return not_mod
+    return card
 
 
+@router.get("/vacancies/{vacancy_id}/applications", response_model=dict)
+async def rank_applications_for_vacancy(
+    vacancy_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100, description="Сколько лучших кандидатов вернуть"),
+    offset: int = Query(default=0, ge=0, description="Смещение в рейтинге"),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Анкеты хакатона вакансии, ранжированные по соответствию ей (только для капитана команды).
+
+    РАНЖИРОВАНИЕ:
+      • score = 0.7 · (доля навыков vacancy.skills у владельца анкеты) + 0.3 · role_fit,
+        role_fit: 1 — роль анкеты совпала с ролью вакансии, 0.5 — роль не указана, 0 — другая;
+      • только опубликованные анкеты тех, кто ещё не в команде, и только со score > 0;
+      • при равном score — более свежие анкеты выше.
+
+    ВОЗВРАЩАЕТ:
+      {
+        "items": [RankedApplicationOut, ...],
+        "total": <сколько анкет подходит>,
+        "limit": <int>, "offset": <int>,
+        "vacancy": {"id", "team_id", "hackathon_id", "role", "skills": [SkillOut], "unknown_skills": [...]}
+      }
+    """
+    found = await ranking_repo.get_vacancy(vacancy_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="vacancy not found")
+    vacancy, team = found
+    if team.captain_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="only the team captain can rank applications")
+
+    ranked, total, skill_ids, unknown = await ranking_repo.rank(
+        vacancy, team.hackathon_id, limit=limit, offset=offset
+    )
+    cards = {c.id: c for c in await _pack_cards_by_ids([app_id for app_id, *_ in ranked])}
+    items = [
+        RankedApplicationOut(
+            **cards[app_id].model_dump(), score=round(score, 4), matched_skills=matched, role_match=role_match
+        )
+        for app_id, score, matched, role_match in ranked
+        if app_id in cards
+    ]
+    # Блок vacancy тоже в ETag: правка vacancy.skills/role может не сдвинуть страницу рейтинга
+    not_mod = _conditional_cards(
+        request, response, items, limit, offset, total, sorted(skill_ids), list(unknown), vacancy.role
+    )
+    if not_mod is not None:
+        return not_mod
+
+    cat = await users_repo.skills.catalog_covering(skill_ids)
+    return {
+        "items": [i.model_dump() for i in items],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "vacancy": {
+            "id": vacancy.id,
+            "team_id": team.id,
+            "hackathon_id": team.hackathon_id,
+            "role": vacancy.role,
+            "skills": [SkillOut(id=sk.id, slug=sk.slug, name=sk.name).model_dump() for sk in cat.sorted_by_name(skill_ids)],
+            "unknown_skills": unknown,
+        },
+    }
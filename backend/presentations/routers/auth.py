@@ -3,13 +3,15 @@
 # =============================================================================
 
 from __future__ import annotations
-from typing import Optional, List  # <-- добавили
+import json
+from typing import Optional
 from pydantic import BaseModel, Field  # <-- добавили Field
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
 from backend.services.auth_telegram import AuthTelegramService, AuthResult
 from backend.utils.telegram_initdata import InitDataError
 from backend.repositories.users import UsersRepo
+from backend.infrastructure.db import unit_of_work
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 auth_service = AuthTelegramService()
@@ -47,65 +49,44 @@ class UserOut(BaseModel):
     link: str | None = None
     skills: list[UserSkillOut] = Field(default_factory=list)
     achievements: list[UserAchievementOut] = Field(default_factory=list)  # <-- добавили
+    # Профиль отдаётся готовым документом user_profile_doc (общий с /users/*), там поле есть всегда: null
+    match_count: int | None = None
 
 class AuthOut(BaseModel):
     access_token: str
     profile: UserOut
 
-# ----- Маппинг достижений -----
-
-def _map_achievements(achs) -> List[UserAchievementOut]:
-    def _val(x):
-        return getattr(x, "value", x) if x is not None else None
-
-    items: List[UserAchievementOut] = []
-    for a in achs:
-        # колонка в БД может называться hack_id — отдадим как hackathon_id
-        hackathon_id = getattr(a, "hackathon_id", None)
-        if hackathon_id is None:
-            hackathon_id = getattr(a, "hack_id", None)
-
-        items.append(UserAchievementOut(
-            id=a.id,
-            user_id=a.user_id,
-            hackathon_id=int(hackathon_id) if hackathon_id is not None else None,
-            role=_val(a.role),
-            place=_val(a.place),
-        ))
-    return items
-
 # ----- Роут -----
 
 @router.post("/telegram", response_model=AuthOut)
 async def auth_telegram(payload: TelegramInitIn):
+    # Апсерт пользователя и чтение профиля — в одной сессии (одно соединение из пула на логин).
+    # initData зарезервирован с момента проверки; исключение внутри блока (rollback) снимает резерв,
+    # и клиент может повторить вход.
+    res: Optional[AuthResult] = None
     try:
-        res: AuthResult = await auth_service.authenticate(payload.init_data)
-    except InitDataError as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    user = await users_repo.get_by_id(res.user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="user not found")
-
-    skills = await users_repo.get_user_skills(res.user_id)
-    achs = await users_repo.get_user_achievements(res.user_id)  # <-- получаем достижения
-
-    return AuthOut(
-        access_token=res.access_token,
-        profile=UserOut(
-            id=user.id,
-            telegram_id=user.telegram_id,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            avatar_url=user.avatar_url,
-            bio=user.bio,
-            city=user.city,
-            university=user.university,
-            link=user.link,
-            skills=[UserSkillOut(id=s.id, slug=s.slug, name=s.name) for s in skills],
-            achievements=_map_achievements(achs),  # <-- кладём в ответ
-        ),
+        async with unit_of_work():
+            try:
+                res = await auth_service.authenticate(payload.init_data)
+            except InitDataError as e:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            # Профиль — готовый JSON из user_profile_doc (триггер уже обновил его в этой транзакции):
+            # один поиск по PK, тело вклеиваем как есть (AuthOut — только схема для /docs)
+            found = await users_repo.get_profile_doc(res.user.id)
+            if found is None:
+                raise HTTPException(status_code=404, detail="user not found")
+            _version, profile = found
+    except BaseException:
+        if res is not None:
+            auth_service.release(res)
+        raise
+
+    # Транзакция закоммичена — только теперь initData считается использованным окончательно
+    auth_service.confirm(res)
+    return Response(
+        content='{"access_token":' + json.dumps(res.access_token) + ',"profile":' + profile + "}",
+        media_type="application/json",
     )
@@ -7,22 +7,40 @@
 #   • Схемы (Pydantic) описаны прямо в роутере (как в users.py).
 # ОСОБЕННОСТИ:
 #   • JWT не обязателен для чтения (GET), но обязателен для мутаций (POST/PATCH/DELETE).
+#   • GET-ручки отдают ETag (деталь — ещё и Last-Modified) и отвечают 304 на условные запросы
+#     (см. utils/http_cache.py).
+#   • GET /hackathons — экран поиска: q (полнотекст + подстрока в названии), фильтры mode / city /
+#     даты старта / registration_open, сортировки (sort) и, по запросу, счётчики facets по mode/city.
+#     Готовый ответ держим в микро-кэше (короткий TTL, ключ — все параметры запроса),
+#     одновременные промахи склеиваются в одну загрузку. Мутации (POST/PATCH/DELETE) сбрасывают этот кэш.
 # =============================================================================
 
 from __future__ import annotations
 
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Query, HTTPException, Depends, status
+from fastapi import APIRouter, Query, HTTPException, Depends, Request, Response, status
 from pydantic import BaseModel, Field
 
-from backend.repositories.hackathons import HackathonsRepo
-from backend.presentations.routers.users import get_current_user_id  # берём готовый депенденси
+from backend.repositories.hackathons import HackathonsRepo, HackathonSort
+from backend.persistend.enums import HackathonMode
+from backend.presentations.dependencies import get_current_user_id  # общая JWT-аутентификация
+from backend.utils.http_cache import make_etag, is_not_modified, not_modified, set_cache_headers
+from backend.utils.cursor import CursorError  # Битый/чужой cursor → 400
+from backend.infrastructure.cache import TTLCache
+from backend.settings.config import settings
 
 router = APIRouter(prefix="/hackathons", tags=["hackathons"])
 repo = HackathonsRepo()
 
+# Микро-кэш списка: (параметры запроса) -> (etag, готовое тело ответа)
+_list_cache: TTLCache[tuple, tuple] = TTLCache(
+    "hackathons.list",
+    maxsize=settings.HACKATHON_LIST_CACHE_SIZE,
+    ttl=settings.HACKATHON_LIST_CACHE_TTL_SECONDS,
+)
+
 
 # ---- Схемы ответа ----
 
@@ -125,39 +143,91 @@ def _parse_ddmmyyyy(value: str | None, field_name: str) -> datetime | None:
             detail=f"invalid date format for {field_name}, expected dd.mm.yyyy",
         )
 
+async def _load_list(
+    q: Optional[str], limit: int, offset: int, cursor: Optional[str],
+    sort: HackathonSort, facets: bool, filters: dict,
+) -> tuple:
+    """Собрать страницу списка (+ facets) и её ETag (по содержимому) — то, что кладём в микро-кэш."""
+    rows, next_cursor = await repo.list_open(q=q, limit=limit, offset=offset, cursor=cursor, sort=sort, **filters)
+    items = [_pack(h).model_dump() for h in rows]
+    payload = {"items": items, "limit": limit, "offset": offset, "next_cursor": next_cursor}
+    if facets:
+        counts = await repo.facets_open(q=q, **filters)
+        payload["facets"] = {
+            name: [{"value": value, "count": n} for value, n in values] for name, values in counts.items()
+        }
+    return make_etag("hackathons", q, limit, offset, cursor, sort, sorted(filters.items()), payload), payload
+
 # ---- Ручки ----
 
 @router.get("", response_model=dict)
 async def list_hackathons(
-    q: Optional[str] = Query(default=None, description="Поиск по name/description (ILIKE)"),
+    request: Request,
+    response: Response,
+    q: Optional[str] = Query(default=None, description="Поиск по name/description/city (полнотекст) и подстроке в названии"),
+    mode: Optional[HackathonMode] = Query(default=None, description="Формат: online / offline / hybrid"),
+    city: Optional[str] = Query(default=None, description="Город (без учёта регистра)"),
+    start_from: Optional[str] = Query(default=None, description="Старт не раньше этого дня (dd.mm.yyyy)"),
+    start_to: Optional[str] = Query(default=None, description="Старт не позже этого дня (dd.mm.yyyy)"),
+    registration_open: bool = Query(default=False, description="Только с ещё открытой регистрацией"),
+    sort: HackathonSort = Query(default="start_desc", description="start_desc / start_asc / registration_end / relevance (с q)"),
+    facets: bool = Query(default=False, description="Добавить счётчики по mode и city"),
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы (вместо offset)"),
 ):
     """
-    Список открытых хакатонов (status = 'open') с пагинацией.
+    Список открытых хакатонов (status = 'open') с поиском, фильтрами и пагинацией.
     Параметры:
-      • q — простой текстовый фильтр по name/description (опционально).
+      • q — полнотекстовый поиск по name/description/city + подстрока в названии (опционально).
+      • mode, city, start_from/start_to (dd.mm.yyyy, включительно), registration_open — фильтры.
+      • sort — start_desc (по умолчанию), start_asc, registration_end (скоро закрывается регистрация),
+        relevance (только с q).
+      • facets — счётчики {mode: [{value, count}], city: [...]} при остальных фильтрах.
       • limit/offset — пагинация.
+      • cursor — keyset-пагинация по ключу сортировки: next_cursor из предыдущего ответа.
     Возвращает:
-      • { items: HackathonOut[], limit, offset }.
+      • { items: HackathonOut[], limit, offset, next_cursor[, facets] }.
+      • 304 — если If-None-Match совпал с ETag страницы.
+    Ответ берётся из микро-кэша; при промахе параллельные запросы с тем же ключом ждут одну загрузку.
     """
-    items = await repo.list_open(q=q, limit=limit, offset=offset)
-    return {
-        "items": [_pack(h).model_dump() for h in items],
-        "limit": limit,
-        "offset": offset,
+    day_to = _parse_ddmmyyyy(start_to, "start_to")
+    filters = {
+        "mode": mode.value if mode else None,
+        "city": city.strip() if city and city.strip() else None,
+        "start_from": _parse_ddmmyyyy(start_from, "start_from"),
+        "start_to": day_to + timedelta(days=1) if day_to else None,  # Включительно: весь день start_to
+        "registration_open": registration_open,
     }
+    key = (q, limit, offset, cursor, sort, facets, *filters.values())
+    try:
+        etag, payload = await _list_cache.get_or_load(
+            key, lambda: _load_list(q, limit, offset, cursor, sort, facets, filters)
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e:
+        # relevance без q
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    return payload
 
 
 @router.get("/{hackathon_id}", response_model=HackathonOut)
-async def get_hackathon(hackathon_id: int):
+async def get_hackathon(hackathon_id: int, request: Request, response: Response):
     """
     Детальная карточка хакатона по id.
-    404 — если не найден.
+    404 — если не найден; 304 — если не менялся с версии клиента (ETag / Last-Modified = updated_at).
     """
     h = await repo.get_by_id(hackathon_id)
     if not h:
         raise HTTPException(status_code=404, detail="hackathon not found")
+    etag = make_etag("hackathon", h.id, h.updated_at)
+    if is_not_modified(request, etag, h.updated_at):
+        return not_modified(etag, h.updated_at)
+    set_cache_headers(response, etag, h.updated_at)
     return _pack(h)
 
 
@@ -185,6 +255,7 @@ async def create_hackathon(
     )
 
     h = await repo.create(**data)
+    _list_cache.clear()
     return _pack(h)
 
 @router.patch(
@@ -212,6 +283,7 @@ async def update_hackathon(
     h = await repo.update(hackathon_id, **data)
     if not h:
         raise HTTPException(status_code=404, detail="hackathon not found")
+    _list_cache.clear()
     return _pack(h)
 
 
@@ -231,4 +303,5 @@ async def delete_hackathon(
     ok = await repo.delete(hackathon_id)
     if not ok:
         raise HTTPException(status_code=404, detail="hackathon not found")
+    _list_cache.clear()
     # FastAPI сам вернёт пустой ответ с 204
@@ -5,6 +5,7 @@
 #   • /system/health  — «жив ли процесс» (liveness probe), не трогает БД.
 #   • /system/version — отдать версию приложения (для дебага/релизов).
 #   • /system/ready   — «готов ли обслуживать трафик» (readiness probe), пингует БД.
+#   • /system/cache   — статистика in-process кэшей (размер, hits/misses, hit rate).
 # ПРИМЕЧАНИЕ:
 #   • /ready считает сервис готовым, если есть соединение с БД и простейший запрос проходит.
 #   • Эти ручки удобно использовать в оркестраторах (Docker, Kubernetes) и в мониторинге.
@@ -15,6 +16,7 @@ from __future__ import annotations  # Позволяет использоват
 from fastapi import APIRouter       # Роутер FastAPI — группируем эндпоинты в модуль
 from sqlalchemy import text         # text() — для простого «сырого» SQL вроде SELECT 1
 from backend.infrastructure.db import get_engine  # Наш общий engine к БД (пул соединений)
+from backend.infrastructure.cache import cache_stats  # Счётчики in-process кэшей
 from backend.settings.config import settings      # Настройки приложения (версия и т.п.)
 
 # Создаём роутер с префиксом /system и тегом "system" (красиво в Swagger/Redoc)
@@ -47,3 +49,11 @@ async def ready():
     async with engine.connect() as conn:  # Открываем соединение из пула
         await conn.execute(text("SELECT 1"))  # Простейший запрос: если он не упадёт — БД ок
     return {"ready": True}                # Если тут — значит всё хорошо
+
+@router.get("/cache")
+async def cache():
+    """
+    Статистика in-process кэшей этого воркера: {имя кэша -> size/hits/misses/evictions/hit_rate}.
+    Счётчики копятся с момента старта процесса; у каждого воркера — свои.
+    """
+    return cache_stats()
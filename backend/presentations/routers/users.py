@@ -2,7 +2,7 @@
 # ФАЙЛ: backend/presentations/routers/users.py
 # КРАТКО: роутер FastAPI для работы с пользователями.
 # ЗАЧЕМ:
-#   • Авторизация по JWT (достаём user_id из заголовка Authorization).
+#   • Авторизация по JWT — общая зависимость get_current_user_id (presentations/dependencies.py).
 #   • Получение собственного профиля / чужого профиля по id.
 #   • Частичное обновление профиля (PATCH /users/me), включая замену набора навыков.
 #   • Поиск пользователей с фильтрацией по тексту и навыкам.
@@ -10,6 +10,9 @@
 #   • Репозиторий UsersRepo сам открывает асинхронные сессии «на операцию» (per-operation).
 #   • В ответе отдаем Pydantic-модели (удобно для OpenAPI/доков).
 #   • Ошибки репозитория маппим в понятные HTTP-коды и JSON-детали.
+#   • Профиль (GET /me, /{id}, ответ PATCH /me) — готовый JSON из user_profile_doc
+#     (поддерживают триггеры БД): один поиск по PK, тело отдаётся как есть, без Pydantic.
+#     ETag — счётчик версий этого документа; 304 на If-None-Match.
 # ВАЖНЫЕ МИКРО-ПРАВКИ:
 #   • skills в UserOut теперь через Field(default_factory=list), чтобы избежать «мутабельного дефолта».
 #   • Параметр mode типизирован как Literal["all","any"] (строже, чем regex в Query).
@@ -18,16 +21,19 @@
 
 from __future__ import annotations  # Современные аннотации типов (отложенная оценка)
 
-import os                                 # Достаём секрет для JWT из переменных окружения
 from typing import Optional, List, Literal # Типы для аннотаций (Optional, списки, Literal для ограниченных значений)
 
 from fastapi import (                      # Компоненты FastAPI
-    APIRouter, Depends, HTTPException, Header, Query, status
+    APIRouter, Depends, HTTPException, Query, Request, Response, status
 )
 from pydantic import BaseModel, Field      # Pydantic-модели схем, Field для настроек полей
 
 from backend.repositories.users import UsersRepo  # Наш слой доступа к данным пользователей
-from backend.utils import jwt_simple              # Простой модуль для кодирования/декодирования JWT
+from backend.repositories.base import TotalMode  # Режим подсчёта total: exact / estimate / none
+from backend.persistend.enums import RoleType  # Фильтр по роли в заявке (Enum role_type)
+from backend.infrastructure.db import unit_of_work  # Одна сессия/транзакция на составной запрос (PATCH /me)
+from backend.presentations.dependencies import get_current_user_id  # Общая JWT-аутентификация (user_id из Bearer-токена)
+from backend.utils.http_cache import make_etag, is_not_modified, not_modified, set_cache_headers  # Условные GET (304)
 
 # Роутер с префиксом и тегом — красиво группируется в Swagger/Redoc
 router = APIRouter(prefix="/users", tags=["users"])
@@ -35,30 +41,6 @@ router = APIRouter(prefix="/users", tags=["users"])
 # Репозиторий пользователей. Внутри он получает sessionmaker и открывает сессию на каждую операцию.
 users_repo = UsersRepo()
 
-# ---- Аутентификация (JWT -> user_id) ----
-
-async def get_current_user_id(authorization: str | None = Header(default=None)) -> int:
-    """
-    Достаём user_id из заголовка Authorization: Bearer <JWT>.
-    Если заголовка нет или токен невалиден — бросаем 401.
-    """
-    # Проверяем, что заголовок есть и начинается с 'Bearer '
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing token")
-
-    # Забираем сам токен после пробела
-    token = authorization.split(" ", 1)[1]
-
-    try:
-        # Декодируем токен и получаем payload (ожидаем, что в sub лежит user_id)
-        payload = jwt_simple.decode(token, os.getenv("JWT_SECRET", "dev-secret-change-me"))
-    except Exception:
-        # Любая ошибка декодирования токена — это 401
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token")
-
-    # Возвращаем числовой идентификатор пользователя
-    return int(payload["sub"])
-
 # ---- Схемы (Pydantic) ----
 
 class UserSkillOut(BaseModel):
@@ -114,34 +96,23 @@ class UserPatchIn(BaseModel):
 
 # ---- Вспомогательное упаковывание пользователя ----
 
-async def _pack_user(user_id: int) -> UserOut:
+async def _pack_user(user_id: int, request: Optional[Request] = None) -> Response:
     """
-    Достаём пользователя и его навыки и собираем объект UserOut.
-    Общий хелпер, чтобы не дублировать код в хэндлерах.
+    Профиль пользователя из user_profile_doc одним поиском по PK.
+    JSON документа уже имеет форму UserOut — отдаём его как есть (response_model только для /docs).
+    С request — условный GET: совпал If-None-Match — 304 без тела.
     """
-    user = await users_repo.get_by_id(user_id)
-    if not user:
+    found = await users_repo.get_profile_doc(user_id)
+    if found is None:
         raise HTTPException(status_code=404, detail="user not found")
+    version, doc = found
+    etag = make_etag("user", user_id, version)
+    if request is not None and is_not_modified(request, etag):
+        return not_modified(etag)
+    response = Response(content=doc, media_type="application/json")
+    set_cache_headers(response, etag)
+    return response
 
-    skills = await users_repo.get_user_skills(user_id)
-    achievements = await users_repo.get_user_achievements(user_id)
-    return UserOut(
-        id=user.id,
-        telegram_id=user.telegram_id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        avatar_url=user.avatar_url,
-        bio=user.bio,
-        city=user.city,
-        university=user.university,
-        link=user.link,
-        skills=[UserSkillOut(id=s.id, slug=s.slug, name=s.name) for s in skills],
-        achievements=_map_achievements(achievements),
-
-        # created_at=str(user.created_at),
-        # updated_at=str(user.updated_at),
-    )
 def _map_achievements(achs) -> List[UserAchievementOut]:
     def _val(x):
         # поддержим и Enum, и str (на всякий случай)
@@ -166,65 +137,74 @@ def _map_achievements(achs) -> List[UserAchievementOut]:
 # ---- Роуты ----
 
 @router.get("/me", response_model=UserOut)
-async def get_me(current_user_id: int = Depends(get_current_user_id)):
+async def get_me(request: Request, current_user_id: int = Depends(get_current_user_id)):
     """
-    Получить свой профиль (по user_id из JWT).
+    Получить свой профиль (по user_id из JWT). 304 — если профиль не менялся (If-None-Match).
     """
-    return await _pack_user(current_user_id)
+    return await _pack_user(current_user_id, request)
 
 @router.get("/{user_id}", response_model=UserOut)
-async def get_user_by_id(user_id: int, _current_user_id: int = Depends(get_current_user_id)):
+async def get_user_by_id(
+    user_id: int,
+    request: Request,
+    _current_user_id: int = Depends(get_current_user_id),
+):
     """
     Получить профиль любого пользователя по его id.
     Требует валидный JWT (но не обязательно, чтобы это был «сам пользователь»).
+    304 — если профиль не менялся (If-None-Match).
     """
-    return await _pack_user(user_id)
+    return await _pack_user(user_id, request)
 
 @router.patch("/me", response_model=UserOut)
 async def patch_me(payload: UserPatchIn, current_user_id: int = Depends(get_current_user_id)):
     """
     Частичное обновление своего профиля.
     Если payload.skills передан — заменяем весь набор навыков по списку slug (<= max_count).
+    Ошибка в навыках откатывает и изменения простых полей (всё в одном unit of work).
     """
-    # 1) Обновляем «простые» поля профиля
-    user = await users_repo.update_profile(
-        current_user_id,
-        bio=payload.bio,
-        city=payload.city,
-        university=payload.university,
-        link=payload.link,
-    )
-    if not user:
-        raise HTTPException(status_code=404, detail="user not found")
-
-    # 2) Если пришёл список skills — пробуем заменить весь набор
-    if payload.skills is not None:
-        try:
-            await users_repo.replace_user_skills_by_slugs(
-                current_user_id,
-                payload.skills,
-                max_count=10,  # ограничение по ТЗ (до 10 навыков)
-            )
-        except ValueError as e:
-            # Репозиторий кодирует ошибки в текст, распаковываем в структурированный ответ
-            msg = str(e)
-            if msg.startswith("unknown_skills:"):
-                # Собираем список неизвестных скиллов: "unknown_skills:python,elixir"
-                unknown = [s for s in msg.split(":", 1)[1].split(",") if s]
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail={"error": "unknown_skills", "unknown": unknown},
+    # Одна сессия и одна транзакция на весь PATCH (вместо отдельной сессии на каждый вызов репозитория):
+    # профиль и навыки меняются атомарно, а ответ читается из того же снимка.
+    async with unit_of_work():
+        # 1) Обновляем «простые» поля профиля
+        user = await users_repo.update_profile(
+            current_user_id,
+            bio=payload.bio,
+            city=payload.city,
+            university=payload.university,
+            link=payload.link,
+        )
+        if not user:
+            raise HTTPException(status_code=404, detail="user not found")
+
+        # 2) Если пришёл список skills — пробуем заменить весь набор
+        if payload.skills is not None:
+            try:
+                await users_repo.replace_user_skills_by_slugs(
+                    current_user_id,
+                    payload.skills,
+                    max_count=10,  # ограничение по ТЗ (до 10 навыков)
                 )
-            if msg.startswith("too_many_skills:"):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail={"error": "too_many_skills"},
-                )
-            # Любая другая ошибка — 400
-            raise HTTPException(status_code=400, detail=str(e))
-
-    # Возвращаем актуальные данные профиля
-    return await _pack_user(current_user_id)
+            except ValueError as e:
+                # Репозиторий кодирует ошибки в текст, распаковываем в структурированный ответ
+                msg = str(e)
+                if msg.startswith("unknown_skills:"):
+                    # Собираем список неизвестных скиллов: "unknown_skills:python,elixir"
+                    unknown = [s for s in msg.split(":", 1)[1].split(",") if s]
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail={"error": "unknown_skills", "unknown": unknown},
+                    )
+                if msg.startswith("too_many_skills:"):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail={"error": "too_many_skills"},
+                    )
+                # Любая другая ошибка — 400
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # Возвращаем актуальные данные профиля
+        return await _pack_user(current_user_id)
 
 @router.get("", response_model=dict)
 async def search_users(
@@ -234,6 +214,14 @@ async def search_users(
     mode: Literal["all", "any"] = Query(default="all", description="all — все навыки; any — хотя бы один"),
     limit: int = Query(default=20, ge=1, le=100, description="Сколько записей вернуть"),
     offset: int = Query(default=0, ge=0, description="Сколько записей пропустить"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы (вместо offset)"),
+    total_mode: TotalMode = Query(
+        default="estimate",
+        alias="total",
+        description="total: exact — точно; estimate — из кэша (по умолчанию); none — не считать (лента)",
+    ),
+    hackathon_id: Optional[int] = Query(default=None, description="Только подавшие заявку на этот хакатон"),
+    role: Optional[RoleType] = Query(default=None, description="…и указавшие в заявке эту роль (нужен hackathon_id)"),
     _current_user_id: int = Depends(get_current_user_id),
 ):
     """
@@ -243,15 +231,27 @@ async def search_users(
       • mode:
           - "all": у пользователя должны быть все указанные навыки,
           - "any": достаточно хотя бы одного (match_count покажет, сколько совпало).
+      • cursor — keyset-пагинация: передайте next_cursor из предыдущего ответа
+        (глубокие страницы не дороже первой, строки не «съезжают»); offset при этом игнорируется.
+      • total — режим подсчёта total: estimate (count из кэша запросов, пересчёт после записей),
+        exact (count(*) OVER () в том же запросе) или none (total = null — для бесконечной ленты).
+      • hackathon_id / role — только пользователи с заявкой на хакатон (с этой ролью).
     """
+    if role is not None and hackathon_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="role filter requires hackathon_id")
+
     # Преобразуем CSV "react, typescript" -> ["react", "typescript"]
     skill_list = [s.strip() for s in skills.split(",")] if skills else None
 
     try:
         # Репозиторий должен вернуть:
         #   rows  — список кортежей (пользователь, match_count)
-        #   total — сколько всего результатов без учёта limit/offset
-        rows, total = await users_repo.search_users(q, skill_list, mode, limit, offset)
+        #   total — сколько всего результатов без учёта limit/offset (None при total=none)
+        #   next_cursor — курсор следующей страницы (None, если страница последняя)
+        rows, total, next_cursor = await users_repo.search_users(
+            q, skill_list, mode, limit, offset, cursor, total_mode=total_mode,
+            hackathon_id=hackathon_id, role=role.value if role else None,
+        )
     except ValueError as e:
         # Если репозиторий бросил "unknown_skills:..."
         msg = str(e)
@@ -261,16 +261,20 @@ async def search_users(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={"error": "unknown_skills", "unknown": unknown},
             )
-        # Иные ошибки поиска → 400
+        # Иные ошибки поиска (в т.ч. битый cursor) → 400
         raise HTTPException(status_code=400, detail=str(e))
 
     # Формируем список элементов для ответа.
-    # ПРИМЕЧАНИЕ: тут есть N+1 — на каждого пользователя делаем отдельный запрос за skills.
-    # Если это станет узким местом, оптимизируйте в репозитории «пакетную» выдачу скиллов по списку user_id.
+    # Навыки и достижения всей страницы забираем пакетно (по одному запросу на каждое),
+    # поэтому стоимость страницы не зависит от limit.
+    user_ids = [usr.id for usr, _ in rows]
+    skills_by_user = await users_repo.get_skills_for_users(user_ids)
+    achs_by_user = await users_repo.get_achievements_for_users(user_ids)
+
     items = []
     for usr, mc in rows:
-        usr_skills = await users_repo.get_user_skills(usr.id)
-        usr_achs = await users_repo.get_user_achievements(usr.id)   # <<< добавили
+        usr_skills = skills_by_user.get(usr.id, [])
+        usr_achs = achs_by_user.get(usr.id, [])
 
         items.append(UserOut(
             id=usr.id,
@@ -284,7 +288,7 @@ async def search_users(
             university=usr.university,
             link=usr.link,
             skills=[UserSkillOut(id=s.id, slug=s.slug, name=s.name) for s in usr_skills],
-            achievements=_map_achievements(usr_achs),                # <<< теперь переменная есть
+            achievements=_map_achievements(usr_achs),
 
             # created_at=str(usr.created_at),
             # updated_at=str(usr.updated_at),
@@ -292,4 +296,4 @@ async def search_users(
         ).model_dump())
 
     # Оборачиваем в пагинационный ответ
-    return {"items": items, "total": total, "limit": limit, "offset": offset}
+    return {"items": items, "total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
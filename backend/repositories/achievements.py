@@ -9,15 +9,17 @@
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional, Tuple, List
 
-from sqlalchemy import select, func, delete, insert  # при обновлении полей используем ORM-объект + commit
+from sqlalchemy import select, func, delete, insert, tuple_  # при обновлении полей используем ORM-объект + commit
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from collections import defaultdict
 import asyncio
 
-from backend.repositories.base import BaseRepository
+from backend.repositories.base import BaseRepository, TotalMode
+from backend.utils.cursor import decode_cursor, encode_cursor  # Курсоры keyset-пагинации
 from backend.persistend.models import achievement as m_ach
 from backend.persistend.models import users as m_users
 from backend.persistend.models import hackathon as m_hack
@@ -42,11 +44,14 @@ class AchievementsRepo(BaseRepository):
         place: Optional[m_ach.AchievPlace] = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "exact",
         with_hackathon: bool = False,
-    ) -> Tuple[List[m_ach.Achievement], int]:
+    ) -> Tuple[List[m_ach.Achievement], Optional[int], Optional[str]]:
         """
         Список достижений пользователя с опциональными фильтрами.
-        Возвращает (items, total). По умолчанию сортируем по created_at DESC.
+        Возвращает (items, total, next_cursor). Сортируем по created_at DESC, id DESC.
+        cursor — keyset-пагинация вместо offset (см. _page); total_mode — exact/estimate/none.
         """
         a = m_ach.Achievement
         stmt = select(a).where(a.user_id == user_id)
@@ -60,12 +65,7 @@ class AchievementsRepo(BaseRepository):
             # Подтянем хакатон, чтобы избежать N+1 при обращении a.hackathon
             stmt = stmt.options(joinedload(a.hackathon))
 
-        stmt = stmt.order_by(a.created_at.desc())
-
-        async with self._sm() as s:
-            total = (await s.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one()
-            res = await s.execute(stmt.limit(limit).offset(offset))
-            return list(res.scalars().all()), total
+        return await self._page(stmt, "achievements:user", limit, offset, cursor, total_mode)
 
     async def list_by_hackathon(
         self,
@@ -75,11 +75,13 @@ class AchievementsRepo(BaseRepository):
         place: Optional[m_ach.AchievementPlace] = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "exact",
         with_user: bool = False,
-    ) -> Tuple[List[m_ach.Achievement], int]:
+    ) -> Tuple[List[m_ach.Achievement], Optional[int], Optional[str]]:
         """
         Список достижений по хакатону с опциональными фильтрами.
-        Возвращает (items, total). По умолчанию сортируем по created_at DESC.
+        Возвращает (items, total, next_cursor). Сортируем по created_at DESC, id DESC.
         """
         a = m_ach.Achievement
         stmt = select(a).where(a.hackathon_id == hackathon_id)
@@ -92,12 +94,29 @@ class AchievementsRepo(BaseRepository):
         if with_user:
             stmt = stmt.options(joinedload(a.user))
 
-        stmt = stmt.order_by(a.created_at.desc())
+        return await self._page(stmt, "achievements:hackathon", limit, offset, cursor, total_mode)
+
+    async def _page(
+        self, stmt, kind: str, limit: int, offset: int, cursor: Optional[str], total_mode: TotalMode
+    ) -> Tuple[List[m_ach.Achievement], Optional[int], Optional[str]]:
+        """
+        Страница списка по (created_at DESC, id DESC) + total.
+        С cursor — keyset: WHERE (created_at, id) < (:created_at, :id) вместо OFFSET,
+        поэтому дальние страницы стоят как первая (индексы из initdb_db/04d_keyset_indexes.sql).
+        total=exact без курсора считается в том же запросе (count(*) OVER ()).
+        """
+        a = m_ach.Achievement
+        after = decode_cursor(cursor, kind, (datetime, int)) if cursor else None
+        page = stmt.order_by(a.created_at.desc(), a.id.desc()).limit(limit)
+        page = page.where(tuple_(a.created_at, a.id) < tuple_(*after)) if after is not None else page.offset(offset)
+        page = self._with_window_total(page, total_mode, keyset=after is not None)
 
         async with self._sm() as s:
-            total = (await s.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one()
-            res = await s.execute(stmt.limit(limit).offset(offset))
-            return list(res.scalars().all()), total
+            rows = (await s.execute(page)).all()
+        total = await self._total(stmt, total_mode, rows, windowed=total_mode == "exact" and after is None)
+        items = [row[0] for row in rows]
+        next_cursor = encode_cursor(kind, (items[-1].created_at, items[-1].id)) if len(items) == limit else None
+        return items, total, next_cursor
 
     # ---------- СОЗДАНИЕ ----------
     async def _exists_for_user_hack(self, user_id: int, hackathon_id: int) -> bool:
@@ -9,23 +9,28 @@
 #   • Асинхронные сессии «per-operation» через BaseRepository._sm():
 #     на каждую операцию открывается отдельная async-сессия и закрывается по выходу
 #     из контекст-менеджера.
-#   • Возвращает ORM-модели (Application). Формирование «карточки» (обогащение данными
-#     users/skills/hackathon) происходит в роутере — так мы разводим слои ответственности.
+#   • Чтения для выдачи (search/search_by_user/get_cards) возвращают готовые карточки
+#     ApplicationCard из таблицы application_card: её поддерживают триггеры БД
+#     (initdb_db/05b_application_cards.sql), так что страница списка — один индексный
+#     проход без JOIN'ов users/user_skill/skill/hackathon. Запись — в таблицу application.
 # ИНВАРИАНТЫ И ОГРАНИЧЕНИЯ ДАННЫХ:
 #   • В БД должна быть уникальность (hackathon_id, user_id) — одна анкета на хакатон на пользователя.
 #   • ON DELETE CASCADE на FK (hackathon_id, user_id) гарантирует, что «сиротских» анкет не останется.
 # ПРОИЗВОДИТЕЛЬНОСТЬ:
-#   • Поиск с q делает JOIN на users — нужны индексы по username/first_name/last_name.
-#   • Сортировка по application.updated_at — полезен индекс на этом поле
-#     (или составной (hackathon_id, updated_at)).
+#   • Списки без q — диапазон индекса application_card (hackathon_id | user_id, updated_at, id).
+#   • Поиск с q делает JOIN на users — нужны trigram-индексы по username/first_name/last_name.
 # =============================================================================
 
 from __future__ import annotations # Для отложенной оценки аннотаций типов (удобно с ORM-моделями)
 
-from typing import Optional, List  # Базовые типы для аннотаций
+from datetime import datetime
+from typing import Optional, List, Sequence, Tuple  # Базовые типы для аннотаций
 
-from sqlalchemy import select, update, delete, func  # Конструкторы SQL-запросов
+from sqlalchemy import select, update, delete, tuple_  # Конструкторы SQL-запросов (tuple_ — keyset-условие)
 from backend.repositories.base import BaseRepository # Репозитории наследуются от BaseRepository, обеспечивающего работу с сессиями
+from backend.repositories.users import user_text_search  # Общий trigram-поиск по имени/username
+from backend.utils.cursor import decode_cursor, encode_cursor  # Курсоры keyset-пагинации
+from backend.repositories import skill_index, vacancy_ranking  # Удалённая анкета — вон из индексов в памяти
 
 # ORM-модели
 from backend.persistend.models import application as m_app
@@ -92,39 +97,36 @@ class ApplicationsRepo(BaseRepository):
         q: Optional[str],
         limit: int,
         offset: int,
-    ) -> List[m_app.Application]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[m_app.ApplicationCard], Optional[str]]:
         """
-        Список анкет одного хакатона с фильтрами и пагинацией.
+        Список карточек анкет одного хакатона с фильтрами и пагинацией.
 
         ФИЛЬТРЫ:
           • role: точное совпадение по роли (Enum в БД; SQLAlchemy корректно сравнивает со строкой).
-          • q:    поиск без учёта регистра по users.username/first_name/last_name.
+          • q:    поиск без учёта регистра по users.username и «Имя Фамилия» (trigram-индексы),
+                  выдача ранжируется по похожести.
 
         ПАГИНАЦИЯ:
-          • limit/offset — для постраничной выдачи.
+          • limit/offset — для постраничной выдачи;
+          • cursor — keyset по (ранг q, updated_at, id): следующая страница без OFFSET (offset игнорируется).
 
         ВОЗВРАЩАЕТ:
-          • Список ORM-объектов Application (без joinload'ов и т.п.).
-            Обогащение карточек выполняется выше по слою (в роутере/сервисе).
+          • (список готовых карточек ApplicationCard, next_cursor) — next_cursor None на последней странице.
 
         ЗАМЕТКИ:
-          • JOIN на users нужен для q-поиска, но ради простоты делаем его всегда.
-            Можно оптимизировать и делать JOIN только при наличии q.
+          • JOIN на users — только для q-поиска (trigram-индексы живут на users);
+            без q страница — один проход по idx_card_hack_updated_id.
         """
-        A = m_app.Application
+        A = m_app.ApplicationCard
         U = m_users.User
 
         async with self._sm() as s:
             # Базовый запрос:
-            #   SELECT application.*
-            #   FROM application
-            #   JOIN users ON users.id = application.user_id
-            #   WHERE application.hackathon_id = :hackathon_id
-            stmt = (
-                select(A)
-                .join(U, U.id == A.user_id)
-                .where(A.hackathon_id == hackathon_id)
-            )
+            #   SELECT application_card.*
+            #   FROM application_card
+            #   WHERE application_card.hackathon_id = :hackathon_id
+            stmt = select(A).where(A.hackathon_id == hackathon_id)
 
             # ------ Фильтр по роли ------
             if role:
@@ -132,54 +134,88 @@ class ApplicationsRepo(BaseRepository):
                 # SQLAlchemy сам приведёт к правильному виду для Enum-типа.
                 stmt = stmt.where(A.role == role)
 
-            # ------ Текстовый фильтр по username/first_name/last_name ------
+            # ------ Текстовый фильтр по username и «Имя Фамилия» ------
+            # Те же выражения, что в trigram-индексах users (см. user_text_search):
+            # WHERE lower(username) LIKE :q OR lower(coalesce(first_name,'') || ' ' || ...) LIKE :q
+            sort_keys = [A.updated_at, A.id]  # «Свежие анкеты» наверху; id — для однозначного порядка
             if q:
-                q_like = f"%{q}%"
-                # username: приводим к lower и сравниваем с lower(q_like); coalesce для NULL -> ""
-                username_ilike = func.lower(func.coalesce(U.username, "")).like(func.lower(q_like))
-                # first_name/last_name: ILIKE (PostgreSQL), обрабатывает регистр самостоятельно
-                fn_ilike = U.first_name.ilike(q_like)
-                ln_ilike = U.last_name.ilike(q_like)
-                # WHERE (lower(coalesce(username,'')) LIKE lower(:q_like)
-                #        OR first_name ILIKE :q_like
-                #        OR last_name ILIKE :q_like)
-                stmt = stmt.where(username_ilike | fn_ilike | ln_ilike)
-
-            # ------ Сортировка + пагинация ------
-            # «Свежие анкеты» наверху
-            stmt = stmt.order_by(A.updated_at.desc()).limit(limit).offset(offset)
-
-            # Выполняем запрос и достаём список Application
-            res = await s.execute(stmt)
-            return list(res.scalars().all())
-
-    async def search_by_user(self, *, user_id: int, limit: int, offset: int) -> List[m_app.Application]:
+                text_cond, text_rank = user_text_search(q)
+                stmt = stmt.join(U, U.id == A.user_id).where(text_cond)
+                sort_keys.insert(0, text_rank)  # При поиске — сначала самые похожие
+
+            # ------ Сортировка + пагинация (offset или keyset-курсор) ------
+            kind = "applications:hackathon:" + ("q" if q else "-")
+            types = (float,) * bool(q) + (datetime, int)
+            after = decode_cursor(cursor, kind, types) if cursor else None
+            stmt = stmt.add_columns(*sort_keys).order_by(*(k.desc() for k in sort_keys)).limit(limit)
+            stmt = stmt.where(tuple_(*sort_keys) < tuple_(*after)) if after is not None else stmt.offset(offset)
+
+            # Выполняем запрос и достаём список карточек (+ ключи последней строки для курсора)
+            rows = (await s.execute(stmt)).all()
+            next_cursor = encode_cursor(kind, tuple(rows[-1][1:])) if len(rows) == limit else None
+            return [row[0] for row in rows], next_cursor
+
+    async def search_by_user(
+        self, *, user_id: int, limit: int, offset: int, cursor: Optional[str] = None
+    ) -> Tuple[List[m_app.ApplicationCard], Optional[str]]:
         """
-        Список всех анкет конкретного пользователя по всем хакатонам (для /me/applications).
+        Список карточек всех анкет конкретного пользователя по всем хакатонам (для /me/applications).
 
         ПАГИНАЦИЯ:
-          • limit/offset.
+          • limit/offset или cursor (keyset по (updated_at, id); offset при этом игнорируется).
 
         ВОЗВРАЩАЕТ:
-          • Список ORM-объектов Application, отсортированный по updated_at DESC.
+          • (список ApplicationCard по updated_at DESC, next_cursor).
         """
-        A = m_app.Application
+        A = m_app.ApplicationCard
+        kind = "applications:user"
+        after = decode_cursor(cursor, kind, (datetime, int)) if cursor else None
 
         async with self._sm() as s:
-            # SELECT application.*
-            # FROM application
-            # WHERE user_id = :user_id
-            # ORDER BY updated_at DESC
-            # LIMIT :limit OFFSET :offset
+            # SELECT application_card.*
+            # FROM application_card
+            # WHERE user_id = :user_id [AND (updated_at, application_id) < (:updated_at, :id)]
+            # ORDER BY updated_at DESC, id DESC
+            # LIMIT :limit [OFFSET :offset]
             stmt = (
                 select(A)
                 .where(A.user_id == user_id)
-                .order_by(A.updated_at.desc())
+                .order_by(A.updated_at.desc(), A.id.desc())
                 .limit(limit)
-                .offset(offset)
             )
+            if after is not None:
+                stmt = stmt.where(tuple_(A.updated_at, A.id) < tuple_(*after))
+            else:
+                stmt = stmt.offset(offset)
             res = await s.execute(stmt)
-            return list(res.scalars().all())
+            items = list(res.scalars().all())
+            next_cursor = encode_cursor(kind, (items[-1].updated_at, items[-1].id)) if len(items) == limit else None
+            return items, next_cursor
+
+    async def get_cards(self, app_ids: Sequence[int]) -> List[m_app.ApplicationCard]:
+        """
+        Готовые карточки анкет по id одним запросом (по первичному ключу application_card).
+
+        ПРИМЕНЕНИЕ:
+          • Одиночная карточка и выдачи, ранжированные в памяти (подбор под вакансию, напарники).
+
+        ВОЗВРАЩАЕТ:
+          • Список ApplicationCard в том же порядке, что и входные app_ids. Анкеты, которых нет в БД, пропускаются.
+        """
+        if not app_ids:
+            return []
+
+        A = m_app.ApplicationCard
+
+        async with self._sm() as s:
+            # SELECT application_card.* FROM application_card WHERE application_id IN (:app_ids)
+            # populate_existing: карточку переписал триггер в этой же транзакции (unit of work) —
+            # объект из identity map сессии не должен её заслонить.
+            stmt = select(A).where(A.id.in_(app_ids)).execution_options(populate_existing=True)
+            by_id = {card.id: card for card in (await s.execute(stmt)).scalars().all()}
+
+        # Восстанавливаем порядок, в котором анкеты пришли из поиска (IN его не сохраняет)
+        return [by_id[app_id] for app_id in app_ids if app_id in by_id]
 
     # ---------- ЗАПИСЬ ----------
 
@@ -282,9 +318,13 @@ class ApplicationsRepo(BaseRepository):
         A = m_app.Application
 
         async with self._sm() as s:
-            # DELETE FROM application WHERE id = :app_id
-            stmt = delete(A).where(A.id == app_id)
-            res = await s.execute(stmt)
+            # DELETE FROM application WHERE id = :app_id RETURNING hackathon_id, user_id
+            stmt = delete(A).where(A.id == app_id).returning(A.hackathon_id, A.user_id)
+            gone = (await s.execute(stmt)).one_or_none()
             await s.commit()
-            # rowcount > 0 — значит, что-то реально удалили
-            return res.rowcount > 0
+            if gone is None:
+                return False
+            # Индексы в памяти узнают о новых/изменённых анкетах по updated_at, об удалении — только отсюда
+            skill_index.forget_application(*gone)
+            vacancy_ranking.forget_application(*gone)
+            return True
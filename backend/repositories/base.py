@@ -7,16 +7,31 @@
 # ИДЕЯ:
 #   Репозитории не принимают сессию «снаружи», а сами берут её из общего sessionmaker,
 #   открывая краткоживущую сессию «на операцию» (per-operation).
+#   Если обработчик открыл unit_of_work() (см. infrastructure/db.py), self._sm() вместо
+#   новой сессии отдаёт общую сессию запроса — код репозиториев при этом не меняется.
+#   _cached_rows(stmt) — чтение через общий кэш запросов (infrastructure/query_cache.py):
+#   ключ — SQL + параметры, теги — прочитанные таблицы; любая запись в эти таблицы
+#   через репозитории сбрасывает такие записи после commit.
+#   _total(...) — «сколько всего» для списков в одном из режимов TotalMode:
+#     exact    — точно; без курсора считается в том же запросе страницы (count(*) OVER ());
+#     estimate — count из кэша запросов (после записи в таблицы — пересчёт, иначе до TTL);
+#     none     — не считаем вовсе (бесконечная лента).
 # =============================================================================
 
 from __future__ import annotations  # Отложенная оценка аннотаций (удобно для типов)
 
-from typing import AsyncContextManager  # Тип для аннотации методов, возвращающих async with-контекст
+from typing import Any, AsyncContextManager, Dict, Iterable, List, Literal, Optional, Sequence  # Аннотации типов
+from sqlalchemy import func, select  # count(*) и count(*) OVER () для total
 from sqlalchemy.ext.asyncio import (   # Асинхронные сущности SQLAlchemy
     AsyncSession,
     async_sessionmaker,
 )
-from backend.infrastructure.db import get_sessionmaker  # Глобальная фабрика сессий (singleton)
+from backend.infrastructure.db import get_sessionmaker, session_scope  # Глобальная фабрика сессий + выбор «своя/общая» сессия
+from backend.infrastructure.query_cache import query_cache  # Кэш результатов запросов с инвалидацией по таблицам
+from backend.settings.config import settings  # TTL закэшированных total
+
+# Как считать total у списков: точно / из кэша / не считать
+TotalMode = Literal["exact", "estimate", "none"]
 
 class BaseRepository:
     """База для всех репозиториев: хранит фабрику сессий (sessionmaker) и даёт хелперы."""
@@ -29,7 +44,62 @@ class BaseRepository:
           • Если передать свою фабрику — репозиторий будет использовать её (удобно для тестов).
           • Если не передавать — возьмём глобальную фабрику из инфраструктуры (get_sessionmaker()).
         """
-        self._sm: async_sessionmaker[AsyncSession] = sm or get_sessionmaker()
+        self._factory: async_sessionmaker[AsyncSession] = sm or get_sessionmaker()
+
+    def _sm(self) -> AsyncContextManager[AsyncSession]:
+        """
+        Сессия для одной операции: async with self._sm() as s: ...
+          • обычно — новая краткоживущая сессия из фабрики;
+          • внутри unit_of_work() — общая сессия запроса (commit внутри репозитория = flush).
+        """
+        return session_scope(self._factory)
+
+    async def _cached_rows(
+        self,
+        stmt: Any,
+        *,
+        tags: Optional[Iterable[str]] = None,
+        ttl: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Выполнить SELECT и вернуть строки как список dict'ов — через кэш запросов.
+          • tags — таблицы, от которых зависит результат (по умолчанию — все таблицы из самого запроса);
+          • ttl  — срок жизни записи (по умолчанию QUERY_CACHE_TTL_SECONDS).
+        Подходит для Core/колоночных запросов: ORM-объекты в кэш не кладём.
+        """
+        async def load() -> List[Dict[str, Any]]:
+            async with self._sm() as s:
+                return [dict(row) for row in (await s.execute(stmt)).mappings().all()]
+
+        return await query_cache.fetch(stmt, load, tags=tags, ttl=ttl)
+
+    @staticmethod
+    def _with_window_total(page: Any, mode: TotalMode, keyset: bool) -> Any:
+        """
+        total=exact без курсора: добавить к запросу страницы последнюю колонку count(*) OVER ()
+        — общее число строк до LIMIT/OFFSET, без отдельного SELECT count(*).
+        С курсором окно посчитало бы лишь «оставшиеся» строки, поэтому там колонку не добавляем.
+        """
+        if mode == "exact" and not keyset:
+            return page.add_columns(func.count().over().label("total_"))
+        return page
+
+    async def _total(self, base: Any, mode: TotalMode, rows: Sequence[Any], *, windowed: bool) -> Optional[int]:
+        """
+        total для списка, построенного на base (запрос без сортировки и пагинации).
+          • windowed — страница выбиралась с _with_window_total: берём число из неё;
+            пустая страница (offset за концом списка) — досчитываем отдельно.
+        """
+        if mode == "none":
+            return None
+        if windowed and rows:
+            return int(rows[0][-1])
+        count_stmt = select(func.count().label("n")).select_from(base.subquery())
+        if mode == "estimate":
+            found = await self._cached_rows(count_stmt, ttl=settings.LIST_TOTAL_CACHE_TTL_SECONDS)
+            return int(found[0]["n"])
+        async with self._sm() as s:
+            return (await s.execute(count_stmt)).scalar_one()
 
     # # --- Хелперы для работы с сессией/транзакцией ---
 
@@ -6,46 +6,208 @@
 #   • Нужен анкетам, чтобы подцеплять registration_end_date (и не только).
 # ОСОБЕННОСТИ:
 #   • Асинхронные сессии per-operation, как у остальных реп.
+#   • get_by_id читает через кэш процесса (LRU + TTL, см. infrastructure/cache.py):
+#     хакатоны меняются редко, а читаются на каждой детальной карточке.
+#     update/delete явно сбрасывают запись; другие воркеры увидят изменения по истечении TTL.
+#   • list_open — экран поиска хакатонов: q (полнотекст по name/description/city + подстрока
+#     в названии), фильтры mode / city / даты старта / «регистрация открыта», несколько сортировок
+#     с keyset-курсором; facets_open — счётчики по mode и city для тех же фильтров.
+#     Каждое сочетание обслуживает свой частичный индекс (initdb_db/04f_hackathon_search.sql).
 # =============================================================================
 
 from __future__ import annotations
-from typing import Optional, List
-from sqlalchemy import select, func
+from datetime import datetime
+from typing import Any, Optional, List, Dict, Tuple, Literal
+from sqlalchemy import select, func, cast, any_, bindparam, Integer, Text, tuple_, literal, literal_column, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.sql.elements import ColumnElement
 from backend.repositories.base import BaseRepository
+from backend.repositories import skill_index  # Удалённый хакатон — вон из индекса навыков в памяти
+from backend.infrastructure.dataloader import get_loader, forget
+from backend.infrastructure.cache import TTLCache
+from backend.utils.cursor import decode_cursor, encode_cursor
+from backend.settings.config import settings
 from backend.persistend.models import hackathon as m_hack
 
 
+# Кэш хакатонов по id на процесс. Хранит отсоединённые ORM-объекты — их нельзя изменять.
+_by_id_cache: TTLCache[int, m_hack.Hackathon] = TTLCache(
+    "hackathons.by_id",
+    maxsize=settings.HACKATHON_CACHE_SIZE,
+    ttl=settings.HACKATHON_CACHE_TTL_SECONDS,
+)
+
+
+# Генерируемая колонка hackathon.search_tsv (initdb_db/04f_hackathon_search.sql); в модели её нет,
+# чтобы select(Hackathon) не тянул tsvector в приложение (как users.search_tsv).
+_search_tsv = literal_column("hackathon.search_tsv", type_=TSVECTOR)
+
+HackathonSort = Literal["start_desc", "start_asc", "registration_end", "relevance"]
+
+
+def hackathon_text_search(q: str) -> Tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    Поиск хакатонов: (условие WHERE, ранг).
+      • полнотекстовый по search_tsv (name — A, description — B, city — C) ИЛИ
+      • подстрока в lower(name) — для «hack», «itmo» и недописанных слов.
+    Оба условия покрыты GIN-индексами; выражения обязаны совпадать с индексными.
+    """
+    H = m_hack.Hackathon
+    query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), q)
+    needle = q.lower()
+    name = func.lower(H.name)
+    cond = _search_tsv.op("@@")(query) | name.like(f"%{needle}%")
+    rank = func.ts_rank(_search_tsv, query) + func.word_similarity(needle, name)
+    return cond, rank
+
+
 class HackathonsRepo(BaseRepository):
     """Мини-репозиторий для хакатонов."""
 
     async def get_by_id(self, hackathon_id: int) -> Optional[m_hack.Hackathon]:
-        """Вернуть один хакатон по id (или None)."""
+        """
+        Вернуть один хакатон по id (или None).
+        Сначала — кэш процесса; промах внутри HTTP-запроса идёт через DataLoader, вне запроса — в БД напрямую.
+        Через get_or_load: строку, загруженную до update()/delete(), кэш не сохранит; отсутствие
+        не кэшируется — созданный хакатон виден сразу.
+        """
+        async def load() -> Optional[m_hack.Hackathon]:
+            loader = get_loader("hackathons.by_id", self._load_many)
+            if loader is not None:
+                return await loader.load(hackathon_id)
+            async with self._sm() as s:
+                return await s.get(m_hack.Hackathon, hackathon_id)
+
+        return await _by_id_cache.get_or_load(hackathon_id, load)
+
+    async def _load_many(self, ids: List[int]) -> Dict[int, m_hack.Hackathon]:
+        """Batch-функция DataLoader'а: хакатоны по списку id одним запросом WHERE id = ANY(:ids)."""
+        H = m_hack.Hackathon
         async with self._sm() as s:
-            return await s.get(m_hack.Hackathon, hackathon_id)
+            res = await s.execute(select(H).where(H.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))))
+            return {h.id: h for h in res.scalars().all()}
+
+    @staticmethod
+    def _open_filter(
+        stmt,
+        q: str | None,
+        *,
+        mode: str | None = None,
+        city: str | None = None,
+        start_from: datetime | None = None,
+        start_to: datetime | None = None,
+        registration_open: bool = False,
+    ):
+        """
+        Условия списка открытых хакатонов: status = 'open' и (опционально)
+          • q — hackathon_text_search;
+          • mode — точное совпадение; city — без учёта регистра (lower(city) = lower(:city));
+          • start_from ≤ start_date < start_to;
+          • registration_open — registration_end_date > now() (хакатоны без даты окончания регистрации не попадают).
+        """
+        H = m_hack.Hackathon
+        stmt = stmt.where(H.status == "open")
+        if q:
+            stmt = stmt.where(hackathon_text_search(q)[0])
+        if mode:
+            stmt = stmt.where(H.mode == mode)
+        if city:
+            stmt = stmt.where(func.lower(H.city) == city.lower())
+        if start_from is not None:
+            stmt = stmt.where(H.start_date >= start_from)
+        if start_to is not None:
+            stmt = stmt.where(H.start_date < start_to)
+        if registration_open:
+            stmt = stmt.where(H.registration_end_date > func.now())
+        return stmt
 
     async def list_open(
         self,
         q: str | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> List[m_hack.Hackathon]:
+        cursor: str | None = None,
+        *,
+        mode: str | None = None,
+        city: str | None = None,
+        start_from: datetime | None = None,
+        start_to: datetime | None = None,
+        registration_open: bool = False,
+        sort: HackathonSort = "start_desc",
+    ) -> Tuple[List[m_hack.Hackathon], Optional[str]]:
         """
-        Список открытых хакатонов.
-          • q — текстовый фильтр по name/description (опционально, простой ILIKE).
+        Список открытых хакатонов с фильтрами (см. _open_filter) и сортировкой:
+          • start_desc (по умолчанию) — start_date DESC, id DESC;
+          • start_asc — ближайшие по старту сначала;
+          • registration_end — registration_end_date ASC, id ASC (только хакатоны с датой окончания регистрации);
+          • relevance — ранг hackathon_text_search, только вместе с q (иначе ValueError("relevance_requires_q")).
+        cursor — keyset-пагинация по ключу сортировки (курсор одной сортировки к другой не подходит).
+        Возвращает (items, next_cursor); next_cursor None на последней странице.
         """
         H = m_hack.Hackathon
+        filters = dict(mode=mode, city=city, start_from=start_from, start_to=start_to, registration_open=registration_open)
+        stmt = self._open_filter(select(H), q, **filters)
+
+        descending = sort in ("start_desc", "relevance")
+        if sort == "relevance":
+            if not q:
+                raise ValueError("relevance_requires_q")
+            keys, types = [hackathon_text_search(q)[1], H.id], (float, int)
+        elif sort == "registration_end":
+            stmt = stmt.where(H.registration_end_date.is_not(None))
+            keys, types = [H.registration_end_date, H.id], (datetime, int)
+        else:
+            keys, types = [H.start_date, H.id], (datetime, int)
+
+        # start_desc сохраняет прежний вид курсора — ссылки на страницы, выданные до сортировок, работают
+        kind = "hackathons:open" if sort == "start_desc" else f"hackathons:open:{sort}"
+        after = decode_cursor(cursor, kind, types) if cursor else None
+        stmt = stmt.add_columns(*keys).order_by(*(k.desc() if descending else k.asc() for k in keys)).limit(limit)
+        if after is not None:
+            key, bound = tuple_(*keys), tuple_(*after)
+            stmt = stmt.where(key < bound if descending else key > bound)
+        else:
+            stmt = stmt.offset(offset)
         async with self._sm() as s:
-            stmt = select(H).where(H.status == "open")
+            rows = (await s.execute(stmt)).all()
+        next_cursor = encode_cursor(kind, tuple(rows[-1][1:])) if len(rows) == limit else None
+        return [row[0] for row in rows], next_cursor
 
-            if q:
-                like = f"%{q}%"
-                # простая OR-фильтрация (при желании вынести в to_tsvector полнотекст)
-                stmt = stmt.where((H.name.ilike(like)) | (H.description.ilike(like)))
+    async def facets_open(
+        self,
+        q: str | None = None,
+        *,
+        mode: str | None = None,
+        city: str | None = None,
+        start_from: datetime | None = None,
+        start_to: datetime | None = None,
+        registration_open: bool = False,
+    ) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Счётчики для фильтров экрана: {"mode": [(mode, n), ...], "city": [(city, n), ...]} по убыванию n.
+        Каждый фасет считается при всех остальных фильтрах, кроме своего (выбранный mode не
+        обнуляет счётчики соседних mode). Города — без учёта регистра, хакатоны без города не считаются.
+        Один запрос: UNION ALL двух GROUP BY.
+        """
+        H = m_hack.Hackathon
+        common = dict(start_from=start_from, start_to=start_to, registration_open=registration_open)
+        by_mode = self._open_filter(
+            select(literal("mode").label("facet"), cast(H.mode, Text).label("value"), func.count().label("n")),
+            q, city=city, **common,
+        ).group_by(H.mode)
+        by_city = self._open_filter(
+            select(literal("city").label("facet"), func.min(H.city).label("value"), func.count().label("n")),
+            q, mode=mode, **common,
+        ).where(H.city.is_not(None)).group_by(func.lower(H.city))
+        stmt = union_all(by_mode, by_city).subquery()
+        result: Dict[str, List[Tuple[str, int]]] = {"mode": [], "city": []}
+        async with self._sm() as s:
+            for facet, value, n in (await s.execute(
+                select(stmt).order_by(stmt.c.facet, stmt.c.n.desc(), stmt.c.value)
+            )).all():
+                result[facet].append((value, n))
+        return result
 
-            stmt = stmt.order_by(H.start_date.desc()).limit(limit).offset(offset)
-            res = await s.execute(stmt)
-            return list(res.scalars().all())
-    
     async def create(self, **data: Any) -> m_hack.Hackathon:
         """
         Создать новый хакатон.
@@ -78,6 +240,8 @@ class HackathonsRepo(BaseRepository):
 
             await s.commit()
             await s.refresh(obj)
+            forget("hackathons.by_id", hackathon_id)
+            _by_id_cache.invalidate(hackathon_id)
             return obj
 
     async def delete(self, hackathon_id: int) -> bool:
@@ -92,4 +256,8 @@ class HackathonsRepo(BaseRepository):
 
             await s.delete(obj)
             await s.commit()
+            forget("hackathons.by_id", hackathon_id)
+            _by_id_cache.invalidate(hackathon_id)
+            # Заявки ушли каскадом — поток изменений индекса навыков этого не видит
+            skill_index.forget_hackathon(hackathon_id)
             return True
\ No newline at end of file
@@ -0,0 +1,221 @@
+# =============================================================================
+# ФАЙЛ: backend/repositories/skill_index.py
+# КРАТКО: наполнение и свежесть битового индекса навыков (infrastructure/bitmap_index.py).
+# ЗАЧЕМ:
+#   • UsersRepo.search_users при поиске по навыкам (без q) сначала спрашивает индекс:
+#     отбор, match_count, total и порядок страницы считаются в памяти, из БД дочитываются
+#     только профили одной страницы. Если индекс выключен или ещё строится — обычный SQL.
+# КАК ДЕРЖИМ СВЕЖИМ:
+#   • Полная сборка — в фоне при старте и раз в SKILL_INDEX_REBUILD_SECONDS (а также когда
+#     порядок слотов нарушен или накопилось много «дырок»). Пока идёт сборка, отвечает старый индекс —
+#     кроме нарушенного порядка слотов: страницы и курсоры по нему неверны, поэтому до перестройки
+#     поиск идёт в SQL.
+#   • Поток изменений — по updated_at: users (skill_ids ведут триггеры на user_skill, они же
+#     двигают updated_at) и application, в порядке (updated_at, id) — в нём же выдаются слоты.
+#     Сверка не чаще раза в SKILL_INDEX_SYNC_SECONDS, читаем внахлёст на
+#     SKILL_INDEX_SYNC_OVERLAP_SECONDS (now() транзакции ≠ момент commit).
+#   • Записи этого процесса в users/user_skill/application (после commit, см. on_tables_committed)
+#     помечают индекс «грязным» — следующий поиск сначала догонит изменения: свои записи видны сразу.
+#   • Удаление заявки или хакатона поток изменений не видит — ApplicationsRepo.delete и
+#     HackathonsRepo.delete сообщают о нём напрямую (пользователей приложение не удаляет);
+#     удаления из других воркеров и мимо приложения исчезнут при ближайшей полной сборке.
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, literal_column, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from backend.settings.config import settings
+from backend.infrastructure.bitmap_index import SkillBitmapIndex
+from backend.infrastructure.cache import register_stats
+from backend.infrastructure.db import on_tables_committed
+from backend.infrastructure.workers import run_cpu
+from backend.repositories.base import BaseRepository
+from backend.persistend.models import users as m_users
+from backend.persistend.models import application as m_app
+
+log = logging.getLogger(__name__)
+
+_WATCHED = {"users", "user_skill", "application"}  # Записи в эти таблицы могут изменить ответ индекса
+
+
+class _IndexState:
+    """Текущий индекс процесса и всё, что нужно для его обновления."""
+
+    def __init__(self) -> None:
+        self.index: Optional[SkillBitmapIndex] = None
+        self.watermark: Optional[datetime] = None  # max(updated_at) из уже применённых строк
+        self.synced_at = 0.0                       # monotonic последней сверки с БД
+        self.built_at = 0.0                        # monotonic последней полной сборки
+        self.dirty = False                         # Этот процесс писал в _WATCHED после последней сверки
+        self.lock = asyncio.Lock()                 # Одна сверка за раз
+        self.rebuild_task: Optional[asyncio.Task] = None
+        self.hits = 0                              # Поисков, отвеченных индексом
+        self.fallbacks = 0                         # Поисков, ушедших в SQL (индекс не готов)
+        self.syncs = 0
+        self.rebuilds = 0
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "enabled": settings.SKILL_INDEX_ENABLED,
+            "ready": self.index is not None,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "syncs": self.syncs,
+            "rebuilds": self.rebuilds,
+            "rebuilding": self.rebuild_task is not None and not self.rebuild_task.done(),
+        }
+        if self.index is not None:
+            out.update(self.index.stats())
+        return out
+
+
+_state = _IndexState()
+register_stats("skill_index", _state)
+
+
+async def _on_commit(tables: Set[str]) -> None:
+    if _WATCHED & tables:
+        _state.dirty = True
+
+
+on_tables_committed(_on_commit)
+
+
+def forget_application(hackathon_id: int, user_id: int) -> None:
+    """Заявка удалена (поток изменений по updated_at удаления не видит)."""
+    if _state.index is not None:
+        _state.index.remove_application(hackathon_id, user_id)
+
+
+def forget_hackathon(hackathon_id: int) -> None:
+    """Хакатон удалён вместе с заявками (каскад) — фильтр hackathon_id и total больше его не видят."""
+    if _state.index is not None:
+        _state.index.remove_hackathon(hackathon_id)
+
+
+class SkillIndexRepo(BaseRepository):
+    """Чтение данных для индекса и поиск через него."""
+
+    # users.skill_ids — вне ORM-модели (см. UsersRepo), читаем колонкой
+    _skill_ids = literal_column("users.skill_ids", type_=ARRAY(Integer))
+
+    async def _changed_users(self, since: Optional[datetime]) -> List[Tuple[int, List[int], datetime]]:
+        u = m_users.User
+        # Порядок (updated_at, id) — порядок слотов индекса: upsert_user выдаёт слоты по очереди
+        stmt = select(u.id, self._skill_ids, u.updated_at).order_by(u.updated_at, u.id)
+        if since is not None:
+            stmt = stmt.where(u.updated_at >= since)
+        async with self._sm() as s:
+            return [(uid, list(sk or ()), ts) for uid, sk, ts in (await s.execute(stmt)).all()]
+
+    async def _changed_applications(self, since: Optional[datetime]) -> List[Tuple[int, int, Optional[str], datetime]]:
+        a = m_app.Application
+        stmt = select(a.hackathon_id, a.user_id, a.role, a.updated_at).order_by(a.updated_at, a.id)
+        if since is not None:
+            stmt = stmt.where(a.updated_at >= since)
+        async with self._sm() as s:
+            return [
+                (h, uid, role.value if role is not None else None, ts)
+                for h, uid, role, ts in (await s.execute(stmt)).all()
+            ]
+
+    async def _rebuild(self) -> None:
+        """Полная сборка нового индекса (CPU-часть — в пуле процессов, чтобы не останавливать event loop)."""
+        started = time.monotonic()
+        users = await self._changed_users(None)
+        apps = await self._changed_applications(None)
+        index = await run_cpu(SkillBitmapIndex.build, users, [(h, uid, role) for h, uid, role, _ in apps])
+        stamps = [ts for *_, ts in users] + [ts for *_, ts in apps]
+        async with _state.lock:
+            _state.index = index
+            _state.watermark = max(stamps) if stamps else None
+            _state.built_at = _state.synced_at = time.monotonic()
+            _state.dirty = True  # Догоняем то, что записали, пока шла сборка
+            _state.rebuilds += 1
+        log.info("skill index rebuilt: %s in %.2fs", index.stats(), time.monotonic() - started)
+
+    def start_rebuild(self) -> None:
+        """Запустить полную сборку в фоне (если она ещё не идёт)."""
+        task = _state.rebuild_task
+        if task is not None and not task.done():
+            return
+
+        async def run() -> None:
+            try:
+                await self._rebuild()
+            except Exception:
+                log.exception("skill index rebuild failed")
+
+        # Пустой контекст: задача переживёт запрос и не должна унаследовать его unit of work / DataLoader'ы
+        _state.rebuild_task = asyncio.get_running_loop().create_task(run(), context=contextvars.Context())
+
+    async def _sync(self) -> None:
+        """Догнать изменения users/application с последней сверки (внахлёст)."""
+        index = _state.index
+        assert index is not None
+        since = _state.watermark - timedelta(seconds=settings.SKILL_INDEX_SYNC_OVERLAP_SECONDS) if _state.watermark else None
+        _state.dirty = False  # Сбрасываем до чтения: запись во время сверки снова пометит индекс
+        users = await self._changed_users(since)
+        apps = await self._changed_applications(since)
+        for uid, sk, ts in users:
+            index.upsert_user(uid, sk, ts)
+        for h, uid, role, _ in apps:
+            index.set_application(h, uid, role)
+        stamps = [ts for *_, ts in users] + [ts for *_, ts in apps]
+        if stamps:
+            _state.watermark = max([*stamps, *([_state.watermark] if _state.watermark else [])])
+        _state.synced_at = time.monotonic()
+        _state.syncs += 1
+
+    async def index(self) -> Optional[SkillBitmapIndex]:
+        """Свежий индекс или None (выключен, ещё не собран или порядок слотов нарушен — тогда ищем в SQL)."""
+        if not settings.SKILL_INDEX_ENABLED:
+            return None
+        index = _state.index
+        if index is None:
+            self.start_rebuild()
+            return None
+        if index.needs_rebuild() or time.monotonic() - _state.built_at > settings.SKILL_INDEX_REBUILD_SECONDS:
+            self.start_rebuild()  # Фоном; пока отвечает текущий индекс
+        if _state.dirty or time.monotonic() - _state.synced_at > settings.SKILL_INDEX_SYNC_SECONDS:
+            async with _state.lock:
+                if _state.index is index and (
+                    _state.dirty or time.monotonic() - _state.synced_at > settings.SKILL_INDEX_SYNC_SECONDS
+                ):
+                    await self._sync()
+        index = _state.index
+        if index is not None and index.out_of_order:
+            # Слоты не по (updated_at, id): порядок страниц и курсоры врут — до перестройки отвечает SQL
+            self.start_rebuild()
+            return None
+        return index
+
+    async def search(
+        self,
+        skill_ids: Sequence[int],
+        mode: str,
+        *,
+        limit: int,
+        offset: int,
+        after: Optional[Tuple],
+        hackathon_id: Optional[int],
+        role: Optional[str],
+    ) -> Optional[Tuple[List[Tuple[int, Optional[int], datetime]], int]]:
+        """Поиск через индекс: ([(user_id, match_count, updated_at)], total) или None — идите в SQL."""
+        index = await self.index()
+        if index is None:
+            _state.fallbacks += settings.SKILL_INDEX_ENABLED
+            return None
+        _state.hits += 1
+        return index.search(
+            skill_ids, mode, limit=limit, offset=offset, after=after, hackathon_id=hackathon_id, role=role
+        )
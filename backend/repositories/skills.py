@@ -1,12 +1,19 @@
-# ЭТОТ ФАЙЛ НЕ ИСПОЛЬЗУЕТСЯ НИГДЕ!!!
 # =============================================================================
 # ФАЙЛ: backend/repositories/skills.py
-# КРАТКО: репозиторий для работы со справочником навыков (таблица skill).
+# КРАТКО: репозиторий для работы со справочником навыков (таблица skill) + его кэш в памяти процесса.
 # ЗАЧЕМ:
 #   • Давать удобные методы чтения/поиска навыков из БД через ORM.
 #   • Прятать детали работы с сессиями: репозиторий сам открывает/закрывает сессию.
+#   • skill — маленький и почти неизменяемый справочник (его наполняет 06_seed_dicts.sql),
+#     поэтому держим его целиком в памяти: slug ↔ id ↔ name без похода в БД.
 # ОСОБЕННОСТИ:
-#   • Метод map_by_slugs(slugs) возвращает словарь {slug -> Skill}.
+#   • SkillCatalog — неизменяемый снимок справочника. Его можно свободно читать из любых
+#     корутин: при обновлении снимок не правится, а целиком подменяется новым.
+#   • Снимок живёт SKILL_CATALOG_TTL_SECONDS; по истечении проверяем «отпечаток» таблицы
+#     (count(*), max(updated_at)) — один дешёвый запрос — и перечитываем справочник,
+#     только если отпечаток изменился. updated_at в skill ведёт триггер trg_skill_updated.
+#   • invalidate_skill_catalog() — принудительно сбросить снимок (после правок справочника).
+#   • Метод map_by_slugs(slugs) возвращает словарь {slug -> SkillRef}.
 #   • Нормализуем входные slug'и (strip + lower) и убираем дубликаты.
 #   • Пустой вход → пустой словарь (без лишних запросов к БД).
 # ПРЕДПОСЫЛКИ:
@@ -16,55 +23,168 @@
 
 from __future__ import annotations  # Отложенная оценка аннотаций типов — удобно для ORM-типов
 
-from typing import Sequence, Mapping, Dict  # Аннотации: последовательности и отображения (dict-подобные)
-from sqlalchemy import select              # Конструктор SELECT-запросов SQLAlchemy 2.0
+import asyncio                             # Lock: перечитывать справочник будет только одна корутина
+import time                                # monotonic() — отсчёт TTL снимка
+from dataclasses import dataclass          # Неизменяемые контейнеры для снимка справочника
+from types import MappingProxyType         # Read-only «вид» на словарь
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple  # Аннотации типов
 
-from backend.repositories.base import BaseRepository  # База репозиториев: даёт self.session()/self.transaction()
+from sqlalchemy import select, func        # Конструктор SELECT-запросов SQLAlchemy 2.0 и агрегаты
+
+from backend.settings.config import settings          # TTL снимка справочника
+from backend.repositories.base import BaseRepository  # База репозиториев: даёт self._sm()
 from backend.persistend.models.skill import Skill     # ORM-модель таблицы "skill"
 
+
+@dataclass(frozen=True)
+class SkillRef:
+    """Навык из справочника в памяти: те же поля, что отдаёт API (id, slug, name)."""
+    id: int
+    slug: str
+    name: str
+
+
+@dataclass(frozen=True)
+class SkillCatalog:
+    """
+    Неизменяемый снимок справочника навыков.
+      • by_slug / by_id — read-only словари;
+      • fingerprint — (count, max(updated_at)) таблицы на момент загрузки;
+      • loaded_at — time.monotonic() момента загрузки/последней проверки.
+    """
+    by_slug: Mapping[str, SkillRef]
+    by_id: Mapping[int, SkillRef]
+    fingerprint: Tuple
+    loaded_at: float
+
+    @classmethod
+    def build(cls, skills: Iterable[SkillRef], fingerprint: Tuple) -> "SkillCatalog":
+        items = list(skills)
+        return cls(
+            by_slug=MappingProxyType({sk.slug: sk for sk in items}),
+            by_id=MappingProxyType({sk.id: sk for sk in items}),
+            fingerprint=fingerprint,
+            loaded_at=time.monotonic(),
+        )
+
+    def resolve(self, slugs: Iterable[str]) -> Tuple[List[SkillRef], List[str]]:
+        """
+        Разрешить slug'и (уже нормализованные) в навыки.
+        Возвращает (найденные навыки в порядке входа, неизвестные slug'и).
+        """
+        found: List[SkillRef] = []
+        unknown: List[str] = []
+        for slug in slugs:
+            sk = self.by_slug.get(slug)
+            if sk is None:
+                unknown.append(slug)
+            else:
+                found.append(sk)
+        return found, unknown
+
+    def sorted_by_name(self, skill_ids: Iterable[int]) -> List[SkillRef]:
+        """Навыки по id, отсортированные по имени (как ORDER BY skill.name). Неизвестные id пропускаются."""
+        refs = [self.by_id[sid] for sid in skill_ids if sid in self.by_id]
+        refs.sort(key=lambda sk: sk.name)
+        return refs
+
+
+# ---- Кэш справочника на процесс ----
+
+_catalog: Optional[SkillCatalog] = None   # Текущий снимок (None — ещё не загружен или сброшен)
+_catalog_lock = asyncio.Lock()            # Одна загрузка за раз; остальные ждут и берут её результат
+
+
+def invalidate_skill_catalog() -> None:
+    """Сбросить снимок: следующее обращение перечитает справочник из БД."""
+    global _catalog
+    _catalog = None
+
+
 class SkillsRepo(BaseRepository):
     """
     Репозиторий для чтения данных о навыках.
 
     Наследуемся от BaseRepository:
       • не принимаем AsyncSession снаружи;
-      • открываем краткоживущую сессию «на операцию» через self.session().
+      • открываем краткоживущую сессию «на операцию» через self._sm().
     """
 
-    async def map_by_slugs(self, slugs: Sequence[str]) -> Mapping[str, Skill]:
+    async def catalog(self, *, force: bool = False) -> SkillCatalog:
+        """
+        Вернуть актуальный снимок справочника.
+          • Свежий снимок (моложе TTL) отдаём без обращения к БД.
+          • Устаревший — сверяем отпечаток таблицы; если не изменился, просто продлеваем снимок.
+          • force=True — сверить отпечаток без оглядки на TTL (например, встретился незнакомый slug/id):
+            это один лёгкий запрос, полная перезагрузка — только если таблица действительно менялась.
         """
-        Вернуть словарь {slug -> Skill} по списку slug'ов.
+        global _catalog
+        ttl = settings.SKILL_CATALOG_TTL_SECONDS
+        cur = _catalog
+        if not force and cur is not None and time.monotonic() - cur.loaded_at < ttl:
+            return cur
+
+        async with _catalog_lock:
+            # Пока ждали блокировку, справочник мог обновить кто-то другой
+            if _catalog is not None and _catalog is not cur:
+                return _catalog
+
+            async with self._sm() as s:
+                fingerprint = tuple(
+                    (await s.execute(select(func.count(), func.max(Skill.updated_at)).select_from(Skill))).one()
+                )
+                if cur is not None and cur.fingerprint == fingerprint:
+                    # Справочник не менялся — тот же снимок, новый отсчёт TTL
+                    _catalog = SkillCatalog(cur.by_slug, cur.by_id, fingerprint, time.monotonic())
+                    return _catalog
+
+                res = await s.execute(select(Skill.id, Skill.slug, Skill.name))
+                _catalog = SkillCatalog.build(
+                    (SkillRef(id=sid, slug=slug, name=name) for sid, slug, name in res.all()),
+                    fingerprint,
+                )
+            return _catalog
+
+    async def resolve_slugs(self, slugs: Sequence[str]) -> Tuple[List[SkillRef], List[str]]:
+        """
+        Разрешить нормализованные slug'и через снимок справочника: (найденные, неизвестные).
+        Если какие-то slug'и не нашлись, один раз сверяем отпечаток таблицы — вдруг навык
+        добавили уже после загрузки снимка.
+        """
+        found, unknown = (await self.catalog()).resolve(slugs)
+        if unknown:
+            found, unknown = (await self.catalog(force=True)).resolve(slugs)
+        return found, unknown
+
+    async def catalog_covering(self, skill_ids: Iterable[int]) -> SkillCatalog:
+        """Снимок, в котором есть все переданные id; незнакомый id — повод сверить снимок с БД."""
+        cat = await self.catalog()
+        if any(sid not in cat.by_id for sid in skill_ids):
+            cat = await self.catalog(force=True)
+        return cat
+
+    async def map_by_slugs(self, slugs: Sequence[str]) -> Mapping[str, SkillRef]:
+        """
+        Вернуть словарь {slug -> SkillRef} по списку slug'ов.
 
         Поведение:
           • Нормализуем вход: берём только непустые строки, обрезаем пробелы и приводим к lower().
           • Убираем дубликаты (работаем с set).
           • Если после нормализации ничего не осталось — сразу возвращаем {}.
-          • Делаем один запрос: SELECT * FROM skill WHERE slug IN (:slugs...)
-          • Собираем результат в словарь по фактическим slug из БД.
+          • Ищем slug'и в снимке справочника (обычно без запроса к БД).
 
         Пример:
             repo = SkillsRepo()
             mapping = await repo.map_by_slugs([" Python ", "docker", "python"])
-            # mapping может быть: {"python": <Skill ...>, "docker": <Skill ...>}
+            # mapping может быть: {"python": SkillRef(...), "docker": SkillRef(...)}
         """
         # Нормализуем входные данные:
         #  - s and s.strip() отсеивает пустые/None
         #  - .strip() убирает пробелы
-        #  - .lower() делает регистр единым (если slug хранится в нижнем регистре)
+        #  - .lower() делает регистр единым (slug хранится в нижнем регистре)
         norm_slugs = {s.strip().lower() for s in slugs if s and s.strip()}
         if not norm_slugs:
             return {}
 
-        # Открываем новую сессию на время операции чтения.
-        # Коммит не нужен — мы ничего не изменяем.
-        async with self.session() as session:
-            # Строим SELECT: берём все навыки, чей slug входит в нормализованный набор
-            stmt = select(Skill).where(Skill.slug.in_(norm_slugs))
-
-            # Выполняем запрос. scalars() достаёт «чистые» ORM-объекты (без кортежей).
-            result = await session.execute(stmt)
-            skills = result.scalars().all()
-
-        # Собираем {slug -> Skill}. Берём slug из объектов БД (а не из входа) — так точнее.
-        mapping: Dict[str, Skill] = {obj.slug: obj for obj in skills}
-        return mapping
+        found, _ = await self.resolve_slugs(sorted(norm_slugs))
+        return {sk.slug: sk for sk in found}
@@ -0,0 +1,129 @@
+# =============================================================================
+# ФАЙЛ: backend/repositories/team_formation.py
+# КРАТКО: данные для автоподбора команд хакатона и запись предложенных команд.
+# ЗАЧЕМ:
+#   • Читает «свободных» участников: опубликованные анкеты, ещё не joined, чей владелец
+#     не состоит ни в одной команде этого хакатона (и не капитан), — вместе с их навыками.
+#   • Записывает все предложенные команды и их участников одной транзакцией: если кто-то
+#     успел вступить в команду (триггер trg_one_team_per_hack), не записывается ничего.
+#   • В той же транзакции — учёт, как у accept_invite (07_procedures.sql): анкеты участников
+#     joined = TRUE / hidden, их pending-инвайты по этому хакатону — expired.
+#     Отклики (response) не трогаем: в таблице нет ссылки на анкету/пользователя, связать их не с чем.
+# =============================================================================
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, insert, update, exists, literal_column, table, column, Enum, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from backend.repositories.base import BaseRepository
+from backend.persistend.enums import ApplicationStatus, InviteStatus, TeamStatus
+from backend.persistend.models import users as m_users
+from backend.persistend.models import application as m_app
+from backend.persistend.models import hackathon as m_hack
+from backend.persistend.models import team as m_team
+
+# (application_id, user_id, role | None, skill_ids)
+FreeApplicant = Tuple[int, int, Optional[str], List[int]]
+
+# ORM-модели инвайта нет — для UPDATE хватает описания нужных колонок
+_invite = table(
+    "invite",
+    column("id"), column("team_id"), column("application_id"),
+    column("status", Enum(InviteStatus, name="invite_status")),
+)
+
+
+class TeamFormationRepo(BaseRepository):
+    """Чтение свободных участников и пакетное создание команд."""
+
+    _skill_ids = literal_column("users.skill_ids", type_=ARRAY(Integer))  # вне ORM-модели (см. UsersRepo)
+
+    async def size_bounds(self, hackathon_id: int) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """(team_members_minimum, team_members_limit) хакатона или None, если хакатона нет."""
+        H = m_hack.Hackathon
+        async with self._sm() as s:
+            row = (await s.execute(
+                select(H.team_members_minimum, H.team_members_limit).where(H.id == hackathon_id)
+            )).first()
+        return (row[0], row[1]) if row else None
+
+    async def free_applicants(self, hackathon_id: int) -> List[FreeApplicant]:
+        """Анкеты хакатона, чьи владельцы ещё без команды (по возрастанию id анкеты)."""
+        A, U = m_app.Application, m_users.User
+        T, TM = m_team.Team, m_team.TeamMember
+        in_team = exists(
+            select(TM.user_id).join(T, T.id == TM.team_id)
+            .where(T.hackathon_id == hackathon_id, TM.user_id == A.user_id)
+        )
+        is_captain = exists(select(T.id).where(T.hackathon_id == hackathon_id, T.captain_id == A.user_id))
+        stmt = (
+            select(A.id, A.user_id, A.role, self._skill_ids)
+            .join(U, U.id == A.user_id)
+            .where(
+                A.hackathon_id == hackathon_id,
+                A.status == ApplicationStatus.published,
+                A.joined.is_(False),
+                ~in_team,
+                ~is_captain,
+            )
+            .order_by(A.id)
+        )
+        async with self._sm() as s:
+            rows = (await s.execute(stmt)).all()
+        return [(app_id, uid, role.value if role is not None else None, list(sk or ())) for app_id, uid, role, sk in rows]
+
+    async def create_teams(
+        self, hackathon_id: int, teams: Sequence[Sequence[Tuple[int, str]]], *, name_prefix: str = "Team"
+    ) -> List[int]:
+        """
+        Создать команды одной транзакцией. teams — составы [(user_id, role), ...], первый — капитан.
+        Анкеты участников скрываются (joined), их ожидающие инвайты на этом хакатоне истекают.
+        Возвращает id созданных команд в порядке teams.
+        """
+        if not teams:
+            return []
+        A, T, TM = m_app.Application, m_team.Team, m_team.TeamMember
+        user_ids = [uid for members in teams for uid, _role in members]
+        async with self._sm() as s:
+            team_ids = list((await s.scalars(
+                insert(T).returning(T.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "hackathon_id": hackathon_id,
+                        "captain_id": members[0][0],
+                        "name": f"{name_prefix} {i}",
+                        "status": TeamStatus.forming,
+                    }
+                    for i, members in enumerate(teams, start=1)
+                ],
+            )).all())
+            await s.execute(
+                insert(TM),
+                [
+                    {"team_id": team_id, "user_id": uid, "role": role, "is_captain": pos == 0}
+                    for team_id, members in zip(team_ids, teams)
+                    for pos, (uid, role) in enumerate(members)
+                ],
+            )
+            # Как accept_invite: анкета участника больше не ищет команду
+            app_ids = list((await s.scalars(
+                update(A)
+                .where(A.hackathon_id == hackathon_id, A.user_id.in_(user_ids))
+                .values(joined=True, status=ApplicationStatus.hidden)
+                .returning(A.id)
+            )).all())
+            # ...и прочие приглашения на этот хакатон ему уже не нужны
+            await s.execute(
+                update(_invite)
+                .where(
+                    _invite.c.application_id.in_(app_ids),
+                    _invite.c.team_id.in_(select(T.id).where(T.hackathon_id == hackathon_id)),
+                    _invite.c.status == InviteStatus.pending,
+                )
+                .values(status=InviteStatus.expired)
+            )
+            await s.commit()
+        return team_ids
@@ -10,22 +10,83 @@
 
 from __future__ import annotations  # Для отложенной оценки аннотаций типов (удобно с ORM-моделями)
 
-from typing import Optional, Sequence, Iterable, List, Tuple  # Аннотации типов для разных коллекций
-
-from sqlalchemy import select, func, literal, delete, insert  # SQLAlchemy: select-запросы, функции агрегатов, insert, delete
+from datetime import datetime  # Тип ключа updated_at в курсоре
+from typing import Optional, Sequence, Iterable, List, Tuple, Dict  # Аннотации типов для разных коллекций
+
+from sqlalchemy import select, func, literal, literal_column, delete, insert  # SQLAlchemy: select-запросы, функции агрегатов, insert, delete
+from sqlalchemy import exists, false, tuple_, union_all  # Апсерт одним выражением: CTE + UNION ALL + IS DISTINCT FROM
+from sqlalchemy import Integer, Text, cast, any_, bindparam  # = ANY(:ids) с массивом-параметром, приведение типов
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.dialects.postgresql import insert as pg_insert  # INSERT ... ON CONFLICT DO UPDATE
+from sqlalchemy.sql.elements import ColumnElement  # Тип выражений условия/ранга поиска
+# Request-scoped DataLoader: склеивает get_by_id/get_user_skills одного запроса в один SELECT
+from backend.infrastructure.dataloader import get_loader, forget
+from backend.infrastructure.db import touch_tables, in_unit_of_work  # Явная отметка записи; открыт ли unit of work
+from backend.utils.cursor import decode_cursor, encode_cursor  # Курсоры keyset-пагинации
 # Репозитории наследуются от BaseRepository, обеспечивающего работу с сессиями.
-from backend.repositories.base import BaseRepository
+from backend.repositories.base import BaseRepository, TotalMode
+# Справочник навыков в памяти процесса: slug ↔ id ↔ name без запросов к таблице skill
+from backend.repositories.skills import SkillsRepo, SkillRef
+from backend.repositories.skill_index import SkillIndexRepo
 # Импорты ORM-моделей для пользователей, навыков и связующей таблицы user_skill
 from backend.persistend.models import users as m_users
-from backend.persistend.models import skill as m_skill
 from backend.persistend.models import user_skill as m_us
 from backend.persistend.models import achievement as m_ach
-
+from backend.persistend.models import application as m_app
+
+
+def user_text_search(q: str) -> Tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    Текстовый поиск по людям: (условие WHERE, ранг похожести) для подстроки q.
+      • Условие — LIKE '%q%' по lower(username) ИЛИ по lower("Имя Фамилия");
+        оба выражения покрыты trigram GIN-индексами (initdb_db/04b_trgm_indexes.sql).
+      • Ранг — word_similarity(q, ...) по лучшему из двух полей: точное слово выше частичного совпадения.
+    Выражения обязаны совпадать с индексными, поэтому пробел и '' — литералы SQL, а не параметры.
+    """
+    u = m_users.User
+    needle = q.lower()
+    username = func.lower(u.username)
+    full_name = func.lower(
+        func.coalesce(u.first_name, literal_column("''"))
+        + literal_column("' '")
+        + func.coalesce(u.last_name, literal_column("''"))
+    )
+    pattern = f"%{needle}%"
+    cond = username.like(pattern) | full_name.like(pattern)
+    rank = func.greatest(func.word_similarity(needle, username), func.word_similarity(needle, full_name))
+    return cond, rank
+
+
+# Генерируемая колонка users.search_tsv (initdb_db/04c_users_fts.sql). В ORM-модель её не добавляем,
+# чтобы select(User) и RETURNING не тянули tsvector в приложение.
+_search_tsv = literal_column("users.search_tsv", type_=TSVECTOR)
+
+# users.skill_ids — отсортированные id навыков, их поддерживают триггеры на user_skill
+# (initdb_db/05a_user_skill_ids.sql). Приложение этот массив только читает, поэтому в модели его тоже нет.
+_skill_ids = literal_column("users.skill_ids", type_=ARRAY(Integer))
+
+
+def user_profile_search(q: str) -> Tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    Поиск по профилю целиком: полнотекстовый по search_tsv (username, имя, био, город, ВУЗ)
+    ИЛИ подстрока в username/имени (user_text_search — для «user1», «ива» и т.п.).
+    Ранг — ts_rank по весам tsvector плюс похожесть имени; оба условия обслуживают GIN-индексы.
+    """
+    query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), q)
+    name_cond, name_rank = user_text_search(q)
+    cond = _search_tsv.op("@@")(query) | name_cond
+    rank = func.ts_rank(_search_tsv, query) + name_rank
+    return cond, rank
 
 
 class UsersRepo(BaseRepository):
     """Репозиторий для работы с пользователями и их навыками. Сессии создаются per-operation."""
 
+    def __init__(self, sm=None) -> None:
+        super().__init__(sm)
+        self.skills = SkillsRepo(sm)  # Навыки (id/slug/name) берём из кэша справочника, а не JOIN'ом с skill
+        self.skill_index = SkillIndexRepo(sm)  # Битовый индекс навыков для поиска людей (если включён)
+
     # ---------- ЧТЕНИЕ ----------
 
     async def get_by_id(self, user_id: int) -> Optional[m_users.User]:
@@ -33,9 +94,23 @@ class UsersRepo(BaseRepository):
         Получение пользователя по его идентификатору (user_id).
         Используется метод get, который выполняет запрос по первичному ключу (PK).
         """
+        # Внутри HTTP-запроса — через DataLoader (батч + дедупликация), вне запроса — напрямую
+        loader = get_loader("users.by_id", self._load_users)
+        if loader is not None:
+            return await loader.load(user_id)
         async with self._sm() as s:  # Открытие сессии на время операции
             return await s.get(m_users.User, user_id)  # Получаем пользователя по первичному ключу
 
+    async def _load_users(self, user_ids: List[int]) -> Dict[int, m_users.User]:
+        """Batch-функция DataLoader'а: пользователи по списку id одним запросом WHERE id = ANY(:ids)."""
+        async with self._sm() as s:
+            res = await s.execute(
+                select(m_users.User).where(
+                    m_users.User.id == any_(bindparam("ids", user_ids, type_=ARRAY(Integer)))
+                )
+            )
+            return {u.id: u for u in res.scalars().all()}
+
     async def get_by_telegram_id(self, tg_id: int) -> Optional[m_users.User]:
         """
         Получение пользователя по его Telegram ID (telegram_id).
@@ -47,20 +122,42 @@ class UsersRepo(BaseRepository):
             )
             return res.scalars().first()  # Возвращаем первый найденный результат или None
 
-    async def get_user_skills(self, user_id: int) -> List[m_skill.Skill]:
+    async def get_user_skills(self, user_id: int) -> List[SkillRef]:
         """
         Получение списка навыков пользователя по его user_id, отсортированных по имени (skill.name).
-        Используется соединение между таблицами через M2M-связь.
+        Из БД читаем только id навыков (user_skill), имена/slug'и — из справочника в памяти.
+        Внутри HTTP-запроса вызовы склеиваются DataLoader'ом в один get_skills_for_users.
+        """
+        loader = get_loader("users.skills", self.get_skills_for_users)
+        if loader is not None:
+            return await loader.load(user_id)
+        return (await self.get_skills_for_users([user_id]))[user_id]
+
+    async def get_skills_for_users(self, user_ids: Iterable[int]) -> Dict[int, List[SkillRef]]:
+        """
+        Пакетная версия get_user_skills: навыки сразу для нескольких пользователей одним запросом.
+        Возвращает словарь {user_id -> [SkillRef, ...]} (навыки отсортированы по имени).
+        Пользователи без навыков получают пустой список.
         """
+        ids = list(dict.fromkeys(user_ids))  # Убираем дубликаты, сохраняя порядок
+        result: Dict[int, List[SkillRef]] = {uid: [] for uid in ids}
+        if not ids:
+            return result
+
+        skill_ids: Dict[int, List[int]] = {uid: [] for uid in ids}
         async with self._sm() as s:
             stmt = (
-                select(m_skill.Skill)
-                .join(m_us.user_skill, m_us.user_skill.c.skill_id == m_skill.Skill.id)  # JOIN с user_skill
-                .where(m_us.user_skill.c.user_id == user_id)  # WHERE user_id = :user_id
-                .order_by(m_skill.Skill.name.asc())  # Сортировка по имени навыка
+                select(m_us.user_skill.c.user_id, m_us.user_skill.c.skill_id)
+                .where(m_us.user_skill.c.user_id.in_(ids))  # WHERE user_id IN (:ids) — без JOIN с skill
             )
-            res = await s.execute(stmt)  # Выполнение запроса
-            return list(res.scalars().all())  # Возвращаем все найденные навыки в виде списка
+            for uid, sid in (await s.execute(stmt)).all():
+                skill_ids[uid].append(sid)
+
+        # Все id навыков разом: незнакомый id (справочник пополнили) — один повод сверить снимок
+        catalog = await self.skills.catalog_covering(sid for sids in skill_ids.values() for sid in sids)
+        for uid, sids in skill_ids.items():
+            result[uid] = catalog.sorted_by_name(sids)
+        return result
 
     async def get_user_achievements(self, user_id: int) -> List[m_ach.Achievement]:
         """
@@ -74,54 +171,109 @@ class UsersRepo(BaseRepository):
             )
             res = await s.execute(stmt)
             return list(res.scalars().all())
-    
+
+    async def get_achievements_for_users(self, user_ids: Iterable[int]) -> Dict[int, List[m_ach.Achievement]]:
+        """
+        Пакетная версия get_user_achievements: достижения сразу для нескольких пользователей одним запросом.
+        Возвращает словарь {user_id -> [Achievement, ...]} (новые сверху).
+        Пользователи без достижений получают пустой список.
+        """
+        ids = list(dict.fromkeys(user_ids))
+        result: Dict[int, List[m_ach.Achievement]] = {uid: [] for uid in ids}
+        if not ids:
+            return result
+
+        async with self._sm() as s:
+            stmt = (
+                select(m_ach.Achievement)
+                .where(m_ach.Achievement.user_id.in_(ids))  # WHERE user_id IN (:ids)
+                .order_by(m_ach.Achievement.created_at.desc())
+            )
+            res = await s.execute(stmt)
+            for ach in res.scalars().all():
+                result[ach.user_id].append(ach)
+        return result
+
+    async def get_profile_doc(self, user_id: int) -> Optional[Tuple[int, str]]:
+        """
+        Профиль пользователя одним поиском по PK в user_profile_doc:
+        (version, JSON-текст профиля) или None, если пользователя нет.
+          • JSON — ровно ответ UserOut (поля users + skills по имени + achievements новые сверху);
+            его собирают и поддерживают триггеры БД (initdb_db/05c_user_profile_doc.sql),
+            поэтому отдаётся как есть: doc::text, без json.loads и Pydantic.
+          • version растёт при каждом изменении профиля — годится в ETag.
+        Внутри unit of work видит изменения этой же транзакции (триггеры срабатывают сразу).
+        """
+        d = m_users.UserProfileDoc
+        async with self._sm() as s:
+            row = (await s.execute(
+                select(d.version, cast(d.doc, Text)).where(d.user_id == user_id)
+            )).first()
+            return (row[0], row[1]) if row else None
+
     # ---------- ЗАПИСЬ ----------
 
     async def upsert_from_tg(self, profile: dict) -> m_users.User:
         """
-        Создаёт или обновляет пользователя на основе данных из Telegram.
-        Если пользователь найден по telegram_id — обновляем его данные, иначе создаём нового.
+        Создаёт или обновляет пользователя на основе данных из Telegram — ОДНИМ SQL-выражением:
+
+            WITH upserted AS (
+                INSERT INTO users (...) VALUES (...)
+                ON CONFLICT (telegram_id) DO UPDATE
+                   SET col = coalesce(excluded.col, users.col), ...
+                 WHERE (users.col, ...) IS DISTINCT FROM (coalesce(excluded.col, users.col), ...)
+                RETURNING users.*
+            )
+            SELECT * FROM upserted
+            UNION ALL
+            SELECT * FROM users WHERE telegram_id = :tg_id AND NOT EXISTS (SELECT 1 FROM upserted)
+
+        • Непереданные (None) поля Telegram не затирают сохранённые — как и раньше.
+        • Если данные не изменились, UPDATE не выполняется вовсе: строка не переписывается,
+          триггер set_updated_at не срабатывает, нет лишнего WAL и обновлений индексов.
+          Тогда строку отдаёт вторая ветка UNION.
         """
+        u = m_users.User
+        t = u.__table__
         tg_id = int(profile["id"])  # Извлекаем Telegram ID из профиля
-        # Извлекаем дополнительные данные из профиля Telegram (необязательные поля)
-        username = profile.get("username")
-        first_name = profile.get("first_name")
-        last_name = profile.get("last_name")
-        language_code = profile.get("language_code")
-        avatar_url = profile.get("photo_url")
-
-        async with self._sm() as s:
-            res = await s.execute(
-                select(m_users.User).where(m_users.User.telegram_id == tg_id).limit(1)  # Запрос для поиска по tg_id
+        # Дополнительные данные из профиля Telegram (необязательные поля): колонка -> значение
+        values = {
+            "username": profile.get("username"),
+            "first_name": profile.get("first_name"),
+            "last_name": profile.get("last_name"),
+            "language_code": profile.get("language_code"),
+            "avatar_url": profile.get("photo_url"),
+        }
+
+        ins = pg_insert(t).values(telegram_id=tg_id, **values)
+        # Новое значение колонки: переданное из Telegram, иначе — текущее
+        merged = {col: func.coalesce(ins.excluded[col], t.c[col]) for col in values}
+        upserted = (
+            ins.on_conflict_do_update(
+                index_elements=[t.c.telegram_id],
+                set_=merged,
+                where=tuple_(*(t.c[col] for col in values)).is_distinct_from(tuple_(*merged.values())),
             )
-            user = res.scalars().first()  # Если пользователь найден, то возвращаем его
+            .returning(*t.c)
+            .cte("upserted")
+        )
+        existing = (
+            select(*t.c)
+            .where(t.c.telegram_id == tg_id)
+            .where(~exists(select(literal(1)).select_from(upserted)))
+        )
+        stmt = select(u).from_statement(union_all(select(*upserted.c), existing))
 
+        async with self._sm() as s:
+            user = (await s.execute(stmt)).scalars().first()
             if user is None:
-                # Если пользователя нет — создаём нового
-                user = m_users.User(
-                    telegram_id=tg_id,
-                    username=username,
-                    first_name=first_name,
-                    last_name=last_name,
-                    language_code=language_code,
-                    avatar_url=avatar_url,
-                )
-                s.add(user)  # Добавляем нового пользователя в сессию
-            else:
-                # Если пользователь найден — обновляем поля, если они были переданы
-                if username is not None:
-                    user.username = username
-                if first_name is not None:
-                    user.first_name = first_name
-                if last_name is not None:
-                    user.last_name = last_name
-                if language_code is not None:
-                    user.language_code = language_code
-                if avatar_url is not None:
-                    user.avatar_url = avatar_url
-
+                # Гонка: конкурентный логин вставил строку уже после снимка нашего выражения
+                # (ON CONFLICT её видит, а SELECT из снимка — нет). Достаточно перечитать.
+                res = await s.execute(select(u).where(u.telegram_id == tg_id).limit(1))
+                user = res.scalars().one()
+            touch_tables(s, "users")  # INSERT внутри CTE события сессии не видят — отмечаем запись явно
             await s.commit()  # Подтверждаем изменения в базе
-            await s.refresh(user)  # Обновляем объект пользователя в памяти
+            forget("users.by_id", user.id)  # Кэш DataLoader'а этого запроса больше не актуален
             return user
 
     async def update_profile(
@@ -154,6 +306,7 @@ class UsersRepo(BaseRepository):
 
             await s.commit()  # Подтверждаем изменения
             await s.refresh(user)  # Обновляем объект пользователя в памяти
+            forget("users.by_id", user_id)
             return user
 
     async def replace_user_skills_by_slugs(
@@ -161,7 +314,7 @@ class UsersRepo(BaseRepository):
         user_id: int,
         slugs: Iterable[str],
         max_count: int = 10,
-    ) -> List[m_skill.Skill]:
+    ) -> List[SkillRef]:
         """
         Полная замена набора навыков пользователя по slug'ам.
         Проверяет количество навыков (не более max_count) и добавляет/удаляет их в базе.
@@ -175,20 +328,13 @@ class UsersRepo(BaseRepository):
         if len(uniq_slugs) > max_count:
             raise ValueError(f"too_many_skills:{len(uniq_slugs)}>{max_count}")
 
-        async with self._sm() as s:
-            # Находим навыки по переданным slug'ам
-            res = await s.execute(
-                select(m_skill.Skill).where(m_skill.Skill.slug.in_(uniq_slugs))
-            )
-            skills = list(res.scalars().all())  # Собираем список найденных навыков
-
-            # Находим неизвестные slug'и, которые отсутствуют в БД
-            found_slugs = {sk.slug for sk in skills}
-            unknown = [slug for slug in uniq_slugs if slug not in found_slugs]
-            if unknown:
-                # Если есть неизвестные навыки — выбрасываем ошибку
-                raise ValueError("unknown_skills:" + ",".join(unknown))
+        # Находим навыки по переданным slug'ам — в справочнике в памяти, без запроса к skill
+        skills, unknown = await self.skills.resolve_slugs(uniq_slugs)
+        if unknown:
+            # Если есть неизвестные навыки — выбрасываем ошибку
+            raise ValueError("unknown_skills:" + ",".join(unknown))
 
+        async with self._sm() as s:
             # Получаем текущие связи пользователя с навыками
             cur_res = await s.execute(
                 select(m_us.user_skill.c.skill_id).where(m_us.user_skill.c.user_id == user_id)
@@ -214,17 +360,14 @@ class UsersRepo(BaseRepository):
                     [{"user_id": user_id, "skill_id": sid} for sid in to_add],
                 )
 
+            if to_del or to_add:
+                # users.skill_ids пересчитал триггер на user_skill — сообщаем кэшу запросов, что users тоже изменилась
+                touch_tables(s, "users")
             await s.commit()  # Фиксируем изменения
+            forget("users.skills", user_id)
 
-            # Возвращаем обновлённый список навыков пользователя (отсортированный по имени)
-            if new_ids:
-                res2 = await s.execute(
-                    select(m_skill.Skill)
-                    .where(m_skill.Skill.id.in_(new_ids))
-                    .order_by(m_skill.Skill.name.asc())
-                )
-                return list(res2.scalars().all())
-            return []
+        # Возвращаем обновлённый список навыков пользователя (отсортированный по имени)
+        return sorted(skills, key=lambda sk: sk.name)
 
     # ---------- ПОИСК ----------
 
@@ -235,75 +378,104 @@ class UsersRepo(BaseRepository):
         mode: str,
         limit: int,
         offset: int,
-    ) -> Tuple[List[tuple[m_users.User, Optional[int]]], int]:
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "exact",
+        hackathon_id: Optional[int] = None,
+        role: Optional[str] = None,
+    ) -> Tuple[List[tuple[m_users.User, Optional[int]]], Optional[int], Optional[str]]:
         """
         Поиск пользователей по тексту (username, first_name, last_name) и/или навыкам.
-        Возвращает список пользователей и их соответствие с навыками (match_count).
+        Возвращает (список (пользователь, match_count), total, next_cursor).
+        q ищется по всему профилю (user_profile_search: username, имя, био, город, ВУЗ);
+        выдача ранжируется по релевантности, при равенстве — по свежести профиля.
+        Навыковые режимы all/any сочетаются с q в одном запросе.
+        Пагинация — limit/offset или cursor (keyset, см. utils/cursor.py); с cursor offset не используется.
+        total_mode — как считать total (exact/estimate/none, см. BaseRepository._total).
+        hackathon_id/role — только пользователи с заявкой на этот хакатон (и с этой ролью).
+        Поиск только по навыкам сначала пробует битовый индекс в памяти (repositories/skill_index.py).
         """
         u = m_users.User  # Ссылка на модель User
 
-        # Вспомогательная функция для применения текстового фильтра
-        def _apply_text_filter(stmt):
-            if not q:
-                return stmt  # Если нет текста для фильтрации, просто возвращаем запрос без изменений
-            q_like = f"%{q.lower()}%"  # Создаём шаблон для поиска по username и имени пользователя
-            full_expr = func.concat(
-                func.coalesce(u.first_name, ""),
-                literal(" "),
-                func.coalesce(u.last_name, ""),
-            )
-            # Применяем фильтрацию как для username, так и для "Имя Фамилия"
-            return stmt.where(func.lower(u.username).like(q_like) | full_expr.ilike(f"%{q}%"))
-
-        async with self._sm() as s:
-            # Если не фильтруем по навыкам, то просто ищем по тексту
-            if not skill_slugs:
-                base = _apply_text_filter(select(u)).order_by(u.updated_at.desc())
-                total = (await s.execute(select(func.count()).select_from(base.subquery()))).scalar_one()
-                res = await s.execute(base.limit(limit).offset(offset))
-                items: List[tuple[m_users.User, Optional[int]]] = [(usr, None) for usr in res.scalars().all()]
-                return items, total
+        # Текстовый фильтр (полнотекстовый + trigram по имени) и ранг; без q ранжировать нечего
+        text_cond, text_rank = user_profile_search(q) if q else (None, None)
 
+        ids_arr: List[int] = []
+        if skill_slugs:
             # Нормализуем навыки (slug) для фильтрации
             slugs = [s_.strip().lower() for s_ in skill_slugs if s_ and s_.strip()]
-            sk = m_skill.Skill
-            us = m_us.user_skill
 
-            # Получаем id навыков
-            ids_arr = (await s.execute(select(sk.id).where(sk.slug.in_(slugs)))).scalars().all()
-            found_slugs = set((await s.execute(select(sk.slug).where(sk.slug.in_(slugs)))).scalars().all())
-            unknown = [slug for slug in slugs if slug not in found_slugs]
+            # Получаем id навыков из справочника в памяти (раньше — два запроса к skill)
+            found, unknown = await self.skills.resolve_slugs(slugs)
             if unknown:
                 # Если есть неизвестные скиллы — выбрасываем ошибку
                 raise ValueError("unknown_skills:" + ",".join(unknown))
+            ids_arr = list({sk.id for sk in found})
+
+        mc_col = None  # Число совпавших навыков (только в режиме any)
+        wanted = literal(sorted(ids_arr), ARRAY(Integer))  # :ids как int[]
+
+        # Навыки — по денормализованному users.skill_ids (GIN intarray), без GROUP BY по user_skill
+        if not skill_slugs:
+            # Без навыков — просто ищем по тексту
+            base = select(u)
+        elif mode == "all":
+            # Пользователи, у которых есть все указанные навыки: skill_ids @> :ids
+            base = select(u).where(_skill_ids.contains(wanted))
+        else:
+            # Пользователи, у которых есть хотя бы один из указанных навыков: skill_ids && :ids;
+            # match_count — размер пересечения icount(skill_ids & :ids)
+            mc_col = func.icount(_skill_ids.op("&", return_type=ARRAY(Integer))(wanted), type_=Integer)
+            base = select(u).where(_skill_ids.overlap(wanted))
+
+        if skill_slugs and not ids_arr:
+            base = base.where(false())  # В skills одни пустые значения — как и раньше, никого не находим
+
+        if text_cond is not None:
+            base = base.where(text_cond)
+
+        if hackathon_id is not None:
+            # Только подавшие заявку на хакатон (опц. с ролью): EXISTS по uniq(hackathon_id, user_id)
+            a = m_app.Application
+            applied = select(a.id).where(a.hackathon_id == hackathon_id, a.user_id == u.id)
+            if role is not None:
+                applied = applied.where(a.role == role)
+            base = base.where(exists(applied))
+
+        # Ключи сортировки (все DESC): [совпавшие навыки], [релевантность q], updated_at, id.
+        # Они же лежат в курсоре: следующая страница — строки «меньше» последней по этим ключам.
+        sort_keys = [k for k in (mc_col, text_rank) if k is not None] + [u.updated_at, u.id]
+        kind = f"users:{mode if skill_slugs else '-'}:{'q' if q else '-'}"
+        types = (int,) * (mc_col is not None) + (float,) * (text_rank is not None) + (datetime, int)
+        after = decode_cursor(cursor, kind, types) if cursor else None
+
+        # Только навыки (без q) — отбор, match_count, total и порядок считает индекс в памяти,
+        # из БД дочитываем одну страницу профилей. Внутри unit of work индекс не видит
+        # ещё не закоммиченных записей запроса — там всегда SQL.
+        if ids_arr and not q and not in_unit_of_work():
+            found_page = await self.skill_index.search(
+                ids_arr, mode, limit=limit, offset=offset, after=after, hackathon_id=hackathon_id, role=role,
+            )
+            if found_page is not None:
+                hits, total = found_page
+                by_id = await self._load_users([uid for uid, _, _ in hits])
+                items = [(by_id[uid], mc) for uid, mc, _ in hits if uid in by_id]
+                next_cursor = None
+                if len(hits) == limit:
+                    uid, mc, ts = hits[-1]
+                    next_cursor = encode_cursor(kind, ((mc,) if mc_col is not None else ()) + (ts, uid))
+                return items, (None if total_mode == "none" else total), next_cursor
+
+        page = base.add_columns(*sort_keys).order_by(*(k.desc() for k in sort_keys)).limit(limit)
+        page = page.where(tuple_(*sort_keys) < tuple_(*after)) if after is not None else page.offset(offset)
+        page = self._with_window_total(page, total_mode, keyset=after is not None)
 
-            if mode == "all":
-                # Пользователи, у которых есть все указанные навыки
-                sub = (
-                    select(us.c.user_id)
-                    .where(us.c.skill_id.in_(ids_arr))
-                    .group_by(us.c.user_id)
-                    .having(func.count(func.distinct(us.c.skill_id)) == len(ids_arr))  # Все навыки должны быть у пользователя
-                )
-                filtered = _apply_text_filter(select(u).where(u.id.in_(sub))).order_by(u.updated_at.desc())
-                total = (await s.execute(select(func.count()).select_from(filtered.subquery()))).scalar_one()
-                res = await s.execute(filtered.limit(limit).offset(offset))
-                items = [(usr, None) for usr in res.scalars().all()]
-                return items, total
-            else:
-                # Пользователи, у которых есть хотя бы один из указанных навыков
-                sub = (
-                    select(us.c.user_id, func.count().label("mc"))
-                    .where(us.c.skill_id.in_(ids_arr))
-                    .group_by(us.c.user_id)
-                    .subquery()
-                )
-                filtered = _apply_text_filter(
-                    select(u, sub.c.mc.label("match_count")).join(sub, sub.c.user_id == u.id)
-                ).order_by(sub.c.mc.desc(), u.updated_at.desc())
-
-                total = (await s.execute(select(func.count()).select_from(filtered.subquery()))).scalar_one()
-                res = await s.execute(filtered.limit(limit).offset(offset))
-
-                items = [(usr, int(mc)) for (usr, mc) in res.all()]
-                return items, total
+        async with self._sm() as s:
+            rows = (await s.execute(page)).all()
+        total = await self._total(base, total_mode, rows, windowed=total_mode == "exact" and after is None)
+
+        items: List[tuple[m_users.User, Optional[int]]] = [
+            (row[0], int(row[1]) if mc_col is not None else None) for row in rows
+        ]
+        last_key = tuple(rows[-1][1:1 + len(sort_keys)]) if rows else None
+        next_cursor = encode_cursor(kind, last_key) if len(rows) == limit else None
+        return items, total, next_cursor
@@ -0,0 +1,254 @@
+# =============================================================================
+# ФАЙЛ: backend/repositories/vacancy_ranking.py
+# КРАТКО: подбор анкет хакатона под вакансию команды и напарников под анкету
+#         (матрица из infrastructure/vacancy_ranking.py).
+# ЗАЧЕМ:
+#   • GET /vacancies/{id}/applications: анкеты хакатона по убыванию соответствия вакансии
+#     (навыки из vacancy.skills + роль). Оценка всех анкет — в памяти, из БД читается
+#     только сама вакансия и карточки одной страницы.
+#   • GET /hackathons/{id}/applications/me/suggestions: анкеты, чьи навыки и роль дополняют мои.
+# КАК ДЕРЖИМ СВЕЖИМ:
+#   • Матрица строится на хакатон при первом запросе (в пуле процессов, infrastructure/workers.py) и живёт в LRU на VACANCY_RANKING_CACHE_SIZE хакатонов.
+#   • Дальше — точечно: анкеты этого хакатона и их владельцы с updated_at >= watermark
+#     (навыки двигают users.updated_at триггером), внахлёст на VACANCY_RANKING_SYNC_OVERLAP_SECONDS.
+#     Сверка — не чаще раза в VACANCY_RANKING_SYNC_SECONDS или сразу после записи этого процесса
+#     в application/users/user_skill (on_tables_committed).
+#   • Удалённые анкеты убирает ApplicationsRepo.delete (forget_application); раз в
+#     VACANCY_RANKING_REBUILD_SECONDS матрица строится заново — на случай удалений мимо приложения.
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, literal_column, Integer, union
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from backend.settings.config import settings
+from backend.infrastructure.vacancy_ranking import ApplicantMatrix, ApplicantRow
+from backend.infrastructure.cache import register_stats
+from backend.infrastructure.db import on_tables_committed
+from backend.infrastructure.workers import run_cpu
+from backend.repositories.base import BaseRepository
+from backend.repositories.skills import SkillsRepo
+from backend.persistend.enums import ApplicationStatus
+from backend.persistend.models import users as m_users
+from backend.persistend.models import application as m_app
+from backend.persistend.models import team as m_team
+
+_WATCHED = {"users", "user_skill", "application"}  # Записи сюда могут изменить ранжирование
+
+
+@dataclass
+class _HackathonMatrix:
+    matrix: ApplicantMatrix
+    watermark: Optional[datetime]  # max(updated_at) уже применённых строк
+    built_at: float
+    synced_at: float
+    generation: int                # Номер записи процесса, до которой матрица сверена
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class _Matrices:
+    """LRU матриц по hackathon_id + счётчики для /system/cache."""
+
+    def __init__(self) -> None:
+        self.items: "OrderedDict[int, _HackathonMatrix]" = OrderedDict()
+        self.generation = 0  # Растёт на каждый commit этого процесса в _WATCHED
+        self.builds = 0
+        self.syncs = 0
+        self.hits = 0
+
+    def get(self, hackathon_id: int) -> Optional[_HackathonMatrix]:
+        entry = self.items.get(hackathon_id)
+        if entry is not None:
+            self.items.move_to_end(hackathon_id)
+        return entry
+
+    def put(self, hackathon_id: int, entry: _HackathonMatrix) -> None:
+        self.items[hackathon_id] = entry
+        self.items.move_to_end(hackathon_id)
+        while len(self.items) > settings.VACANCY_RANKING_CACHE_SIZE:
+            self.items.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hackathons": len(self.items),
+            "applications": sum(e.matrix.n for e in self.items.values()),
+            "matrix_bytes": sum(e.matrix.stats()["matrix_bytes"] for e in self.items.values()),
+            "builds": self.builds,
+            "syncs": self.syncs,
+            "hits": self.hits,
+        }
+
+
+_matrices = _Matrices()
+# Одна сборка матрицы хакатона за раз: hackathon_id -> [замок, сколько корутин его держат/ждут].
+# Запись живёт, пока замок кому-то нужен, — словарь не растёт вместе с числом хакатонов.
+_build_locks: Dict[int, List[Any]] = {}
+register_stats("vacancy_ranking", _matrices)
+
+
+@asynccontextmanager
+async def _build_lock(hackathon_id: int) -> AsyncIterator[None]:
+    slot = _build_locks.setdefault(hackathon_id, [asyncio.Lock(), 0])
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if slot[1] == 0:
+            del _build_locks[hackathon_id]
+
+
+async def _on_commit(tables: Set[str]) -> None:
+    if _WATCHED & tables:
+        _matrices.generation += 1
+
+
+on_tables_committed(_on_commit)
+
+
+def forget_application(hackathon_id: int, user_id: int) -> None:
+    """Анкета удалена (по updated_at удаление не видно)."""
+    entry = _matrices.items.get(hackathon_id)
+    if entry is not None:
+        entry.matrix.remove_user(user_id)
+
+
+def vacancy_skill_ids(raw: Any, by_slug: Dict[str, Any], by_id: Dict[int, Any]) -> Tuple[List[int], List[str]]:
+    """
+    vacancy.skills (JSONB) → (id известных навыков, нераспознанные значения).
+    Основной формат — массив slug'ов; id и объекты {"slug"|"id": ...} тоже понимаем.
+    """
+    ids: List[int] = []
+    unknown: List[str] = []
+    for item in raw if isinstance(raw, list) else []:
+        if isinstance(item, dict):
+            item = item.get("slug", item.get("id"))
+        if isinstance(item, bool):
+            item = None
+        if isinstance(item, int) and item in by_id:
+            ids.append(item)
+        elif isinstance(item, str) and item.strip().lower() in by_slug:
+            ids.append(by_slug[item.strip().lower()].id)
+        elif item is not None:
+            unknown.append(str(item))
+    return list(dict.fromkeys(ids)), unknown
+
+
+class VacancyRankingRepo(BaseRepository):
+    """Вакансия + ранжированные анкеты её хакатона."""
+
+    _skill_ids = literal_column("users.skill_ids", type_=ARRAY(Integer))  # вне ORM-модели (см. UsersRepo)
+
+    def __init__(self, sm=None) -> None:
+        super().__init__(sm)
+        self.skills = SkillsRepo(sm)
+
+    async def get_vacancy(self, vacancy_id: int) -> Optional[Tuple[m_team.Vacancy, m_team.Team]]:
+        """Вакансия вместе с командой (hackathon_id, captain_id) или None."""
+        V, T = m_team.Vacancy, m_team.Team
+        async with self._sm() as s:
+            row = (await s.execute(select(V, T).join(T, T.id == V.team_id).where(V.id == vacancy_id))).first()
+        return (row[0], row[1]) if row else None
+
+    async def _rows(self, hackathon_id: int, since: Optional[datetime]) -> List[Tuple[ApplicantRow, datetime]]:
+        """
+        Строки матрицы: все анкеты хакатона или изменившиеся с since —
+        сама анкета (idx_app_hack_updated_id) или навыки/профиль её владельца (idx_users_updated_id).
+        Возвращает (строка, max(updated_at анкеты, updated_at владельца)).
+        """
+        A, U = m_app.Application, m_users.User
+        cols = (A.id, A.user_id, A.role, A.status, A.joined, A.updated_at, self._skill_ids, U.updated_at)
+        base = select(*cols).join(U, U.id == A.user_id).where(A.hackathon_id == hackathon_id)
+        if since is None:
+            stmt = base
+        else:
+            stmt = union(base.where(A.updated_at >= since), base.where(U.updated_at >= since))
+        async with self._sm() as s:
+            rows = (await s.execute(stmt)).all()
+        return [
+            (
+                (app_id, uid, role.value if role is not None else None,
+                 status == ApplicationStatus.published and not joined, a_ts, list(sk or ())),
+                max(a_ts, u_ts),
+            )
+            for app_id, uid, role, status, joined, a_ts, sk, u_ts in rows
+        ]
+
+    async def _build(self, hackathon_id: int) -> _HackathonMatrix:
+        generation = _matrices.generation
+        rows = await self._rows(hackathon_id, None)
+        matrix = await run_cpu(ApplicantMatrix.build, [r for r, _ in rows])  # Сборка — в пуле процессов
+        now = time.monotonic()
+        _matrices.builds += 1
+        return _HackathonMatrix(
+            matrix=matrix,
+            watermark=max((ts for _, ts in rows), default=None),
+            built_at=now,
+            synced_at=now,
+            generation=generation,
+        )
+
+    async def _sync(self, entry: _HackathonMatrix, hackathon_id: int) -> None:
+        generation = _matrices.generation
+        since = entry.watermark - timedelta(seconds=settings.VACANCY_RANKING_SYNC_OVERLAP_SECONDS) if entry.watermark else None
+        rows = await self._rows(hackathon_id, since)
+        for row, _ in rows:
+            entry.matrix.upsert(*row)
+        if rows:
+            entry.watermark = max([ts for _, ts in rows] + ([entry.watermark] if entry.watermark else []))
+        entry.synced_at = time.monotonic()
+        entry.generation = generation
+        _matrices.syncs += 1
+
+    async def matrix(self, hackathon_id: int) -> ApplicantMatrix:
+        """Свежая матрица анкет хакатона (собирается при первом обращении, дальше — точечные сверки)."""
+        entry = _matrices.get(hackathon_id)
+        if entry is None or time.monotonic() - entry.built_at > settings.VACANCY_RANKING_REBUILD_SECONDS:
+            async with _build_lock(hackathon_id):
+                entry = _matrices.get(hackathon_id)
+                if entry is None or time.monotonic() - entry.built_at > settings.VACANCY_RANKING_REBUILD_SECONDS:
+                    entry = await self._build(hackathon_id)
+                    _matrices.put(hackathon_id, entry)
+        if entry.generation != _matrices.generation or time.monotonic() - entry.synced_at > settings.VACANCY_RANKING_SYNC_SECONDS:
+            async with entry.lock:
+                if entry.generation != _matrices.generation or time.monotonic() - entry.synced_at > settings.VACANCY_RANKING_SYNC_SECONDS:
+                    await self._sync(entry, hackathon_id)
+        _matrices.hits += 1
+        return entry.matrix
+
+    async def rank(
+        self, vacancy: m_team.Vacancy, hackathon_id: int, *, limit: int, offset: int = 0
+    ) -> Tuple[List[Tuple[int, float, int, bool]], int, List[int], List[str]]:
+        """
+        Анкеты хакатона под вакансию.
+        Возвращает ([(application_id, score, matched_skills, role_match)], total,
+                    id навыков вакансии, нераспознанные значения vacancy.skills).
+        """
+        cat = await self.skills.catalog()
+        skill_ids, unknown = vacancy_skill_ids(vacancy.skills, cat.by_slug, cat.by_id)
+        if unknown:  # Навык могли добавить после загрузки снимка справочника
+            cat = await self.skills.catalog(force=True)
+            skill_ids, unknown = vacancy_skill_ids(vacancy.skills, cat.by_slug, cat.by_id)
+        matrix = await self.matrix(hackathon_id)
+        ranked, total = matrix.rank(skill_ids, vacancy.role.value, limit=limit, offset=offset)
+        return ranked, total, skill_ids, unknown
+
+    async def suggest(
+        self, hackathon_id: int, user_id: int, *, limit: int, offset: int = 0
+    ) -> Tuple[List[Tuple[int, float, int, bool]], int]:
+        """
+        Напарники для анкеты user_id на хакатоне (по той же матрице):
+        ([(application_id, score, new_skills, complementary_role)], total).
+        """
+        matrix = await self.matrix(hackathon_id)
+        return matrix.suggest(user_id, limit=limit, offset=offset)
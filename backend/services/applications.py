@@ -72,9 +72,10 @@ class ApplicationsService:
         q: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ):
         """
-        Список анкет хакатона с фильтрами:
+        Список анкет хакатона с фильтрами (возвращает (items, next_cursor)):
           • role — точное совпадение роли (строка-Enum)
           • q    — username/first_name/last_name (case-insensitive поиск)
 
@@ -87,6 +88,7 @@ class ApplicationsService:
             q=q,
             limit=limit,
             offset=offset,
+            cursor=cursor,
         )
 
     # ---- ОБНОВЛЕНИЕ ----
@@ -123,13 +125,13 @@ class ApplicationsService:
             user_id=user_id, hackathon_id=hackathon_id
         )
 
-    async def list_my(self, user_id: int, limit: int = 50, offset: int = 0):
+    async def list_my(self, user_id: int, limit: int = 50, offset: int = 0, cursor: Optional[str] = None):
         """
-        Список всех моих анкет по всем хакатонам (пагинированный).
+        Список всех моих анкет по всем хакатонам (пагинированный; возвращает (items, next_cursor)).
 
         Используется для:
           • /me/applications — «мой портфель заявок» на разные мероприятия.
         """
         return await self.apps.search_by_user(
-            user_id=user_id, limit=limit, offset=offset
+            user_id=user_id, limit=limit, offset=offset, cursor=cursor
         )
@@ -2,7 +2,7 @@
 # ФАЙЛ: backend/services/auth_telegram.py
 # КРАТКО: сервис авторизации через Telegram Mini App.
 # ЗАЧЕМ:
-#   • Принимает init_data из Telegram WebApp, проверяет подпись/срок (verify_init_data).
+#   • Принимает init_data из Telegram WebApp, проверяет подпись/срок/повтор (TelegramInitDataVerifier).
 #   • Создаёт/обновляет пользователя по данным Telegram (UsersRepo.upsert_from_tg).
 #   • Генерирует access_token (JWT) и возвращает (user_id, access_token).
 # КОМУ ПОЛЕЗНО:
@@ -18,7 +18,8 @@ import os                           # Читаем fallback-переменные
 
 from backend.settings.config import settings  # Настройки приложения (токены, TTL)
 from backend.repositories.users import UsersRepo  # Репозиторий пользователей (апсерт по данным из Telegram)
-from backend.utils.telegram_initdata import verify_init_data, InitDataError  # Проверка подписи initData
+from backend.persistend.models.users import User  # ORM-модель пользователя (возвращается в AuthResult)
+from backend.utils.telegram_initdata import TelegramInitDataVerifier, InitDataError  # Проверка подписи initData
 
 # Мягкий импорт JWT-утилиты.
 # Пытаемся взять «основную» utils/jwt.py (encode), если её нет — используем упрощённую utils/jwt_simple.py.
@@ -35,6 +36,8 @@ class AuthResult:
     """Результат аутентификации: минимальный набор данных, нужный роутеру/клиенту."""
     user_id: int
     access_token: str
+    user: User  # Строка users, которую вернул апсерт — роутеру не нужно перечитывать её из БД
+    init_data_hash: str  # hash принятого initData — для confirm() после commit'а логина
 
 
 class AuthTelegramService:
@@ -51,6 +54,13 @@ class AuthTelegramService:
 
         # Читаем секреты: сперва из settings, затем fallback в переменные окружения
         self.bot_token = getattr(settings, "TELEGRAM_BOT_TOKEN", os.getenv("TELEGRAM_BOT_TOKEN", ""))
+        # Проверяльщик initData: ключи от bot_token считаются один раз, принятые hash помнятся (replay)
+        self.verifier = TelegramInitDataVerifier(
+            self.bot_token,
+            max_age_seconds=settings.TELEGRAM_INITDATA_MAX_AGE_SECONDS,
+            replay_protection=settings.TELEGRAM_INITDATA_REPLAY_PROTECTION,
+            replay_cache_size=settings.TELEGRAM_INITDATA_REPLAY_CACHE_SIZE,
+        )
         # Секрет для подписи JWT; безопаснее хранить в settings/env. Есть dev-дефолт на случай отсутствия.
         self.jwt_secret = getattr(settings, "JWT_SECRET", os.getenv("JWT_SECRET", "")) or "dev-secret-change-me"
         # Время жизни токена (в секундах). По умолчанию: 7 суток.
@@ -60,21 +70,37 @@ class AuthTelegramService:
         """
         Главный метод: принимает «сырую» строку init_data от Telegram WebApp.
         Шаги:
-          1) verify_init_data(...) — проверяет подпись/свежесть (обычно 5 минут).
-          2) users.upsert_from_tg(...) — создаёт/обновляет профиль пользователя.
+          1) verifier.check(...) — проверяет подпись/свежесть (обычно 5 минут) и отклоняет повтор
+             того же initData — ещё до обращения к БД; hash резервируется (параллельный повтор — отказ).
+             Окончательно его запоминает confirm() после commit'а логина, снимает — release().
+             Если упадут шаги 2–3, резерв снимается здесь же.
+          2) users.upsert_from_tg(...) — создаёт/обновляет профиль пользователя (одним INSERT ... ON CONFLICT).
           3) jwt_encode(...) — выдаёт access_token (payload: sub = user.id).
-        Может выбросить InitDataError при невалидной подписи/просрочке — роутер маппит в 401.
+        Может выбросить InitDataError при невалидной подписи/просрочке/повторе — роутер маппит в 401.
         """
         # 1) Валидируем initData (подпись строится на основе bot_token; max_age_seconds — «свежесть» данных)
-        parsed: Dict[str, Any] = verify_init_data(init_data_raw, self.bot_token, max_age_seconds=300)
+        parsed: Dict[str, Any] = self.verifier.check(init_data_raw)
         tg_user = parsed["user"]  # Словарь с полями пользователя из Telegram (id, username, first_name, ...)
+        init_hash = parsed["fields"]["hash"]
 
-        # 2) Апсертим пользователя по данным из Telegram
-        user = await self.users.upsert_from_tg(tg_user)
+        try:
+            # 2) Апсертим пользователя по данным из Telegram
+            user = await self.users.upsert_from_tg(tg_user)
 
-        # 3) Генерируем короткоживущий access_token (обычно HS256 внутри utils.jwt/jwt_simple)
-        # В sub кладём str(user.id), чтобы в дальнейшем восстанавливать пользователя по токену.
-        token = jwt_encode({"sub": str(user.id)}, self.jwt_secret, exp_seconds=self.jwt_ttl)
+            # 3) Генерируем короткоживущий access_token (обычно HS256 внутри utils.jwt/jwt_simple)
+            # В sub кладём str(user.id), чтобы в дальнейшем восстанавливать пользователя по токену.
+            token = jwt_encode({"sub": str(user.id)}, self.jwt_secret, exp_seconds=self.jwt_ttl)
+        except BaseException:
+            self.verifier.release(init_hash)
+            raise
 
-        # Возвращаем минимальный, но достаточный набор данных
-        return AuthResult(user_id=user.id, access_token=token)
+        # Возвращаем минимальный, но достаточный набор данных (+ саму строку users из апсерта)
+        return AuthResult(user_id=user.id, access_token=token, user=user, init_data_hash=init_hash)
+
+    def confirm(self, res: AuthResult) -> None:
+        """Логин состоялся (транзакция закоммичена) — резерв initData становится окончательным."""
+        self.verifier.remember(res.init_data_hash)
+
+    def release(self, res: AuthResult) -> None:
+        """Логин не состоялся (rollback) — снять резерв, тот же initData можно прислать снова."""
+        self.verifier.release(res.init_data_hash)
@@ -0,0 +1,200 @@
+# =============================================================================
+# ФАЙЛ: backend/services/team_formation.py
+# КРАТКО: автоподбор команд для всех участников хакатона, у кого ещё нет команды.
+# ЗАЧЕМ:
+#   • Организатор большого хакатона одним запуском получает предложенные команды:
+#     размеры в [team_members_minimum, team_members_limit], роли без повторов, навыки
+#     покрывают как можно больше разного (эвристика — infrastructure/team_solver.py).
+# КАК РАБОТАЕТ:
+#   1) TeamFormationRepo читает свободных участников и их навыки;
+#   2) жадное начальное разбиение — в пуле процессов (infrastructure/workers.py);
+#   3) целевой локальный поиск (обмены участников с повтором роли / без уникальных навыков
+#      в команды, где их не хватает) — тоже в пуле; бюджет небольшой: после жадного старта
+#      улучшающих ходов мало (team_formation_bench показывает прирост и его цену);
+#      фазы сообщают on_progress(фаза, доля, сводка);
+#   4) все команды записываются одной транзакцией (save=False — только посчитать).
+# ЗАПУСК (организатором / из cron; HTTP-ручки нет — в схеме нет роли организатора):
+#   python -m backend.services.team_formation <hackathon_id> [--dry-run] [--seed N]
+# =============================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.settings.config import settings
+from backend.infrastructure import team_solver
+from backend.infrastructure.workers import run_cpu
+from backend.repositories.team_formation import TeamFormationRepo
+from backend.persistend.enums import RoleType
+
+log = logging.getLogger(__name__)
+
+ROLES: List[str] = [r.value for r in RoleType]  # Код роли в решателе — индекс в этом списке
+# Участнику без роли в анкете достаётся первая роль из этого списка, которой ещё нет в команде
+_FILL_ROLES = ["Fullstack", "Backend", "Frontend", "Designer", "DevOps", "QA", "Analytics", "ML", "DS", "MobileDev", "GameDev"]
+
+ProgressCallback = Callable[[str, float, Dict[str, Any]], None]
+
+
+@dataclass
+class TeamFormationResult:
+    hackathon_id: int
+    teams: List[List[int]]                      # Составы (user_id), первый — предлагаемый капитан
+    unassigned: List[int]                       # Кому не нашлось места (user_id)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    team_ids: List[int] = field(default_factory=list)  # id созданных команд (пусто при save=False)
+
+
+def encode(skill_lists: Sequence[Sequence[int]], roles: Sequence[Optional[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """Участники → (матрица навыков n × (max skill_id + 1), uint8; коды ролей, -1 — не указана)."""
+    width = max((max(sk) for sk in skill_lists if sk), default=0) + 1
+    skills = np.zeros((len(skill_lists), width), dtype=np.uint8)
+    for i, sk in enumerate(skill_lists):
+        if sk:
+            skills[i, list(sk)] = 1
+    codes = np.asarray([ROLES.index(r) if r in ROLES else -1 for r in roles], dtype=np.int16)
+    return skills, codes
+
+
+async def solve(
+    skills: np.ndarray,
+    roles: np.ndarray,
+    min_size: int,
+    max_size: int,
+    *,
+    seed: int = 0,
+    iterations_per_applicant: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[List[np.ndarray], Dict[str, Any]]:
+    """
+    Разбиение участников (индексы строк) на команды: жадный старт + целевой локальный поиск,
+    обе фазы — в пуле процессов. iterations_per_applicant — бюджет локального поиска
+    (по умолчанию TEAM_SOLVER_ITERATIONS_PER_APPLICANT; 0 — только жадный старт).
+    """
+    report = on_progress or (lambda *_: None)
+    n_roles = len(ROLES)
+    started = time.perf_counter()
+
+    sizes = team_solver.plan_sizes(len(roles), min_size, max_size)
+    report("greedy", 0.0, {"applicants": len(roles), "teams": len(sizes)})
+    teams = await run_cpu(team_solver.greedy, skills, roles, sizes, n_roles)
+    greedy_stats = team_solver.objective(skills, roles, teams, n_roles)
+    greedy_seconds = time.perf_counter() - started
+    report("greedy", 1.0, greedy_stats)
+
+    if iterations_per_applicant is None:
+        iterations_per_applicant = settings.TEAM_SOLVER_ITERATIONS_PER_APPLICANT
+    budget = int(iterations_per_applicant * len(roles))
+    accepted = 0
+    if budget > 0 and len(teams) >= 2:
+        # Одна задача: целевым ходам нужны все команды сразу (делить их на группы — терять цели)
+        report("improve", 0.0, {"budget": budget})
+        teams, accepted = await run_cpu(
+            team_solver.improve, skills, roles, teams, min_size, max_size, n_roles, budget, seed
+        )
+        report("improve", 1.0, {"accepted": accepted})
+
+    stats = team_solver.objective(skills, roles, teams, n_roles)
+    stats.update(
+        greedy_value=greedy_stats["value"],
+        improvements=accepted,
+        greedy_seconds=round(greedy_seconds, 3),
+        seconds=round(time.perf_counter() - started, 3),
+    )
+    return teams, stats
+
+
+class TeamFormationService:
+    """Автоподбор команд хакатона: загрузка → решатель → запись одной транзакцией."""
+
+    def __init__(self) -> None:
+        self.repo = TeamFormationRepo()
+
+    async def propose(
+        self,
+        hackathon_id: int,
+        *,
+        save: bool = True,
+        seed: int = 0,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> TeamFormationResult:
+        """
+        Предложить команды всем свободным участникам хакатона.
+        Ошибки: ValueError("hackathon_not_found"), ValueError("bad_team_size_bounds").
+        """
+        bounds = await self.repo.size_bounds(hackathon_id)
+        if bounds is None:
+            raise ValueError("hackathon_not_found")
+        min_size = bounds[0] or settings.TEAM_SOLVER_DEFAULT_MIN_SIZE
+        max_size = bounds[1] or max(settings.TEAM_SOLVER_DEFAULT_MAX_SIZE, min_size)
+
+        free = await self.repo.free_applicants(hackathon_id)
+        skills, roles = encode([sk for *_, sk in free], [role for _, _, role, _ in free])
+        teams, stats = await solve(skills, roles, min_size, max_size, seed=seed, on_progress=on_progress)
+        stats.update(min_size=min_size, max_size=max_size)
+
+        # Капитан — участник с наибольшим числом навыков; роль без указания — первая свободная в команде
+        compositions: List[List[tuple[int, str]]] = []
+        for members in teams:
+            members = sorted(members.tolist(), key=lambda i: (-len(free[i][3]), free[i][0]))
+            taken = {free[i][2] for i in members if free[i][2]}
+            team = []
+            for i in members:
+                role = free[i][2]
+                if role is None:
+                    role = next((r for r in _FILL_ROLES if r not in taken), _FILL_ROLES[0])
+                    taken.add(role)
+                team.append((free[i][1], role))
+            compositions.append(team)
+
+        placed = {uid for team in compositions for uid, _ in team}
+        result = TeamFormationResult(
+            hackathon_id=hackathon_id,
+            teams=[[uid for uid, _ in team] for team in compositions],
+            unassigned=[uid for _, uid, _, _ in free if uid not in placed],
+            stats=stats,
+        )
+        if save and compositions:
+            if on_progress:
+                on_progress("save", 0.0, {"teams": len(compositions)})
+            result.team_ids = await self.repo.create_teams(hackathon_id, compositions)
+            if on_progress:
+                on_progress("save", 1.0, {"teams": len(result.team_ids)})
+        log.info("team formation for hackathon %s: %s", hackathon_id, stats)
+        return result
+
+
+async def _main() -> None:
+    from backend.infrastructure.db import dispose_db
+    from backend.infrastructure.workers import shutdown_cpu_pool
+
+    ap = argparse.ArgumentParser(description="Автоподбор команд для свободных участников хакатона")
+    ap.add_argument("hackathon_id", type=int)
+    ap.add_argument("--dry-run", action="store_true", help="только посчитать, ничего не записывать")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    def progress(phase: str, done: float, info: Dict[str, Any]) -> None:
+        print(f"[{phase:<7}] {done:6.1%} {info}", flush=True)
+
+    try:
+        result = await TeamFormationService().propose(
+            args.hackathon_id, save=not args.dry_run, seed=args.seed, on_progress=progress
+        )
+        print(f"teams: {len(result.teams)}, unassigned: {len(result.unassigned)}, stats: {result.stats}")
+        if result.team_ids:
+            print(f"created team ids: {result.team_ids[0]}..{result.team_ids[-1]}")
+    finally:
+        shutdown_cpu_pool()
+        await dispose_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
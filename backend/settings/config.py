@@ -36,6 +36,44 @@ class Settings(BaseSettings):
     # ==== Auth (ОБЯЗАТЕЛЬНО объявить, иначе будет extra_forbidden) ====
     TELEGRAM_BOT_TOKEN: str = ""  # Токен для Telegram бота, должен быть заполнен в .env
     JWT_SECRET: str = "dev-secret-change-me"  # Секрет для подписи JWT токенов
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000  # Сколько уже проверенных JWT держим в памяти (LRU)
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 600  # Как долго помним проверенный токен (exp проверяется всегда)
+    TELEGRAM_INITDATA_MAX_AGE_SECONDS: int = 300  # «Свежесть» initData (auth_date)
+    TELEGRAM_INITDATA_REPLAY_PROTECTION: bool = True  # Отклонять повторно присланный тот же initData
+    TELEGRAM_INITDATA_REPLAY_CACHE_SIZE: int = 100_000  # Сколько принятых hash помним (LRU)
+
+    # ==== Кэши ====
+    SKILL_CATALOG_TTL_SECONDS: int = 300  # Как долго снимок справочника навыков считается свежим без сверки с БД
+    HACKATHON_CACHE_SIZE: int = 1024  # Сколько хакатонов держим в памяти процесса (LRU)
+    HACKATHON_CACHE_TTL_SECONDS: int = 60  # Сколько секунд запись о хакатоне считается свежей
+    HACKATHON_LIST_CACHE_SIZE: int = 256  # Сколько разных страниц GET /hackathons (q, фильтры, sort, limit, offset) держим в памяти
+    HACKATHON_LIST_CACHE_TTL_SECONDS: float = 5  # Микро-кэш ответа GET /hackathons: короткий TTL
+    QUERY_CACHE_BACKEND: str = "memory"  # Кэш запросов репозиториев: "memory" (один воркер), "redis" (несколько воркеров) или "off"
+    QUERY_CACHE_TTL_SECONDS: int = 30  # TTL записи кэша запросов по умолчанию
+    QUERY_CACHE_MAX_ENTRIES: int = 2048  # Лимит записей memory-бэкенда (LRU)
+    QUERY_CACHE_MAX_ENTRY_BYTES: int = 256 * 1024  # Результаты крупнее этого не кэшируем
+    REDIS_URL: str = "redis://localhost:6379/0"  # Используется при QUERY_CACHE_BACKEND=redis
+    LIST_TOTAL_CACHE_TTL_SECONDS: int = 60  # total=estimate: сколько живёт закэшированный count списка
+
+    # ==== Пул процессов для CPU-тяжёлых сборок (infrastructure/workers.py) ====
+    CPU_POOL_WORKERS: int = 2  # Процессов в пуле; 0 — считать в потоке текущего процесса
+
+    # ==== Индекс навыков в памяти (поиск людей) ====
+    SKILL_INDEX_ENABLED: bool = False  # Отвечать на поиск по навыкам из битового индекса в памяти процесса
+    SKILL_INDEX_SYNC_SECONDS: float = 2  # Как часто (не чаще) догонять изменения users/application
+    SKILL_INDEX_SYNC_OVERLAP_SECONDS: int = 30  # Нахлёст чтения изменений по updated_at (поздние commit'ы)
+    SKILL_INDEX_REBUILD_SECONDS: int = 900  # Полная перестройка индекса в фоне
+
+    # ==== Подбор анкет под вакансию (матрица навыков в памяти) ====
+    VACANCY_RANKING_CACHE_SIZE: int = 64  # Матриц скольких хакатонов держим в памяти (LRU)
+    VACANCY_RANKING_SYNC_SECONDS: float = 2  # Как часто (не чаще) догонять изменения анкет хакатона
+    VACANCY_RANKING_SYNC_OVERLAP_SECONDS: int = 30  # Нахлёст чтения изменений по updated_at
+    VACANCY_RANKING_REBUILD_SECONDS: int = 900  # Матрица хакатона строится заново не реже этого
+
+    # ==== Автоподбор команд хакатона (services/team_formation.py) ====
+    TEAM_SOLVER_DEFAULT_MIN_SIZE: int = 2  # Если у хакатона не задан team_members_minimum
+    TEAM_SOLVER_DEFAULT_MAX_SIZE: int = 5  # Если у хакатона не задан team_members_limit
+    TEAM_SOLVER_ITERATIONS_PER_APPLICANT: float = 0.1  # Бюджет локального поиска: кандидатов на обмен на участника (0 — выкл.)
 
     # Метод, который возвращает список разрешенных источников CORS
     @property
@@ -0,0 +1,62 @@
+# =============================================================================
+# ФАЙЛ: backend/tests/fake_redis.py
+# КРАТКО: локальная замена Redis для тестов RedisBackend (infrastructure/query_cache.py).
+# ЗАЧЕМ:
+#   • Проверять кэш запросов в режиме redis без сервера Redis и без пакета redis.
+#   • Реализует ровно то, что зовёт RedisBackend: get / set(ex=...) / mget / incr.
+# ОСОБЕННОСТИ:
+#   • Как настоящий клиент: значения — bytes, счётчики INCR хранятся строкой числа (b"3").
+#   • Срок жизни (ex) считается по time.monotonic(); истёкший ключ читается как None.
+#   • calls — счётчик вызовов по командам, чтобы тест видел, что кэш действительно ходил в «Redis».
+# =============================================================================
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class FakeRedis:
+    """In-memory подмена redis.asyncio.Redis для команд, которые использует RedisBackend."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self.calls: Counter = Counter()
+
+    def _read(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.calls["get"] += 1
+        return self._read(key)
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        self.calls["set"] += 1
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        self.calls["mget"] += 1
+        return [self._read(k) for k in keys]
+
+    async def incr(self, key: str) -> int:
+        self.calls["incr"] += 1
+        current = self._read(key)
+        value = int(current) + 1 if current is not None else 1
+        expires_at = self._data[key][0] if current is not None else None  # INCR не трогает TTL ключа
+        self._data[key] = (expires_at, str(value).encode("ascii"))
+        return value
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """Живые ключи с префиксом (для проверок в тестах)."""
+        return [k for k in list(self._data) if k.startswith(prefix) and self._read(k) is not None]
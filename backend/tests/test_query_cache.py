@@ -0,0 +1,130 @@
+# =============================================================================
+# ФАЙЛ: backend/tests/test_query_cache.py
+# КРАТКО: кэш запросов в режиме redis (RedisBackend поверх FakeRedis) против настоящего Postgres.
+# ЧТО ПРОВЕРЯЕМ:
+#   • повторный одинаковый SELECT отдаётся из кэша;
+#   • commit записи в таблицу-тег поднимает её версию (INCR) — следующий SELECT идёт в БД и видит запись;
+#   • внутри unit_of_work() кэш не используется: чтение видит незакоммиченную запись, в «Redis» не ходим.
+# ЗАПУСК (из корня репозитория, после pip install -r backend/requirements-dev.txt;
+#   нужна БД из DATABASE_URL, иначе тесты пропускаются):
+#   python -m pytest -q backend/tests
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, Text, insert, select, text
+
+from backend.infrastructure.db import get_engine, unit_of_work
+from backend.infrastructure.query_cache import RedisBackend, query_cache
+from backend.repositories.base import BaseRepository
+from backend.tests.fake_redis import FakeRedis
+
+# Своя таблица-тег, чтобы не зависеть от сидов и не трогать рабочие данные
+_meta = MetaData()
+items = Table("qc_test_items", _meta, Column("id", Integer, primary_key=True), Column("name", Text, nullable=False))
+TAG_KEY = "qc:tag:qc_test_items"
+
+
+async def _db_available() -> bool:
+    try:
+        async with get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+    finally:
+        await get_engine().dispose()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _require_db() -> None:
+    if not asyncio.run(_db_available()):
+        pytest.skip("Postgres from DATABASE_URL is not reachable")
+
+
+@pytest.fixture
+def fake(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    """Общий query_cache (он уже подписан на коммиты) — но с RedisBackend поверх FakeRedis."""
+    client = FakeRedis()
+    monkeypatch.setattr(query_cache, "backend", RedisBackend(client))
+    for counter in ("hits", "misses", "bypassed", "invalidations", "errors"):
+        monkeypatch.setattr(query_cache, counter, 0)
+    return client
+
+
+def _run(scenario) -> None:
+    """Сценарий целиком в одном event loop: своя таблица до, уборка и закрытие пула после."""
+    async def wrapped() -> None:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(_meta.drop_all)
+            await conn.run_sync(_meta.create_all)
+            await conn.execute(insert(items), [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        try:
+            await scenario(BaseRepository())
+        finally:
+            async with get_engine().begin() as conn:
+                await conn.run_sync(_meta.drop_all)
+            await get_engine().dispose()
+
+    asyncio.run(wrapped())
+
+
+_names = select(items.c.name).order_by(items.c.id)
+
+
+def test_repeated_select_is_served_from_cache(fake: FakeRedis) -> None:
+    async def scenario(repo: BaseRepository) -> None:
+        first = await repo._cached_rows(_names)
+        second = await repo._cached_rows(_names)
+        assert first == second == [{"name": "a"}, {"name": "b"}]
+        assert (query_cache.misses, query_cache.hits) == (1, 1)
+        assert fake.calls["set"] == 1
+        assert len(fake.keys("qc:val:")) == 1
+
+    _run(scenario)
+
+
+def test_commit_to_tagged_table_invalidates(fake: FakeRedis) -> None:
+    async def scenario(repo: BaseRepository) -> None:
+        await repo._cached_rows(_names)
+        assert await repo._cached_rows(_names) == [{"name": "a"}, {"name": "b"}]
+
+        async with repo._sm() as s:
+            await s.execute(insert(items).values(id=3, name="c"))
+            await s.commit()
+
+        # Хук коммита поднял версию тега — старый ключ больше не спрашивается
+        assert await fake.get(TAG_KEY) == b"1"
+        assert query_cache.invalidations == 1
+        assert await repo._cached_rows(_names) == [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+        assert (query_cache.misses, query_cache.hits) == (2, 1)
+        # ...а новый снова отдаётся из кэша
+        await repo._cached_rows(_names)
+        assert query_cache.hits == 2
+
+    _run(scenario)
+
+
+def test_unit_of_work_bypasses_cache(fake: FakeRedis) -> None:
+    async def scenario(repo: BaseRepository) -> None:
+        await repo._cached_rows(_names)  # прогреть кэш вне транзакции
+        calls_before = sum(fake.calls.values())
+
+        async with unit_of_work():
+            async with repo._sm() as s:
+                await s.execute(insert(items).values(id=3, name="c"))
+                await s.commit()  # внутри unit of work — только flush
+            # Незакоммиченная запись видна, кэш не спрашивали и не заполняли
+            assert await repo._cached_rows(_names) == [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+            assert query_cache.bypassed == 1
+            assert sum(fake.calls.values()) == calls_before
+
+        # После commit'а unit of work тег поднят, чтение вне транзакции снова через кэш и свежее
+        assert await fake.get(TAG_KEY) == b"1"
+        assert await repo._cached_rows(_names) == [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+        assert (query_cache.misses, query_cache.hits) == (2, 0)
+
+    _run(scenario)
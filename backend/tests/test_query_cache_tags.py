@@ -0,0 +1,180 @@
+# =============================================================================
+# ФАЙЛ: backend/tests/test_query_cache_tags.py
+# КРАТКО: логика тегов и инвалидации QueryCache поверх RedisBackend(FakeRedis) — без базы данных.
+# ЧТО ПРОВЕРЯЕМ:
+#   • промах → load() и SET ... EX ttl; повтор — попадание без load();
+#   • invalidate() делает INCR qc:tag:<таблица> — старый ключ больше не спрашивается;
+#   • инвалидация чужой таблицы кэш не сбрасывает; запрос с JOIN зависит от обеих таблиц;
+#   • в unit of work кэш не трогаем; слишком большой результат не пишем; сбой «Redis» — идём в load().
+# ЗАПУСК (из корня репозитория, после pip install -r backend/requirements-dev.txt; Postgres не нужен):
+#   python -m pytest -q backend/tests
+# =============================================================================
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table, Text, select
+
+from backend.infrastructure import query_cache as qc_module
+from backend.infrastructure.query_cache import QueryCache, RedisBackend
+from backend.tests.fake_redis import FakeRedis
+
+_meta = MetaData()
+teams = Table("qc_teams", _meta, Column("id", Integer, primary_key=True), Column("name", Text))
+members = Table(
+    "qc_members", _meta,
+    Column("id", Integer, primary_key=True),
+    Column("team_id", Integer, ForeignKey("qc_teams.id")),
+)
+
+_team_names = select(teams.c.name).order_by(teams.c.id)
+_team_sizes = select(teams.c.name, members.c.id).join(members, members.c.team_id == teams.c.id)
+
+
+class Loader:
+    """load() для fetch(): считает обращения «к БД» и отдаёт текущие rows."""
+
+    def __init__(self, rows: List[dict]) -> None:
+        self.rows = rows
+        self.calls = 0
+
+    async def __call__(self) -> List[dict]:
+        self.calls += 1
+        return list(self.rows)
+
+
+def _cache(client: FakeRedis, **kwargs: Any) -> QueryCache:
+    kwargs.setdefault("ttl", 60)
+    kwargs.setdefault("max_entry_bytes", 64 * 1024)
+    return QueryCache(RedisBackend(client), **kwargs)
+
+
+def _run(scenario: Callable[[], Awaitable[None]]) -> None:
+    asyncio.run(scenario())
+
+
+def test_miss_then_hit() -> None:
+    client = FakeRedis()
+    cache, load = _cache(client), Loader([{"name": "a"}])
+
+    async def scenario() -> None:
+        assert await cache.fetch(_team_names, load) == [{"name": "a"}]
+        assert await cache.fetch(_team_names, load) == [{"name": "a"}]
+        assert load.calls == 1
+        assert (cache.misses, cache.hits) == (1, 1)
+        # Версии тегов читаются одним MGET, значение пишется с TTL
+        assert client.calls["mget"] == 2 and client.calls["set"] == 1
+        assert len(client.keys("qc:val:")) == 1
+        assert client.keys("qc:tag:") == []  # тег ещё ни разу не поднимали — версия 0
+
+    _run(scenario)
+
+
+def test_invalidate_bumps_tag_and_forces_reload() -> None:
+    client = FakeRedis()
+    cache, load = _cache(client), Loader([{"name": "a"}])
+
+    async def scenario() -> None:
+        await cache.fetch(_team_names, load)
+        load.rows = [{"name": "a"}, {"name": "b"}]
+
+        await cache.invalidate({"qc_teams"})
+        assert await client.get("qc:tag:qc_teams") == b"1"
+        assert cache.invalidations == 1
+
+        assert await cache.fetch(_team_names, load) == [{"name": "a"}, {"name": "b"}]
+        assert load.calls == 2
+        # Новая версия — новый ключ; дальше снова из кэша
+        assert await cache.fetch(_team_names, load) == [{"name": "a"}, {"name": "b"}]
+        assert load.calls == 2
+        assert len(client.keys("qc:val:")) == 2
+
+    _run(scenario)
+
+
+def test_unrelated_table_does_not_invalidate() -> None:
+    client = FakeRedis()
+    cache, load = _cache(client), Loader([{"name": "a"}])
+
+    async def scenario() -> None:
+        await cache.fetch(_team_names, load)
+        await cache.invalidate({"qc_members"})
+        await cache.fetch(_team_names, load)
+        assert load.calls == 1
+
+    _run(scenario)
+
+
+def test_join_depends_on_every_table() -> None:
+    client = FakeRedis()
+    cache, load = _cache(client), Loader([{"name": "a", "id": 1}])
+
+    async def scenario() -> None:
+        assert qc_module.tables_of(_team_sizes) == {"qc_teams", "qc_members"}
+        await cache.fetch(_team_sizes, load)
+        await cache.invalidate({"qc_members"})
+        await cache.fetch(_team_sizes, load)
+        assert load.calls == 2
+
+    _run(scenario)
+
+
+def test_explicit_tags_override_statement_tables() -> None:
+    client = FakeRedis()
+    cache, load = _cache(client), Loader([{"name": "a"}])
+
+    async def scenario() -> None:
+        await cache.fetch(_team_names, load, tags=["qc_members"])
+        await cache.invalidate({"qc_teams"})
+        await cache.fetch(_team_names, load, tags=["qc_members"])
+        assert load.calls == 1
+        await cache.invalidate({"qc_members"})
+        await cache.fetch(_team_names, load, tags=["qc_members"])
+        assert load.calls == 2
+
+    _run(scenario)
+
+
+def test_unit_of_work_bypasses_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeRedis()
+    cache, load = _cache(client), Loader([{"name": "a"}])
+    monkeypatch.setattr(qc_module, "in_unit_of_work", lambda: True)
+
+    async def scenario() -> None:
+        await cache.fetch(_team_names, load)
+        await cache.fetch(_team_names, load)
+        assert load.calls == 2
+        assert cache.bypassed == 2
+        assert sum(client.calls.values()) == 0
+
+    _run(scenario)
+
+
+def test_oversized_result_is_not_stored() -> None:
+    client = FakeRedis()
+    cache, load = _cache(client, max_entry_bytes=16), Loader([{"name": "x" * 100}])
+
+    async def scenario() -> None:
+        await cache.fetch(_team_names, load)
+        await cache.fetch(_team_names, load)
+        assert load.calls == 2
+        assert client.calls["set"] == 0
+
+    _run(scenario)
+
+
+def test_backend_failure_falls_back_to_load() -> None:
+    class BrokenRedis(FakeRedis):
+        async def mget(self, keys):  # type: ignore[override]
+            raise ConnectionError("redis is down")
+
+    cache, load = _cache(BrokenRedis()), Loader([{"name": "a"}])
+
+    async def scenario() -> None:
+        assert await cache.fetch(_team_names, load) == [{"name": "a"}]
+        assert (cache.errors, cache.bypassed, load.calls) == (1, 1, 1)
+
+    _run(scenario)
@@ -0,0 +1,75 @@
+# =============================================================================
+# ФАЙЛ: backend/utils/cursor.py
+# КРАТКО: непрозрачные курсоры для keyset-пагинации («следующая страница после этой строки»).
+# ЗАЧЕМ:
+#   • OFFSET N заставляет БД прочитать и выбросить N строк — глубокие страницы линейно дороже.
+#     Курсор хранит ключи сортировки последней строки страницы, и следующая страница —
+#     это WHERE (k1, k2, id) < (:k1, :k2, :id) ORDER BY k1 DESC, k2 DESC, id DESC LIMIT n:
+#     по композитному индексу страница N стоит столько же, сколько первая.
+#   • Строки не «переезжают» между страницами, если у уже показанных поменялся updated_at.
+# ФОРМАТ:
+#   • base64url(JSON) вида {"k": "<вид сортировки>", "v": [значения ключей]}.
+#     "k" не даёт подсунуть курсор от другого списка/другого порядка.
+#   • Подписи нет: курсор — не секрет и не даёт доступа к чужим данным, это лишь «место в списке».
+# КАК ИСПОЛЬЗОВАТЬ:
+#     after = decode_cursor(cursor, "users:all", (datetime, int)) if cursor else None  # CursorError → 400
+#     rows = await repo.list(..., after=after)
+#     next_cursor = encode_cursor("users:all", (last.updated_at, last.id)) if len(rows) == limit else None
+# =============================================================================
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence, Tuple
+
+
+class CursorError(ValueError):
+    """Курсор повреждён или выдан для другого списка."""
+
+
+def _dump(value: Any) -> Any:
+    # datetime в JSON нет — храним ISO-строку с пометкой типа
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(kind: str, values: Sequence[Any]) -> str:
+    """Курсор из ключей сортировки последней строки страницы."""
+    raw = json.dumps({"k": kind, "v": [_dump(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, kind: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """
+    Ключи сортировки из курсора; CursorError, если курсор битый или от другого списка.
+    types — ожидаемые типы ключей (например, (datetime, int)): чужое значение не дойдёт до SQL.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        values = tuple(_load(v) for v in data["v"])
+        got_kind = data["k"]
+    except Exception:
+        raise CursorError("invalid cursor")
+    if got_kind != kind:
+        raise CursorError("cursor does not match this list")
+    if len(values) != len(types) or not all(_is_a(v, t) for v, t in zip(values, types)):
+        raise CursorError("invalid cursor")
+    return values
+
+
+def _is_a(value: Any, expected: type) -> bool:
+    if isinstance(value, bool):
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
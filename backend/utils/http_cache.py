@@ -0,0 +1,83 @@
+# =============================================================================
+# ФАЙЛ: backend/utils/http_cache.py
+# КРАТКО: условные GET-запросы — ETag / Last-Modified и ответ 304 Not Modified.
+# ЗАЧЕМ:
+#   • Мини-апп Telegram постоянно перезапрашивает одни и те же ресурсы.
+#     Если клиент прислал If-None-Match / If-Modified-Since и данные не менялись,
+#     отвечаем 304 без тела — ни сериализации, ни лишнего трафика.
+#   • «Версию» ресурса роутер берёт из дешёвого запроса по updated_at (или из хэша тела),
+#     а этот модуль только сравнивает её с заголовками запроса.
+# КАК ИСПОЛЬЗОВАТЬ В РОУТЕ:
+#     etag = make_etag("hackathon", h.id, h.updated_at)
+#     if is_not_modified(request, etag, h.updated_at):
+#         return not_modified(etag, h.updated_at)
+#     set_cache_headers(response, etag, h.updated_at)
+#     return _pack(h)
+# =============================================================================
+
+from __future__ import annotations
+
+import hashlib                                # sha1 — компактный отпечаток «версии» ресурса
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime  # HTTP-даты (RFC 7231)
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Клиент обязан перепроверять ответ при каждом использовании (no-cache), а общие прокси
+# его не кэшируют (private): ответы зависят от пользователя из JWT.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Сильный ETag из частей «версии» ресурса (id, updated_at, параметры запроса и т.п.).
+    Если дешёвой версии у ресурса нет, частью может быть и само сериализованное тело.
+    """
+    raw = "|".join(repr(p) for p in parts).encode("utf-8")
+    return '"' + hashlib.sha1(raw).hexdigest() + '"'
+
+
+def _http_date(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Можно ли ответить 304:
+      • если есть If-None-Match — решает только он (сравнение ETag, «*» совпадает с чем угодно);
+      • иначе If-Modified-Since: ресурс не менялся с указанного момента (с точностью до секунды).
+    """
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        return "*" in tags or etag in tags
+
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        lm = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        return lm.replace(microsecond=0) <= since
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    """Проставить валидаторы на обычный (200) ответ."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Пустой ответ 304 с теми же валидаторами."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, last_modified)
+    return response
@@ -1,6 +1,7 @@
 
 from __future__ import annotations
 import hashlib, hmac, json, time, urllib.parse
+from collections import OrderedDict
 
 # Исключение для обработки ошибок, связанных с некорректными данными
 class InitDataError(Exception):
@@ -14,76 +15,159 @@ def _data_check_string(parsed: dict[str, str]) -> str:
     # Возвращаем строку, соединяя элементы через новую строку "\n"
     return "\n".join(parts)
 
-# Функция для проверки подписи данных, полученных от Mini App (WebAppData)
-def _verify_webapp(parsed: dict[str, str], bot_token: str) -> bool:
-    """
-    Проверка подписи для данных от Telegram Mini App:
-      secret = HMAC_SHA256(key="WebAppData", msg=bot_token)
-      expected = HMAC_SHA256(key=secret, msg=data_check_string)
-    """
-    # Создаём строку данных для проверки подписи
-    dcs = _data_check_string(parsed)
-    # Генерируем секрет с помощью HMAC и bot_token
-    secret = hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest()
-    # Вычисляем ожидаемую подпись, используя этот секрет
-    calc = hmac.new(secret, dcs.encode("utf-8"), hashlib.sha256).hexdigest()
-    # Сравниваем вычисленную подпись с той, что пришла в данных (parsed["hash"])
-    return hmac.compare_digest(calc, parsed["hash"])
-
-# Функция для проверки подписи, если данные пришли из Login Widget
-def _verify_login(parsed: dict[str, str], bot_token: str) -> bool:
+# Поля, которые есть только в initData Mini App (в данных Login Widget их не бывает)
+_WEBAPP_MARKERS = frozenset({"query_id", "chat_instance", "chat_type", "start_param", "signature", "receiver", "chat"})
+
+
+class TelegramInitDataVerifier:
     """
-    Резервный механизм для проверки подписи в случае использования Login Widget:
-      secret = SHA256(bot_token)
-      expected = HMAC_SHA256(key=secret, msg=data_check_string)
+    Проверка initData, настроенная один раз на bot_token:
+      • ключи обеих схем считаются в конструкторе, а не на каждый вызов:
+          - Mini App:     secret = HMAC_SHA256(key="WebAppData", msg=bot_token)
+          - Login Widget: secret = SHA256(bot_token)
+      • схема определяется по полям initData (query_id/chat_instance/... → Mini App) — считаем один HMAC;
+        если признаков нет, пробуем обе схемы, как раньше;
+      • replay-защита: хэши уже принятых initData помним max_age_seconds (ограниченный LRU) —
+        повторная отправка тех же данных отклоняется ещё до подписи и до БД.
+        check() проверяет и сразу резервирует hash (pending): параллельный повтор тех же данных
+        получает replay, не дойдя до БД. Владелец логина после commit'а вызывает remember()
+        (резерв становится окончательным), при ошибке — release(): неудавшийся вход (ошибка БД,
+        rollback) не «сжигает» initData, и клиент может повторить.
     """
-    # Создаём строку данных для проверки подписи
-    dcs = _data_check_string(parsed)
-    # Генерируем секрет с использованием SHA256 от bot_token
-    secret = hashlib.sha256(bot_token.encode("utf-8")).digest()
-    # Вычисляем подпись с использованием этого секрета
-    calc = hmac.new(secret, dcs.encode("utf-8"), hashlib.sha256).hexdigest()
-    # Сравниваем вычисленную подпись с той, что пришла в данных
-    return hmac.compare_digest(calc, parsed["hash"])
-
-# Основная функция для проверки и валидации данных от Telegram
+
+    def __init__(
+        self,
+        bot_token: str,
+        *,
+        max_age_seconds: int = 300,
+        replay_protection: bool = True,
+        replay_cache_size: int = 100_000,
+    ) -> None:
+        self.configured = bool(bot_token)
+        self.max_age_seconds = max_age_seconds
+        token = bot_token.encode("utf-8")
+        self._webapp_secret = hmac.new(b"WebAppData", token, hashlib.sha256).digest()
+        self._login_secret = hashlib.sha256(token).digest()
+        # Недавно принятые hash -> время, до которого повтор считается replay (monotonic)
+        self._seen: "OrderedDict[str, float]" | None = OrderedDict() if replay_protection else None
+        self._seen_max = replay_cache_size
+        # Зарезервированные check()'ом, но ещё не подтверждённые remember() hash (лежат и в _seen)
+        self._pending: set[str] = set()
+
+    def _sign(self, secret: bytes, dcs: bytes) -> str:
+        return hmac.new(secret, dcs, hashlib.sha256).hexdigest()
+
+    def _check_signature(self, parsed: dict[str, str]) -> bool:
+        dcs = _data_check_string(parsed).encode("utf-8")
+        got = parsed["hash"]
+        if _WEBAPP_MARKERS.intersection(parsed):
+            return hmac.compare_digest(self._sign(self._webapp_secret, dcs), got)
+        # Схему не распознали — проверяем обе (сначала Mini App, затем Login Widget)
+        return hmac.compare_digest(self._sign(self._webapp_secret, dcs), got) or hmac.compare_digest(
+            self._sign(self._login_secret, dcs), got
+        )
+
+    def _is_replay(self, h: str) -> bool:
+        if self._seen is None:
+            return False
+        expires_at = self._seen.get(h)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._seen[h]
+            self._pending.discard(h)
+            return False
+        return True
+
+    def _mark(self, h: str) -> None:
+        now = time.monotonic()
+        self._seen[h] = now + self.max_age_seconds
+        self._seen.move_to_end(h)
+        # Снимаем протухшие записи с «головы» и держим размер в пределах лимита
+        while self._seen:
+            oldest, expires_at = next(iter(self._seen.items()))
+            if expires_at > now and len(self._seen) <= self._seen_max:
+                break
+            del self._seen[oldest]
+            self._pending.discard(oldest)
+
+    def remember(self, h: str) -> None:
+        """Отметить hash принятого initData как использованный (повтор до истечения max_age — replay)."""
+        if self._seen is None:
+            return
+        self._pending.discard(h)
+        self._mark(h)
+
+    def release(self, h: str) -> None:
+        """Снять резерв check() после неудачного входа — тот же initData снова можно прислать."""
+        if self._seen is None or h not in self._pending:
+            return  # Уже подтверждённый hash (или чужой) не трогаем
+        self._pending.discard(h)
+        self._seen.pop(h, None)
+
+    def check(self, init_data: str) -> dict:
+        """
+        Проверить initData и зарезервировать его hash; вернёт {"user": {...}, "fields": {...}}
+        или бросит InitDataError. Хэш для remember()/release() — в fields["hash"].
+        Метод синхронный: проверка повтора и резерв не разделены await'ом — атомарны для event loop'а.
+        """
+        # Если bot_token не задан, выбрасываем ошибку
+        if not self.configured:
+            raise InitDataError("TELEGRAM_BOT_TOKEN is not configured")
+
+        # Разбираем строку запроса в словарь. Значения уже URL-декодированы.
+        pairs = urllib.parse.parse_qsl(init_data, keep_blank_values=True)
+        parsed: dict[str, str] = {k: v for k, v in pairs}
+
+        # Проверяем, что обязательные поля присутствуют в данных
+        if "hash" not in parsed:
+            raise InitDataError("missing hash")
+        if "auth_date" not in parsed:
+            raise InitDataError("missing auth_date")
+        if "user" not in parsed:
+            raise InitDataError("missing user")
+
+        # Повтор уже принятых данных отклоняем сразу — без HMAC
+        if self._is_replay(parsed["hash"]):
+            raise InitDataError("init_data already used")
+
+        if not self._check_signature(parsed):
+            raise InitDataError("invalid hash")
+
+        # Проверяем дату аутентификации (auth_date). Делаем допуск на небольшие расхождения во времени.
+        try:
+            ts = int(parsed["auth_date"])
+        except ValueError:
+            raise InitDataError("invalid auth_date")
+        if self.max_age_seconds and abs(int(time.time()) - ts) > self.max_age_seconds:
+            raise InitDataError("auth_date expired")
+
+        # Проверяем, что поле 'user' является валидным JSON-объектом
+        try:
+            user = json.loads(parsed["user"])
+            # Проверяем, что объект user содержит ключ 'id'
+            if not isinstance(user, dict) or "id" not in user:
+                raise InitDataError("invalid user payload")
+        except json.JSONDecodeError:
+            raise InitDataError("invalid user json")
+
+        # Данные подлинные и свежие — резервируем hash до remember()/release()
+        if self._seen is not None:
+            self._pending.add(parsed["hash"])
+            self._mark(parsed["hash"])
+
+        # Возвращаем данные о пользователе и остальные поля (без подмен)
+        return {"user": user, "fields": parsed}
+
+    def verify(self, init_data: str) -> dict:
+        """check() + сразу remember() — для случаев, когда после проверки нечему падать."""
+        parsed = self.check(init_data)
+        self.remember(parsed["fields"]["hash"])
+        return parsed
+
+
+# Основная функция для проверки и валидации данных от Telegram.
+# Разовая проверка без replay-защиты; для потока логинов используйте TelegramInitDataVerifier.
 def verify_init_data(init_data: str, bot_token: str, max_age_seconds: int = 300) -> dict:
-    # Если bot_token не задан, выбрасываем ошибку
-    if not bot_token:
-        raise InitDataError("TELEGRAM_BOT_TOKEN is not configured")
-
-    # Разбираем строку запроса в словарь. Значения уже URL-декодированы.
-    pairs = urllib.parse.parse_qsl(init_data, keep_blank_values=True)
-    parsed: dict[str, str] = {k: v for k, v in pairs}
-
-    # Проверяем, что обязательные поля присутствуют в данных
-    if "hash" not in parsed:
-        raise InitDataError("missing hash")
-    if "auth_date" not in parsed:
-        raise InitDataError("missing auth_date")
-    if "user" not in parsed:
-        raise InitDataError("missing user")
-
-    # Проверка подписи: сначала для WebAppData, затем fallback для Login Widget
-    if not (_verify_webapp(parsed, bot_token) or _verify_login(parsed, bot_token)):
-        raise InitDataError("invalid hash")
-
-    # Проверяем дату аутентификации (auth_date). Делаем допуск на небольшие расхождения во времени.
-    try:
-        ts = int(parsed["auth_date"])
-    except ValueError:
-        raise InitDataError("invalid auth_date")
-    if max_age_seconds and abs(int(time.time()) - ts) > max_age_seconds:
-        raise InitDataError("auth_date expired")
-
-    # Проверяем, что поле 'user' является валидным JSON-объектом
-    try:
-        user = json.loads(parsed["user"])
-        # Проверяем, что объект user содержит ключ 'id'
-        if not isinstance(user, dict) or "id" not in user:
-            raise InitDataError("invalid user payload")
-    except json.JSONDecodeError:
-        raise InitDataError("invalid user json")
-
-    # Возвращаем данные о пользователе и остальные поля (без подмен)
-    return {"user": user, "fields": parsed}
+    verifier = TelegramInitDataVerifier(bot_token, max_age_seconds=max_age_seconds, replay_protection=False)
+    return verifier.verify(init_data)
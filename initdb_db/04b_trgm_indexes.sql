@@ -0,0 +1,10 @@
+-- Нечёткий поиск по людям (GET /users?q=..., поиск анкет по q): LIKE '%q%' и ранжирование
+-- по похожести. btree ix_users_username_ci такие шаблоны не обслуживает — нужны trigram GIN.
+-- Выражения должны совпадать с backend/repositories/users.py (user_text_search), иначе индекс не подхватится.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_users_username_trgm
+  ON users USING gin (lower(username) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_users_fullname_trgm
+  ON users USING gin (lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops);
@@ -0,0 +1,12 @@
+-- Полнотекстовый поиск по профилям (GET /users?q=...): username, имя, фамилия, био, город, ВУЗ.
+-- tsvector — генерируемая колонка: PostgreSQL сам пересчитывает её при INSERT/UPDATE, триггер не нужен.
+-- Вес: A — username и имя, B — био, C — город/ВУЗ (влияет на ts_rank).
+-- Конфигурация 'russian' — она же в запросе (backend/repositories/users.py, user_profile_search).
+ALTER TABLE users ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian', coalesce(username, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce(bio, '')), 'B') ||
+    setweight(to_tsvector('russian', coalesce(city, '') || ' ' || coalesce(university, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_users_search_tsv ON users USING gin (search_tsv);
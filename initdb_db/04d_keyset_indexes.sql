@@ -0,0 +1,17 @@
+-- Keyset-пагинация списков (cursor вместо OFFSET, см. backend/utils/cursor.py):
+-- WHERE <фильтр> AND (ключ, id) < (:ключ, :id) ORDER BY ключ DESC, id DESC LIMIT n.
+-- Индекс с тем же порядком отдаёт страницу сразу с нужного места — дальние страницы стоят как первая.
+
+-- GET /users (без q и навыков): ORDER BY updated_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_users_updated_id     ON users (updated_at DESC, id DESC);
+
+-- GET /hackathons/{id}/applications и GET /me/applications
+CREATE INDEX IF NOT EXISTS idx_app_hack_updated_id  ON application (hackathon_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_app_user_updated_id  ON application (user_id, updated_at DESC, id DESC);
+
+-- GET /achievements/me, /achievements/user/{id} (+ список по хакатону)
+CREATE INDEX IF NOT EXISTS idx_ach_user_created_id  ON achievements (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_ach_hack_created_id  ON achievements (hackathon_id, created_at DESC, id DESC);
+
+-- GET /hackathons: только открытые, ORDER BY start_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_hack_open_start_id   ON hackathon (start_date DESC, id DESC) WHERE status = 'open';
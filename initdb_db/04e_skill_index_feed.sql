@@ -0,0 +1,4 @@
+-- Поток изменений для индекса навыков в памяти (backend/repositories/skill_index.py):
+-- раз в несколько секунд каждый воркер читает строки с updated_at >= :watermark.
+-- users покрыт idx_users_updated_id (04d); для заявок нужен свой индекс по updated_at.
+CREATE INDEX IF NOT EXISTS idx_app_updated_at ON application (updated_at);
@@ -0,0 +1,29 @@
+-- Поиск и фильтры экрана «Хакатоны» (GET /hackathons, backend/repositories/hackathons.py).
+-- Список — только открытые (status = 'open'), поэтому все индексы частичные: закрытые
+-- хакатоны копятся годами, а в индексы списка не попадают.
+
+-- Полнотекстовый поиск: name (A), description (B), city (C). Генерируемая колонка — как users.search_tsv
+-- (04c_users_fts.sql), конфигурация 'russian' — та же, что в запросе (hackathon_text_search).
+ALTER TABLE hackathon ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('russian', coalesce(city, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_hack_open_search_tsv ON hackathon USING gin (search_tsv) WHERE status = 'open';
+
+-- Подстрока/опечатка в названии («hack», «ИТМО»): LIKE '%q%' и word_similarity по lower(name)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_hack_open_name_trgm ON hackathon USING gin (lower(name) gin_trgm_ops) WHERE status = 'open';
+
+-- Сортировки. btree читается в обе стороны, поэтому (start_date DESC, id DESC) обслуживает
+-- и sort=start_desc (по умолчанию), и sort=start_asc; диапазон дат старта — range по тому же индексу.
+--   idx_hack_open_start_id (start_date DESC, id DESC) — уже есть (04d_keyset_indexes.sql).
+-- sort=registration_end — «скоро закрывается регистрация»; он же фильтр registration_open (> now()).
+CREATE INDEX IF NOT EXISTS idx_hack_open_reg_end_id ON hackathon (registration_end_date, id)
+  WHERE status = 'open' AND registration_end_date IS NOT NULL;
+
+-- Фильтры mode / city с сортировкой по старту: равенство по первому столбцу + порядок из индекса
+CREATE INDEX IF NOT EXISTS idx_hack_open_mode_start_id ON hackathon (mode, start_date DESC, id DESC) WHERE status = 'open';
+CREATE INDEX IF NOT EXISTS idx_hack_open_city_start_id ON hackathon (lower(city), start_date DESC, id DESC) WHERE status = 'open';
@@ -10,6 +10,10 @@ DROP TRIGGER IF EXISTS trg_user_updated ON users;
 CREATE TRIGGER trg_user_updated BEFORE UPDATE ON users
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
 
+DROP TRIGGER IF EXISTS trg_skill_updated ON skill;
+CREATE TRIGGER trg_skill_updated BEFORE UPDATE ON skill
+FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
 DROP TRIGGER IF EXISTS trg_hack_updated ON hackathon;
 CREATE TRIGGER trg_hack_updated BEFORE UPDATE ON hackathon
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
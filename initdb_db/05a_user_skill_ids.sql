@@ -0,0 +1,68 @@
+-- Денормализованный набор навыков пользователя: users.skill_ids (отсортированный int[]).
+-- Поиск по навыкам (GET /users?skills=...) идёт одним индексным запросом по users:
+--   mode=all → skill_ids @> :ids,  mode=any → skill_ids && :ids,  match_count → icount(skill_ids & :ids).
+-- Источник правды — user_skill; массив поддерживают statement-триггеры ниже (любая запись в user_skill,
+-- в т.ч. мимо приложения). Файл идёт до сидов (06_*), чтобы тестовые данные сразу получили массивы.
+CREATE EXTENSION IF NOT EXISTS intarray;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS skill_ids INT[] NOT NULL DEFAULT '{}';
+
+-- С установленным intarray операторы @> / && для int[] берутся из него, поэтому и индекс — gin__int_ops
+CREATE INDEX IF NOT EXISTS ix_users_skill_ids ON users USING gin (skill_ids gin__int_ops);
+
+CREATE OR REPLACE FUNCTION fn_refresh_user_skill_ids(p_user_ids INT[])
+RETURNS void AS $$
+  UPDATE users u
+     SET skill_ids = coalesce(
+           (SELECT array_agg(us.skill_id ORDER BY us.skill_id) FROM user_skill us WHERE us.user_id = u.id),
+           '{}')
+   WHERE u.id = ANY(p_user_ids);
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fn_user_skill_ids_ins()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_skill_ids(ARRAY(SELECT DISTINCT user_id FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_user_skill_ids_del()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_skill_ids(ARRAY(SELECT DISTINCT user_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_user_skill_ids_upd()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_skill_ids(ARRAY(SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_skill_ids_ins ON user_skill;
+CREATE TRIGGER trg_user_skill_ids_ins
+  AFTER INSERT ON user_skill REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_user_skill_ids_ins();
+
+DROP TRIGGER IF EXISTS trg_user_skill_ids_del ON user_skill;
+CREATE TRIGGER trg_user_skill_ids_del
+  AFTER DELETE ON user_skill REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_user_skill_ids_del();
+
+DROP TRIGGER IF EXISTS trg_user_skill_ids_upd ON user_skill;
+CREATE TRIGGER trg_user_skill_ids_upd
+  AFTER UPDATE ON user_skill REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_user_skill_ids_upd();
+
+-- Для уже заполненной базы: разовый пересчёт
+UPDATE users u
+   SET skill_ids = coalesce(
+         (SELECT array_agg(us.skill_id ORDER BY us.skill_id) FROM user_skill us WHERE us.user_id = u.id),
+         '{}')
+ WHERE u.skill_ids IS DISTINCT FROM coalesce(
+         (SELECT array_agg(us.skill_id ORDER BY us.skill_id) FROM user_skill us WHERE us.user_id = u.id),
+         '{}');
@@ -0,0 +1,185 @@
+-- Материализованные карточки анкет: application_card (одна строка на анкету, готовая форма ответа API).
+-- Списки GET /hackathons/{id}/applications и GET /me/applications читают только эту таблицу —
+-- один проход по индексу (hackathon_id | user_id, updated_at DESC, application_id DESC), без JOIN'ов
+-- users/user_skill/skill/hackathon и без ARRAY_AGG на каждое чтение.
+-- Источник правды — application/users/user_skill/skill/hackathon; карточки поддерживают
+-- statement-триггеры ниже (любая запись, в т.ч. мимо приложения), в той же транзакции.
+-- updated_at — это application.updated_at (ключ сортировки и keyset-курсоров не меняется от правок профиля).
+-- Удаление анкеты (и пользователя/хакатона через каскад) удаляет карточку по FK.
+-- Файл идёт до сидов (06_*), чтобы тестовые данные сразу получили карточки.
+CREATE TABLE IF NOT EXISTS application_card (
+  application_id         INT PRIMARY KEY REFERENCES application(id) ON DELETE CASCADE,
+  hackathon_id           INT NOT NULL,
+  user_id                INT NOT NULL,
+  role                   role_type,
+  status                 application_status NOT NULL,
+  joined                 BOOLEAN NOT NULL,
+  username               TEXT,
+  first_name             TEXT,
+  last_name              TEXT,
+  skills                 JSONB NOT NULL DEFAULT '[]',  -- [{id, slug, name}] по имени, как в API
+  registration_end_date  TIMESTAMPTZ,
+  created_at             TIMESTAMPTZ NOT NULL,
+  updated_at             TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_card_hack_updated_id ON application_card (hackathon_id, updated_at DESC, application_id DESC);
+CREATE INDEX IF NOT EXISTS idx_card_user_updated_id ON application_card (user_id, updated_at DESC, application_id DESC);
+
+-- Пересборка карточек по id анкет (upsert; исчезнувшие анкеты уже удалены каскадом)
+CREATE OR REPLACE FUNCTION fn_refresh_application_cards(p_app_ids INT[])
+RETURNS void AS $$
+  INSERT INTO application_card AS c (
+    application_id, hackathon_id, user_id, role, status, joined,
+    username, first_name, last_name, skills, registration_end_date, created_at, updated_at
+  )
+  SELECT a.id, a.hackathon_id, a.user_id, a.role, a.status, a.joined,
+         u.username, u.first_name, u.last_name,
+         coalesce((
+           -- COLLATE "C" — тот же порядок, что сортировка по имени в Python (SkillCatalog.sorted_by_name)
+           SELECT jsonb_agg(jsonb_build_object('id', s.id, 'slug', s.slug, 'name', s.name)
+                            ORDER BY s.name COLLATE "C", s.id)
+             FROM user_skill us JOIN skill s ON s.id = us.skill_id
+            WHERE us.user_id = a.user_id
+         ), '[]'::jsonb),
+         h.registration_end_date, a.created_at, a.updated_at
+    FROM application a
+    JOIN users u ON u.id = a.user_id
+    JOIN hackathon h ON h.id = a.hackathon_id
+   WHERE a.id = ANY(p_app_ids)
+  ON CONFLICT (application_id) DO UPDATE SET
+    hackathon_id = EXCLUDED.hackathon_id,
+    user_id = EXCLUDED.user_id,
+    role = EXCLUDED.role,
+    status = EXCLUDED.status,
+    joined = EXCLUDED.joined,
+    username = EXCLUDED.username,
+    first_name = EXCLUDED.first_name,
+    last_name = EXCLUDED.last_name,
+    skills = EXCLUDED.skills,
+    registration_end_date = EXCLUDED.registration_end_date,
+    created_at = EXCLUDED.created_at,
+    updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fn_refresh_application_cards_of_users(p_user_ids INT[])
+RETURNS void AS $$
+  SELECT fn_refresh_application_cards(ARRAY(SELECT id FROM application WHERE user_id = ANY(p_user_ids)));
+$$ LANGUAGE sql;
+
+-- application: вставка/изменение анкеты
+CREATE OR REPLACE FUNCTION fn_app_card_from_application()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards(ARRAY(SELECT id FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_app_card_ins ON application;
+CREATE TRIGGER trg_app_card_ins
+  AFTER INSERT ON application REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_application();
+
+DROP TRIGGER IF EXISTS trg_app_card_upd ON application;
+CREATE TRIGGER trg_app_card_upd
+  AFTER UPDATE ON application REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_application();
+
+-- users: только если поменялись поля карточки (правки bio/avatar/skill_ids карточки не трогают)
+CREATE OR REPLACE FUNCTION fn_app_card_from_users()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards_of_users(ARRAY(
+    SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+     WHERE (n.username, n.first_name, n.last_name) IS DISTINCT FROM (o.username, o.first_name, o.last_name)
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_app_card_users ON users;
+CREATE TRIGGER trg_app_card_users
+  AFTER UPDATE ON users REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_users();
+
+-- user_skill: навыки владельца
+CREATE OR REPLACE FUNCTION fn_app_card_from_user_skill_ins()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards_of_users(ARRAY(SELECT DISTINCT user_id FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_app_card_from_user_skill_del()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards_of_users(ARRAY(SELECT DISTINCT user_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_app_card_from_user_skill_upd()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards_of_users(ARRAY(SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_app_card_user_skill_ins ON user_skill;
+CREATE TRIGGER trg_app_card_user_skill_ins
+  AFTER INSERT ON user_skill REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_user_skill_ins();
+
+DROP TRIGGER IF EXISTS trg_app_card_user_skill_del ON user_skill;
+CREATE TRIGGER trg_app_card_user_skill_del
+  AFTER DELETE ON user_skill REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_user_skill_del();
+
+DROP TRIGGER IF EXISTS trg_app_card_user_skill_upd ON user_skill;
+CREATE TRIGGER trg_app_card_user_skill_upd
+  AFTER UPDATE ON user_skill REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_user_skill_upd();
+
+-- skill: переименование навыка (редко) — карточки всех его владельцев
+CREATE OR REPLACE FUNCTION fn_app_card_from_skill()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards_of_users(ARRAY(
+    SELECT DISTINCT us.user_id
+      FROM new_rows n JOIN old_rows o ON o.id = n.id
+      JOIN user_skill us ON us.skill_id = n.id
+     WHERE (n.slug, n.name) IS DISTINCT FROM (o.slug, o.name)
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_app_card_skill ON skill;
+CREATE TRIGGER trg_app_card_skill
+  AFTER UPDATE ON skill REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_skill();
+
+-- hackathon: registration_end_date есть в каждой карточке хакатона
+CREATE OR REPLACE FUNCTION fn_app_card_from_hackathon()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_application_cards(ARRAY(
+    SELECT a.id
+      FROM new_rows n JOIN old_rows o ON o.id = n.id
+      JOIN application a ON a.hackathon_id = n.id
+     WHERE n.registration_end_date IS DISTINCT FROM o.registration_end_date
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_app_card_hackathon ON hackathon;
+CREATE TRIGGER trg_app_card_hackathon
+  AFTER UPDATE ON hackathon REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_app_card_from_hackathon();
+
+-- Для уже заполненной базы: разовая сборка всех карточек
+SELECT fn_refresh_application_cards(ARRAY(SELECT id FROM application));
@@ -0,0 +1,162 @@
+-- Денормализованный профиль пользователя: user_profile_doc (одна строка на пользователя).
+-- doc — готовый JSON ответа GET /users/me, /users/{id} и профиля при логине
+-- (поля users + skills [{id, slug, name}] по имени + achievements [...] новые сверху).
+-- Ручки делают один поиск по PK и отдают doc как есть; version — счётчик изменений doc, он же ETag.
+-- Источник правды — users/user_skill/skill/achievements; doc поддерживают statement-триггеры ниже
+-- (любая запись, в т.ч. мимо приложения), в той же транзакции. version растёт, только если doc
+-- действительно изменился (правка updated_at/skill_ids без смены полей профиля ETag не сбивает).
+-- Удаление пользователя удаляет doc по FK. Файл идёт до сидов (06_*).
+CREATE TABLE IF NOT EXISTS user_profile_doc (
+  user_id     INT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  doc         JSONB NOT NULL,
+  version     BIGINT NOT NULL DEFAULT 1,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION fn_refresh_user_profile_docs(p_user_ids INT[])
+RETURNS void AS $$
+  INSERT INTO user_profile_doc AS d (user_id, doc)
+  SELECT u.id,
+         jsonb_build_object(
+           'id', u.id,
+           'telegram_id', u.telegram_id,
+           'username', u.username,
+           'first_name', u.first_name,
+           'last_name', u.last_name,
+           'avatar_url', u.avatar_url,
+           'bio', u.bio,
+           'city', u.city,
+           'university', u.university,
+           'link', u.link,
+           'skills', coalesce((
+             -- COLLATE "C" — тот же порядок, что в карточках анкет (05b) и SkillCatalog.sorted_by_name
+             SELECT jsonb_agg(jsonb_build_object('id', s.id, 'slug', s.slug, 'name', s.name)
+                              ORDER BY s.name COLLATE "C", s.id)
+               FROM user_skill us JOIN skill s ON s.id = us.skill_id
+              WHERE us.user_id = u.id
+           ), '[]'::jsonb),
+           'achievements', coalesce((
+             SELECT jsonb_agg(jsonb_build_object(
+                      'id', a.id, 'user_id', a.user_id, 'hackathon_id', a.hackathon_id,
+                      'role', a.role, 'place', a.place
+                    ) ORDER BY a.created_at DESC, a.id DESC)
+               FROM achievements a
+              WHERE a.user_id = u.id
+           ), '[]'::jsonb),
+           'match_count', NULL
+         )
+    FROM users u
+   WHERE u.id = ANY(p_user_ids)
+  ON CONFLICT (user_id) DO UPDATE
+     SET doc = EXCLUDED.doc, version = d.version + 1, updated_at = now()
+   WHERE d.doc IS DISTINCT FROM EXCLUDED.doc;
+$$ LANGUAGE sql;
+
+-- users: новый пользователь (логин) и правка полей профиля
+CREATE OR REPLACE FUNCTION fn_profile_doc_from_users_ins()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_profile_docs(ARRAY(SELECT id FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_profile_doc_from_users_upd()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_profile_docs(ARRAY(
+    SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+     WHERE (n.telegram_id, n.username, n.first_name, n.last_name, n.avatar_url, n.bio, n.city, n.university, n.link)
+           IS DISTINCT FROM
+           (o.telegram_id, o.username, o.first_name, o.last_name, o.avatar_url, o.bio, o.city, o.university, o.link)
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_profile_doc_users_ins ON users;
+CREATE TRIGGER trg_profile_doc_users_ins
+  AFTER INSERT ON users REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_users_ins();
+
+DROP TRIGGER IF EXISTS trg_profile_doc_users_upd ON users;
+CREATE TRIGGER trg_profile_doc_users_upd
+  AFTER UPDATE ON users REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_users_upd();
+
+-- user_skill и achievements: затронутые пользователи (user_id есть в обеих таблицах)
+CREATE OR REPLACE FUNCTION fn_profile_doc_from_new_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_profile_docs(ARRAY(SELECT DISTINCT user_id FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_profile_doc_from_old_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_profile_docs(ARRAY(SELECT DISTINCT user_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_profile_doc_from_both_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_profile_docs(ARRAY(SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_profile_doc_user_skill_ins ON user_skill;
+CREATE TRIGGER trg_profile_doc_user_skill_ins
+  AFTER INSERT ON user_skill REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_new_rows();
+
+DROP TRIGGER IF EXISTS trg_profile_doc_user_skill_del ON user_skill;
+CREATE TRIGGER trg_profile_doc_user_skill_del
+  AFTER DELETE ON user_skill REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_old_rows();
+
+DROP TRIGGER IF EXISTS trg_profile_doc_user_skill_upd ON user_skill;
+CREATE TRIGGER trg_profile_doc_user_skill_upd
+  AFTER UPDATE ON user_skill REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_both_rows();
+
+DROP TRIGGER IF EXISTS trg_profile_doc_ach_ins ON achievements;
+CREATE TRIGGER trg_profile_doc_ach_ins
+  AFTER INSERT ON achievements REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_new_rows();
+
+DROP TRIGGER IF EXISTS trg_profile_doc_ach_del ON achievements;
+CREATE TRIGGER trg_profile_doc_ach_del
+  AFTER DELETE ON achievements REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_old_rows();
+
+DROP TRIGGER IF EXISTS trg_profile_doc_ach_upd ON achievements;
+CREATE TRIGGER trg_profile_doc_ach_upd
+  AFTER UPDATE ON achievements REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_both_rows();
+
+-- skill: переименование навыка (редко) — профили всех его владельцев
+CREATE OR REPLACE FUNCTION fn_profile_doc_from_skill()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM fn_refresh_user_profile_docs(ARRAY(
+    SELECT DISTINCT us.user_id
+      FROM new_rows n JOIN old_rows o ON o.id = n.id
+      JOIN user_skill us ON us.skill_id = n.id
+     WHERE (n.slug, n.name) IS DISTINCT FROM (o.slug, o.name)
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_profile_doc_skill ON skill;
+CREATE TRIGGER trg_profile_doc_skill
+  AFTER UPDATE ON skill REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_profile_doc_from_skill();
+
+-- Для уже заполненной базы: разовая сборка всех профилей
+SELECT fn_refresh_user_profile_docs(ARRAY(SELECT id FROM users));
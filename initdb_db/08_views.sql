@@ -1,20 +1,17 @@
+-- Поверх материализованных карточек (05b_application_cards.sql): без JOIN'ов и ARRAY_AGG на чтение
 CREATE OR REPLACE VIEW v_public_applications AS
 SELECT
-  a.id AS application_id,
-  a.hackathon_id,
-  a.user_id,
-  u.username,
-  CONCAT_WS(' ', u.first_name, u.last_name) AS full_name,
-  COALESCE(ARRAY_AGG(DISTINCT s.name) FILTER (WHERE s.id IS NOT NULL), ARRAY[]::text[]) AS skills, -- обновление
-  a.role,
-  a.status,
-  a.created_at
-FROM application a
-JOIN users u ON u.id = a.user_id
-LEFT JOIN user_skill us ON us.user_id = u.id
-LEFT JOIN skill s ON s.id = us.skill_id
-WHERE a.status = 'published'
-GROUP BY a.id, a.hackathon_id, a.user_id, u.username, u.first_name, u.last_name, a.role, a.status, a.created_at;
+  c.application_id,
+  c.hackathon_id,
+  c.user_id,
+  c.username,
+  CONCAT_WS(' ', c.first_name, c.last_name) AS full_name,
+  ARRAY(SELECT DISTINCT sk->>'name' FROM jsonb_array_elements(c.skills) AS sk ORDER BY 1) AS skills,
+  c.role,
+  c.status,
+  c.created_at
+FROM application_card c
+WHERE c.status = 'published';
 
 
 CREATE OR REPLACE VIEW v_team_overview AS